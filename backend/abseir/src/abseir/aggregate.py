@@ -0,0 +1,180 @@
+"""
+Mergeable per-cycle statistics of many simulation samples, maintained incrementally as
+samples finish (so partial results are available while the others still run).
+
+Every cycle and column (e.g. state) keeps the number of samples, the mean and the sum
+of squared differences from the mean (combined with Chan et al.'s parallel algorithm),
+and a histogram of values in `[0, upper]` (e.g. the order of the simulated graph) for
+quantiles, which are exact while bins are a single value wide (`upper < bins`) and
+within a bin's width otherwise. Merging aggregates of disjoint samples gives the
+aggregate of their union:
+```
+aggregate = Aggregate(columns=6, upper=graph.number_of_nodes())
+for matrix in samples:  # cycles x columns, see `abseir.series`
+    aggregate.add(matrix)
+aggregate.quantile(0.95)
+```
+"""
+
+import io
+import zlib
+from typing import Sequence
+
+import numpy as np
+
+DEFAULT_BINS = 128
+QUANTILES = (0.05, 0.5, 0.95)
+
+
+class Aggregate:
+    """Mergeable statistics of samples of `columns` values in `[0, upper]` at every
+    cycle. Samples may have different numbers of cycles.
+    """
+
+    def __init__(self, columns: int, upper: int, bins: int = DEFAULT_BINS):
+        self.upper = upper
+        self.bins = min(bins, upper + 1)
+        self.count = np.zeros(0, dtype=np.int64)  # Samples that reached each cycle
+        self.mean = np.zeros((0, columns))
+        self.m2 = np.zeros((0, columns))
+        self.histogram = np.zeros((0, columns, self.bins), dtype=np.int64)
+
+    @property
+    def columns(self) -> int:
+        return self.mean.shape[1]
+
+    @property
+    def cycles(self) -> int:
+        return len(self.count)
+
+    @property
+    def width(self) -> float:
+        """Width of a histogram bin."""
+        return (self.upper + 1) / self.bins
+
+    def _grow(self, cycles: int):
+        """Extends the statistics to at least `cycles` cycles."""
+        extra = cycles - self.cycles
+        if extra > 0:
+            self.count = np.pad(self.count, (0, extra))
+            self.mean = np.pad(self.mean, ((0, extra), (0, 0)))
+            self.m2 = np.pad(self.m2, ((0, extra), (0, 0)))
+            self.histogram = np.pad(self.histogram, ((0, extra), (0, 0), (0, 0)))
+
+    def _check(self, other: "Aggregate"):
+        if (other.columns, other.upper, other.bins) != (
+            self.columns,
+            self.upper,
+            self.bins,
+        ):
+            raise ValueError("Aggregates of different columns, bounds or bins")
+
+    def merge(self, other: "Aggregate") -> "Aggregate":
+        """Adds the samples of `other` (with the same columns, bound and bins)."""
+        self._check(other)
+        self._grow(other.cycles)
+        cycles = other.cycles
+        count_a = self.count[:cycles, None].astype(float)
+        count_b = other.count[:, None].astype(float)
+        total = count_a + count_b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = other.mean - self.mean[:cycles]
+            mean = self.mean[:cycles] + delta * np.where(total > 0, count_b / total, 0)
+            m2 = (
+                self.m2[:cycles]
+                + other.m2
+                + np.where(total > 0, delta**2 * count_a * count_b / total, 0)
+            )
+        self.mean[:cycles], self.m2[:cycles] = mean, m2
+        self.count[:cycles] += other.count
+        self.histogram[:cycles] += other.histogram
+        return self
+
+    def add(self, matrix: np.ndarray) -> "Aggregate":
+        """Adds a sample: the `cycles x columns` matrix of its values."""
+        matrix = np.asarray(matrix, dtype=np.int64)
+        sample = Aggregate(self.columns, self.upper, self.bins)
+        sample._grow(len(matrix))
+        sample.count[:] = 1
+        sample.mean[:] = matrix
+        bins = np.clip((matrix / sample.width).astype(np.int64), 0, self.bins - 1)
+        np.put_along_axis(sample.histogram, bins[..., None], 1, axis=2)
+        return self.merge(sample)
+
+    def std(self) -> np.ndarray:
+        """Sample standard deviation at every cycle (`nan` if fewer than 2 samples)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(self.m2 / (self.count[:, None] - 1))
+
+    def _order_statistic(self, rank: np.ndarray) -> np.ndarray:
+        """Estimated value of (0-based) `rank` at every cycle and column, spreading the
+        values of its histogram bin evenly over the bin.
+        """
+        cumulative = np.cumsum(self.histogram, axis=2)
+        index = np.minimum((cumulative <= rank[..., None]).sum(axis=2), self.bins - 1)
+        inside = np.take_along_axis(self.histogram, index[..., None], 2)[..., 0]
+        before = np.take_along_axis(cumulative, index[..., None], 2)[..., 0] - inside
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = np.where(inside > 0, (rank - before + 0.5) / inside, 0)
+        lower = np.ceil(index * self.width)
+        upper = np.ceil((index + 1) * self.width) - 1
+        return lower + fraction * (upper - lower)
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Estimated `q` quantile at every cycle, linearly interpolated between the
+        order statistics around it (like `numpy.quantile`). Exact if bins are a single
+        value wide, and within a bin's width otherwise.
+        """
+        position = np.broadcast_to(q * (self.count[:, None] - 1), self.mean.shape)
+        below = np.floor(position)
+        low = self._order_statistic(below)
+        high = self._order_statistic(np.minimum(below + 1, self.count[:, None] - 1))
+        estimate = low + (position - below) * (high - low)
+        return np.where(self.count[:, None] > 0, estimate, np.nan)
+
+    def summary(
+        self, names: Sequence[str], quantiles: Sequence[float] = QUANTILES
+    ) -> dict:
+        """Per-cycle `count` of samples, and the `mean`, `std` and `quantiles` (as
+        `p5`, `p50`, ...) of every column named by `names`, as JSON-compatible lists
+        (`None` where undefined).
+        """
+
+        def lists(values: np.ndarray) -> dict:
+            rounded = np.round(values, 6).astype(object)
+            rounded[np.isnan(values)] = None
+            return {
+                name: rounded[:, index].tolist() for index, name in enumerate(names)
+            }
+
+        summary = {
+            "count": self.count.tolist(),
+            "mean": lists(self.mean),
+            "std": lists(self.std()),
+        }
+        for q in quantiles:
+            summary[f"p{round(q * 100):g}"] = lists(self.quantile(q))
+        return summary
+
+    def dumps(self) -> bytes:
+        """Encodes the statistics (mostly empty histograms, which compress well)."""
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            bounds=np.array([self.upper, self.bins]),
+            count=self.count,
+            mean=self.mean,
+            m2=self.m2,
+            histogram=self.histogram,
+        )
+        return zlib.compress(buffer.getvalue(), 6)
+
+    @classmethod
+    def loads(cls, data: bytes) -> "Aggregate":
+        """Decodes statistics encoded by :meth:`dumps`."""
+        arrays = np.load(io.BytesIO(zlib.decompress(data)))
+        upper, bins = arrays["bounds"].tolist()
+        aggregate = cls(arrays["mean"].shape[1], upper, bins)
+        aggregate.count, aggregate.mean = arrays["count"], arrays["mean"]
+        aggregate.m2, aggregate.histogram = arrays["m2"], arrays["histogram"]
+        return aggregate
@@ -0,0 +1,349 @@
+"""
+Analyzes simulation output files (`output/data/*.csv`) written by `main.py`.
+
+Files are streamed in chunks and reduced into per-cycle summaries (sample count, and the
+count, mean and sum of squared differences from the mean of the values of every column),
+so memory usage does not depend on the size of a file. Summaries from several files are
+merged (with Chan et al.'s parallel algorithm, like `abseir.aggregate`) before
+calculating means/standard deviations.
+
+Each file's summary is cached next to it (`<file>.summary`), and is invalidated
+once the hash of the source file no longer matches the hash stored in the cache.
+
+Usage (from the `abseir` project directory):
+```
+python -m abseir.analysis mean [FILES ...]    # replaces `generate_mean_csv.py`
+python -m abseir.analysis report [FILES ...]  # replaces `stats.py`
+```
+If no files are specified, the most recently created file in `--directory` is used.
+Means are written to `mean/<file>` next to the (first) file, unless `--output` is given.
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+DEFAULT_DIRECTORY = "./output/data/"
+DEFAULT_CHUNKSIZE = 100_000
+
+CACHE_SUFFIX = ".summary"
+# Also versions the format of cached summaries, so older caches are recomputed
+CACHE_HASH_PREFIX = "# summary-v2 source-hash: "
+
+POPULATION_COLUMNS = [
+    "susceptible",
+    "exposed",
+    "infected asymptomatic",
+    "infected symptomatic",
+    "recovered",
+    "deceased",
+]
+
+# Columns written by the `mean` command (previously `generate_mean_csv.py`)
+MEAN_COLUMNS = [
+    *POPULATION_COLUMNS,
+    "test count",
+    "true positive",
+    "false positive",
+    "new false positive",
+    "returning false positive",
+    "exogenous",
+    "generation 1",
+    "generation 2",
+    "generation 3",
+    "generation 4",
+    "generation 5",
+    "generation x",
+    "interactions",
+    "infected nodes",
+    "susceptibles contracting",
+    "interactions*",
+]
+
+# Columns printed by the `report` command (previously `stats.py`)
+REPORT_COLUMNS = [
+    "susceptible",
+    "false positive",
+    "infected asymptomatic",
+    "true positive",
+    "infected symptomatic",
+    "recovered",
+    "deceased",
+]
+
+# Columns derived from ratios, which are undefined (`0`) when dividing by zero
+RATIO_COLUMNS = ["r0", "r1", "r2"]
+
+# Expected total infected count from Paltiel's model, used to compute the report's error
+PALTIEL_TOTAL_INFECTED = 554
+
+
+def file_hash(path: PathLike, block_size: int = 1 << 20) -> str:
+    """Hashes the contents of the file at `path` without reading it into memory at once."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def latest_file(directory: PathLike = DEFAULT_DIRECTORY) -> str:
+    """Returns the most recently created `*.csv` file in `directory`."""
+    files = glob.glob(os.path.join(directory, "*.csv"))
+    if not files:
+        raise FileNotFoundError(f"No simulation output files found in '{directory}'")
+    return max(files, key=os.path.getctime)
+
+
+def derive_columns(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Adds the columns derived from each row of raw simulation output:
+    * `interactions*`: `susceptibles contracting` * `infected nodes`
+    * `r0`, `r1`, `r2`: ratios between consecutive infection generations (`0` where a
+      generation is empty)
+
+    Other missing values are kept, and are left out of the summaries of their column.
+    """
+    chunk["interactions*"] = chunk["susceptibles contracting"] * chunk["infected nodes"]
+    chunk["r0"] = chunk["generation 2"] / chunk["generation 1"]
+    chunk["r1"] = chunk["generation 3"] / chunk["generation 2"]
+    chunk["r2"] = chunk["generation 4"] / chunk["generation 3"]
+    chunk[RATIO_COLUMNS] = chunk[RATIO_COLUMNS].replace({np.nan: 0, np.inf: 0})
+    return chunk
+
+
+class CycleSummary:
+    """Per-cycle sample count, and the count, mean and sum of squared differences from
+    the mean (`m2`) of the (non-missing) values of every numeric column.
+
+    Summaries can be updated one chunk at a time and merged with each other, so
+    arbitrarily large (or many) files can be reduced with constant memory. Unlike sums
+    of squares, `m2` keeps its precision for large counts with a small variance.
+    """
+
+    def __init__(
+        self,
+        count: Optional[pd.Series] = None,
+        observed: Optional[pd.DataFrame] = None,
+        means: Optional[pd.DataFrame] = None,
+        m2: Optional[pd.DataFrame] = None,
+    ):
+        self.count = count if count is not None else pd.Series(dtype=float)
+        self.observed = observed if observed is not None else pd.DataFrame(dtype=float)
+        self.means = means if means is not None else pd.DataFrame(dtype=float)
+        self.m2 = m2 if m2 is not None else pd.DataFrame(dtype=float)
+
+    def __len__(self):
+        return len(self.count)
+
+    def update(self, chunk: pd.DataFrame):
+        """Adds the rows of `chunk` (grouped by their `cycle`) to this summary."""
+        values = chunk.drop(columns="cycle").astype(float)
+        grouped = values.groupby(chunk["cycle"])
+        deviations = values - grouped.transform("mean")
+        self.merge(
+            CycleSummary(
+                grouped.size().astype(float),
+                grouped.count().astype(float),
+                grouped.mean().fillna(0),
+                (deviations**2).groupby(chunk["cycle"]).sum(),
+            )
+        )
+
+    def merge(self, other: "CycleSummary"):
+        """Adds the rows summarized by `other` to this summary."""
+        if len(self) == 0:
+            self.count, self.observed, self.means, self.m2 = (
+                other.count.copy(),
+                other.observed.copy(),
+                other.means.copy(),
+                other.m2.copy(),
+            )
+            return
+        cycles = self.count.index.union(other.count.index)
+        columns = self.means.columns.union(other.means.columns, sort=False)
+
+        def align(frame: pd.DataFrame) -> pd.DataFrame:
+            return frame.reindex(index=cycles, columns=columns, fill_value=0)
+
+        count_a, count_b = align(self.observed), align(other.observed)
+        mean_a, mean_b = align(self.means), align(other.means)
+        total = count_a + count_b
+        # Weights of `other`, `0` where neither summary has values
+        weight = (count_b / total.where(total > 0)).fillna(0)
+        delta = mean_b - mean_a
+
+        self.count = self.count.add(other.count, fill_value=0)
+        self.observed = total
+        self.means = mean_a + delta * weight
+        self.m2 = align(self.m2) + align(other.m2) + delta**2 * count_a * weight
+
+    def mean(self) -> pd.DataFrame:
+        """Per-cycle mean of every column."""
+        return self.means.where(self.observed > 0)
+
+    def std(self) -> pd.DataFrame:
+        """Per-cycle sample standard deviation (`ddof=1`) of every column."""
+        variance = self.m2 / (self.observed - 1).where(self.observed > 1)
+        return np.sqrt(variance.clip(lower=0))  # type: ignore
+
+    def to_frame(self) -> pd.DataFrame:
+        """Flattens this summary into a single frame indexed by `cycle`."""
+        return pd.concat(
+            [
+                self.count.rename("count"),
+                self.observed.add_suffix(":count"),
+                self.means.add_suffix(":mean"),
+                self.m2.add_suffix(":m2"),
+            ],
+            axis=1,
+        ).rename_axis("cycle")
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "CycleSummary":
+        """Inverse of :meth:`to_frame`."""
+
+        def strip(suffix: str) -> pd.DataFrame:
+            columns = [column for column in frame.columns if column.endswith(suffix)]
+            return frame[columns].rename(columns=lambda c: c[: -len(suffix)])
+
+        return cls(frame["count"], strip(":count"), strip(":mean"), strip(":m2"))
+
+
+def cache_path(path: PathLike) -> str:
+    """Path of the cached summary of the file at `path`."""
+    return os.fspath(path) + CACHE_SUFFIX
+
+
+def read_cache(path: PathLike, source_hash: str) -> Optional[CycleSummary]:
+    """Reads the cached summary of the file at `path`,
+    or `None` if it does not exist or is stale.
+    """
+    try:
+        with open(cache_path(path), "r") as file:
+            if file.readline().strip() != CACHE_HASH_PREFIX + source_hash:
+                return None
+            return CycleSummary.from_frame(pd.read_csv(file, index_col="cycle"))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_cache(path: PathLike, source_hash: str, summary: CycleSummary):
+    """Caches `summary` next to the file at `path`, tagged with the file's hash."""
+    with open(cache_path(path), "w", newline="") as file:
+        file.write(CACHE_HASH_PREFIX + source_hash + "\n")
+        summary.to_frame().to_csv(file)
+
+
+def summarize(
+    path: PathLike, chunksize: int = DEFAULT_CHUNKSIZE, cache: bool = True
+) -> CycleSummary:
+    """Summarizes the simulation output file at `path`, reading it `chunksize` rows at a
+    time. Uses (and refreshes) the cached summary next to the file if `cache` is set.
+    """
+    source_hash = file_hash(path) if cache else ""
+    if cache:
+        summary = read_cache(path, source_hash)
+        if summary is not None:
+            return summary
+
+    summary = CycleSummary()
+    with pd.read_csv(path, comment="#", chunksize=chunksize) as reader:
+        for chunk in reader:
+            summary.update(derive_columns(chunk))
+
+    if cache:
+        write_cache(path, source_hash, summary)
+    return summary
+
+
+def summarize_files(paths: Iterable[PathLike], **kwargs) -> CycleSummary:
+    """Summarizes and merges the simulation output files at `paths`.
+
+    See :func:`summarize` for `kwargs`.
+    """
+    summary = CycleSummary()
+    for path in paths:
+        summary.merge(summarize(path, **kwargs))
+    return summary
+
+
+def write_mean(summary: CycleSummary, path: PathLike, columns: Optional[list] = None):
+    """Writes the per-cycle means of `summary` to `path`."""
+    mean = summary.mean()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    (mean if columns is None else mean[columns]).to_csv(path)
+
+
+def mean_path(path: PathLike) -> str:
+    """Default path of the means of the file at `path`: `mean/<file>` next to it."""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, "mean", name)
+
+
+def report(summary: CycleSummary):
+    """Prints statistics about the final cycle of `summary`."""
+    mean, std = summary.mean(), summary.std()
+    final_mean, final_std = mean.iloc[-1], std.iloc[-1]
+
+    total = mean[POPULATION_COLUMNS].iloc[0].sum()
+    total_infected = total - final_mean["susceptible"]
+    error = (total_infected - PALTIEL_TOTAL_INFECTED) / PALTIEL_TOTAL_INFECTED
+
+    print("TI: ", total_infected, "(err: %.4f%%)" % (error * 100))
+    print("Tests: %s" % (final_mean["test count"]))
+    print("Samples: %d\n" % (summary.count.iloc[-1]))
+
+    for column in REPORT_COLUMNS:
+        print(f"{column}: %s (%s)" % (final_mean[column], final_std[column]))
+
+    print(f"R0: {final_mean['r0']} \nR1: {final_mean['r1']} \nR2: {final_mean['r2']}")
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m abseir.analysis", description=__doc__.split("\n\n")[1]
+    )
+    parser.add_argument("command", choices=["mean", "report"])
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="simulation output files to merge (default: latest file in --directory)",
+    )
+    parser.add_argument("-d", "--directory", default=DEFAULT_DIRECTORY)
+    parser.add_argument("-c", "--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="mean CSV path (default: mean/<first file> in the first file's directory)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="ignore and do not write cached summaries",
+    )
+    args = parser.parse_args(argv)
+
+    files = args.files or [latest_file(args.directory)]
+    print(files)
+
+    summary = summarize_files(files, chunksize=args.chunksize, cache=args.cache)
+    output = args.output or mean_path(files[0])
+
+    if args.command == "mean":
+        write_mean(summary, output, MEAN_COLUMNS)
+    else:
+        print("\nStats on %s:" % (files))
+        report(summary)
+        write_mean(summary, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,463 @@
+"""
+Binary graph file format (`*.csr`) storing a graph's adjacency in
+compressed sparse row (CSR) form, which can be memory-mapped without parsing.
+
+File layout (little-endian):
+```
+magic    8 bytes   b"ABSRCSR\\0"
+version  uint32
+length   uint32    length of the JSON header
+header   JSON      identifiers, name, and the dtype/offset/length of each array
+padding            up to a multiple of `ALIGNMENT` bytes
+arrays             `indptr`, `indices` (and `labels`), each aligned to `ALIGNMENT` bytes
+```
+
+Every edge is stored in both directions, so the (sorted) neighbors of node `i` are
+`indices[indptr[i]:indptr[i + 1]]`. `labels` maps node indices back to the node names of
+the original graph, and is omitted if the nodes are exactly `0..order - 1`.
+
+Loading with `mmap=True` (the default) only maps the file: the arrays are read-only views
+into the OS page cache, which is shared between every process that loads the same file.
+
+Convert text graphs from the command line with:
+```
+python -m abseir.csr graphs/wattsstrogatz/wattsstrogatz_n1500_k42_d3_rng0.adjlist
+```
+"""
+
+import argparse
+import json
+import os
+import struct
+from collections.abc import Mapping
+from typing import Any, Iterable, Iterator, Optional, Union
+
+import networkx as nx
+import numpy as np
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+EXTENSION = ".csr"
+MAGIC = b"ABSRCSR\0"
+VERSION = 1
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def encode_identifiers(identifiers: dict) -> dict:
+    """Converts identifier values into JSON-serializable values,
+    tagging sets so that they can be restored by :func:`decode_identifiers`.
+    """
+    encoded = {}
+    for key, value in identifiers.items():
+        if isinstance(value, (set, frozenset)):
+            value = {"set": sorted(value)}
+        elif isinstance(value, range):
+            value = list(value)
+        elif isinstance(value, np.integer):
+            value = int(value)
+        encoded[key] = value
+    return encoded
+
+
+def decode_identifiers(identifiers: dict) -> dict:
+    """Inverse of :func:`encode_identifiers`."""
+    return {
+        key: set(value["set"]) if isinstance(value, dict) and "set" in value else value
+        for key, value in identifiers.items()
+    }
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def sorted_unique(keys: np.ndarray) -> np.ndarray:
+    """Sorted unique values of `keys` (like :func:`numpy.unique`, which is much slower
+    for large integer arrays in recent NumPy versions since it hashes them first).
+    """
+    keys = np.sort(keys)
+    if len(keys) == 0:
+        return keys
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+
+
+def _index_dtype(maximum: int) -> np.dtype:
+    """Smallest signed integer dtype (32 or 64 bits) that can hold `maximum`."""
+    return np.dtype("<i4") if maximum < 2**31 else np.dtype("<i8")
+
+
+class CSRGraph:
+    """Immutable, undirected graph stored as CSR arrays.
+
+    Exposes the read-only subset of the :class:`~networkx.Graph` interface used by
+    the simulation (`nodes`, `neighbors`, `degree`, `number_of_edges`, ...) and can be
+    converted to a :class:`~abseir.grapher.Graph` with :meth:`to_networkx`.
+    """
+
+    def __init__(
+        self,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        labels: Optional[np.ndarray] = None,
+        identifiers: Optional[dict] = None,
+        name: str = "",
+    ):
+        self.indptr = indptr
+        self.indices = indices
+        self.labels = labels
+        self.identifiers = identifiers or {}
+        self.name = name
+        self._label_index = None  # type: Optional[dict]
+
+    def __repr__(self):
+        return "".join(
+            [
+                f"{type(self).__name__}(",
+                "".join([f"{key}={value}," for key, value in self.identifiers.items()]),
+                f"name='{self.name!r}'," if self.name else "",
+                ")",
+            ]
+        )
+
+    def __len__(self):
+        return self.number_of_nodes()
+
+    def __iter__(self) -> Iterator:
+        return iter(self.nodes())
+
+    def __contains__(self, node) -> bool:
+        return self._index(node) is not None
+
+    def __eq__(self, other):
+        if not isinstance(other, CSRGraph):
+            return NotImplemented
+        return (
+            np.array_equal(self.indptr, other.indptr)
+            and np.array_equal(self.indices, other.indices)
+            and list(self.nodes()) == list(other.nodes())
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes taken by the graph's arrays (most of its memory)."""
+        arrays = [self.indptr, self.indices]
+        if self.labels is not None:
+            arrays.append(self.labels)
+        return sum(array.nbytes for array in arrays)
+
+    # networkx-like interface
+
+    def number_of_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    def number_of_edges(self) -> int:
+        return len(self.indices) // 2
+
+    def nodes(self) -> Iterable:
+        if self.labels is None:
+            return range(self.number_of_nodes())
+        return self.labels.tolist()
+
+    def neighbors(self, node) -> Iterator:
+        index = self._index(node)
+        if index is None:
+            raise nx.NetworkXError(f"The node {node} is not in the graph.")
+        neighbors = self.indices[self.indptr[index] : self.indptr[index + 1]]
+        if self.labels is not None:
+            neighbors = self.labels[neighbors]
+        return iter(neighbors.tolist())
+
+    @property
+    def adj(self) -> "_Adjacency":
+        """Read-only mapping from each node to an array of its (sorted) neighbors, like
+        :attr:`networkx.Graph.adj`. The arrays are views, so nothing is copied.
+        """
+        return _Adjacency(self)
+
+    @property
+    def degree(self):
+        """`(node, degree)` pairs, like :attr:`networkx.Graph.degree`."""
+        return zip(self.nodes(), self.degrees().tolist())
+
+    def degrees(self) -> np.ndarray:
+        """Degree of every node, in node index order."""
+        return np.diff(self.indptr)
+
+    def has_edge(self, u, v) -> bool:
+        u, v = self._index(u), self._index(v)
+        if u is None or v is None:
+            return False
+        row = self.indices[self.indptr[u] : self.indptr[u + 1]]
+        position = np.searchsorted(row, v)
+        return bool(position < len(row) and row[position] == v)
+
+    def edges(self) -> Iterator[tuple]:
+        """Each edge `(u, v)` once."""
+        edges = self.edge_array()
+        if self.labels is not None:
+            edges = self.labels[edges]
+        return map(tuple, edges.tolist())
+
+    def edge_array(self) -> np.ndarray:
+        """`(number_of_edges, 2)` array of node indices, each edge once with `u < v`."""
+        sources = np.repeat(
+            np.arange(self.number_of_nodes(), dtype=self.indices.dtype),
+            self.degrees(),
+        )
+        upper = sources < self.indices
+        return np.column_stack([sources[upper], self.indices[upper]])
+
+    def _index(self, node) -> Optional[int]:
+        if self.labels is None:
+            if isinstance(node, (int, np.integer)) and 0 <= node < len(self):
+                return int(node)
+            return None
+        if self._label_index is None:
+            self._label_index = {label: i for i, label in enumerate(self.nodes())}
+        return self._label_index.get(node)
+
+    # Conversions
+
+    @classmethod
+    def from_edges(
+        cls,
+        order: int,
+        edges: Union[np.ndarray, Iterable],
+        labels: Optional[Union[np.ndarray, list]] = None,
+        identifiers: Optional[dict] = None,
+        name: str = "",
+    ) -> "CSRGraph":
+        """Builds a graph with nodes `0..order - 1` from an iterable/array of index pairs.
+        Duplicate edges and self-loops are dropped.
+        """
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        sources = np.concatenate([edges[:, 0], edges[:, 1]])
+        targets = np.concatenate([edges[:, 1], edges[:, 0]])
+
+        # Sorting by a single key orders rows, and neighbors within each row
+        keys = sorted_unique(sources * order + targets)
+        sources, targets = np.divmod(keys, order)
+
+        indptr = np.zeros(order + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=order), out=indptr[1:])
+        indices = targets.astype(_index_dtype(order))
+
+        if labels is not None:
+            labels = np.asarray(labels)
+            if np.array_equal(labels, np.arange(order)):
+                labels = None
+        return cls(indptr, indices, labels, identifiers, name)
+
+    @classmethod
+    def from_graph(cls, graph: Any) -> "CSRGraph":
+        """Converts a :class:`~networkx.Graph` (e.g. :class:`~abseir.grapher.Graph`)."""
+        if isinstance(graph, CSRGraph):
+            return graph
+        # Implicit graphs (see :mod:`abseir.implicit`) build their edges as arrays
+        if hasattr(graph, "to_csr"):
+            return graph.to_csr()
+        labels = list(graph.nodes())
+        index = {node: i for i, node in enumerate(labels)}
+        edges = np.fromiter(
+            (index[node] for edge in graph.edges() for node in edge[:2]),
+            dtype=np.int64,
+            count=2 * graph.number_of_edges(),
+        )
+        return cls.from_edges(
+            len(labels),
+            edges,
+            labels,
+            identifiers=getattr(graph, "identifiers", None),
+            name=graph.name,
+        )
+
+    @classmethod
+    def from_adjlist(cls, path: PathLike, **kwargs) -> "CSRGraph":
+        """Reads an adjacency list file (:func:`networkx.write_adjlist`) with integer nodes."""
+        return cls._from_text(path, adjacency=True, **kwargs)
+
+    @classmethod
+    def from_edgelist(cls, path: PathLike, **kwargs) -> "CSRGraph":
+        """Reads an edge list file (:func:`networkx.write_edgelist`) with integer nodes."""
+        return cls._from_text(path, adjacency=False, **kwargs)
+
+    @classmethod
+    def _from_text(cls, path: PathLike, adjacency: bool, **kwargs) -> "CSRGraph":
+        index = {}  # type: dict[int, int]
+        edges = []  # type: list[int]
+
+        def lookup(node: str) -> int:
+            return index.setdefault(int(node), len(index))
+
+        with open(path, "r") as file:
+            for line in file:
+                tokens = line.split("#", 1)[0].split()
+                if not tokens:
+                    continue
+                source = lookup(tokens[0])
+                # Edge list lines may have trailing edge data; only use the first two columns
+                for target in tokens[1:] if adjacency else tokens[1:2]:
+                    edges.extend((source, lookup(target)))
+
+        kwargs.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+        return cls.from_edges(len(index), edges, list(index.keys()), **kwargs)
+
+    def to_networkx(self, graph_class: Optional[type] = None) -> nx.Graph:
+        """Materializes this graph as a `graph_class` instance
+        (:class:`~abseir.grapher.Graph` by default).
+        """
+        if graph_class is None:
+            from abseir.grapher import Graph  # pylint: disable=import-outside-toplevel
+
+            graph_class = Graph
+
+        graph = graph_class(**self.identifiers)
+        if self.name:
+            graph.name = self.name
+        graph.add_nodes_from(self.nodes())
+        graph.add_edges_from(self.edges())
+        return graph
+
+    # File I/O
+
+    def save(self, path: PathLike):
+        """Writes this graph to `path` in the `*.csr` file format."""
+        arrays = {"indptr": self.indptr, "indices": self.indices}
+        if self.labels is not None:
+            arrays["labels"] = np.asarray(self.labels)
+
+        offset, layout = 0, {}
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+            arrays[key] = array
+            layout[key] = {
+                "dtype": array.dtype.str,
+                "offset": offset,
+                "length": len(array),
+            }
+            offset = _align(offset + array.nbytes)
+
+        header = json.dumps(
+            {
+                "identifiers": encode_identifiers(self.identifiers),
+                "name": self.name,
+                "arrays": layout,
+            }
+        ).encode("utf-8")
+        data_start = _align(_PREAMBLE.size + len(header))
+
+        with open(path, "wb") as file:
+            file.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+            file.write(header)
+            for key, array in arrays.items():
+                file.seek(data_start + layout[key]["offset"])
+                file.write(array.tobytes())
+            file.truncate(data_start + offset)
+
+    @classmethod
+    def load(cls, path: PathLike, mmap: bool = True) -> "CSRGraph":
+        """Reads a `*.csr` file. With `mmap`, the arrays are read-only, zero-copy views
+        of the memory-mapped file instead of being read into memory.
+        """
+        if mmap:
+            buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            buffer = np.fromfile(path, dtype=np.uint8)
+        return cls.from_buffer(buffer)
+
+    @classmethod
+    def from_buffer(cls, buffer: np.ndarray) -> "CSRGraph":
+        """Reads a graph from the bytes of a `*.csr` file without copying its arrays."""
+        magic, version, length = _PREAMBLE.unpack(buffer[: _PREAMBLE.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError("Not a CSR graph file (bad magic number)")
+        if version > VERSION:
+            raise ValueError(f"Unsupported CSR graph file version: {version}")
+
+        header = json.loads(buffer[_PREAMBLE.size : _PREAMBLE.size + length].tobytes())
+        data_start = _align(_PREAMBLE.size + length)
+
+        arrays = {}
+        for key, layout in header["arrays"].items():
+            dtype = np.dtype(layout["dtype"])
+            start = data_start + layout["offset"]
+            arrays[key] = buffer[
+                start : start + layout["length"] * dtype.itemsize
+            ].view(dtype)
+
+        return cls(
+            arrays["indptr"],
+            arrays["indices"],
+            arrays.get("labels"),
+            decode_identifiers(header["identifiers"]),
+            header["name"],
+        )
+
+
+class _Adjacency(Mapping):
+    def __init__(self, graph: CSRGraph):
+        self._graph = graph
+
+    def __getitem__(self, node) -> np.ndarray:
+        index = self._graph._index(node)
+        if index is None:
+            raise KeyError(node)
+        graph = self._graph
+        neighbors = graph.indices[graph.indptr[index] : graph.indptr[index + 1]]
+        return neighbors if graph.labels is None else graph.labels[neighbors]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._graph)
+
+    def __len__(self) -> int:
+        return len(self._graph)
+
+
+def read(path: PathLike, mmap: bool = True, cache: bool = True) -> CSRGraph:
+    """Reads a graph file in any supported format (`*.csr`, `*.adjlist`, `*.edgelist`).
+
+    With `cache`, text formats are converted once to a `*.csr` file next to them,
+    which is used instead for as long as it is newer than the text file.
+    """
+    root, extension = os.path.splitext(path)
+    if extension == EXTENSION:
+        return CSRGraph.load(path, mmap=mmap)
+
+    readers = {".adjlist": CSRGraph.from_adjlist, ".edgelist": CSRGraph.from_edgelist}
+    if extension not in readers:
+        raise ValueError(f"Unsupported graph file format: '{extension}'")
+
+    binary_path = root + EXTENSION
+    if cache and os.path.exists(binary_path):
+        if os.path.getmtime(binary_path) >= os.path.getmtime(path):
+            return CSRGraph.load(binary_path, mmap=mmap)
+
+    graph = readers[extension](path)
+    if cache:
+        graph.save(binary_path)
+    return graph
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m abseir.csr",
+        description="Converts `*.adjlist`/`*.edgelist` graph files to `*.csr` files.",
+    )
+    parser.add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        graph = read(path, cache=False)
+        binary_path = os.path.splitext(path)[0] + EXTENSION
+        graph.save(binary_path)
+        print(
+            f"Converted '{path}' to '{binary_path}' "
+            f"({graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Reduced "level of detail" views of large graphs, for browsing graphs whose every edge
+would be too many to draw.
+
+Each method keeps at most `budget` edges (and `O(budget)` nodes):
+
+* `sample`: a uniform random sample of edges, and the nodes they join
+* `degree`: the subgraph induced by the nodes of highest degree
+* `cluster`: nodes aggregated into clusters of consecutive nodes, joined by edges
+  weighted by how many edges they stand for. Nodes of generated graphs (circulant,
+  Watts-Strogatz, ...) are numbered around their ring, so consecutive nodes are close.
+
+```
+reduced = detail.reduce(graph, 5000, "cluster")
+```
+"""
+
+import json
+from typing import Any, Optional, Sequence
+
+import networkx as nx
+import numpy as np
+
+from abseir import layout, serialization
+from abseir.csr import CSRGraph, sorted_unique
+
+METHODS = ("sample", "degree", "cluster")
+
+
+def sample_edges(graph: CSRGraph, budget: int, seed: int = 0) -> tuple:
+    """Indices of the nodes joined by a uniform random sample of `budget` edges, and
+    the sampled edges. Keeps every node if every edge fits in `budget`.
+    """
+    edges = graph.edge_array().astype(np.int64)
+    if len(edges) <= budget:
+        return np.arange(graph.number_of_nodes()), edges
+    rng = np.random.default_rng(seed)
+    edges = edges[np.sort(rng.choice(len(edges), size=budget, replace=False))]
+    return sorted_unique(edges.ravel()), edges
+
+
+def filter_degree(graph: CSRGraph, budget: int) -> tuple:
+    """Indices of the most nodes of highest degree whose induced subgraph has at most
+    `budget` edges, and the edges of that subgraph.
+    """
+    order = graph.number_of_nodes()
+    edges = graph.edge_array().astype(np.int64)
+    ranking = np.argsort(-graph.degrees(), kind="stable")
+    ranks = np.empty(order, dtype=np.int64)
+    ranks[ranking] = np.arange(order)
+
+    # An edge is induced by the `k` top nodes once both of its nodes rank below `k`
+    appearances = np.bincount(ranks[edges].max(axis=1, initial=0), minlength=order)
+    induced = np.cumsum(appearances)
+    kept = int(np.searchsorted(induced, budget, side="right"))
+
+    nodes = np.sort(ranking[:kept])
+    return nodes, edges[ranks[edges].max(axis=1, initial=0) < kept]
+
+
+def cluster(graph: CSRGraph, budget: int) -> tuple:
+    """Assigns nodes to the most clusters of consecutive nodes that are joined by at
+    most `budget` (weighted) edges.
+
+    Returns the cluster of every node, and the `(cluster, cluster, weight)` edges.
+    """
+    order = graph.number_of_nodes()
+    # `k` clusters are joined by at most `k * (k - 1) / 2` edges
+    clusters = order
+    if graph.number_of_edges() > budget:
+        clusters = int(min(order, np.floor((1 + np.sqrt(1 + 8 * budget)) / 2)))
+    assignment = np.arange(order, dtype=np.int64) * max(clusters, 1) // max(order, 1)
+
+    pairs = np.sort(assignment[graph.edge_array().astype(np.int64)], axis=1)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    keys = np.sort(pairs[:, 0] * clusters + pairs[:, 1])
+    unique = sorted_unique(keys)
+    weights = np.diff(np.searchsorted(keys, unique), append=len(keys))
+    sources, targets = np.divmod(unique, max(clusters, 1))
+    return assignment, np.column_stack([sources, targets, weights])
+
+
+def reduce(
+    graph: Any,
+    budget: int,
+    method: str = "sample",
+    positions: Optional[np.ndarray] = None,
+) -> nx.Graph:
+    """Reduced view of `graph` (a networkx, CSR or implicit graph) with at most
+    `budget` edges, using `method` (one of `METHODS`).
+
+    Nodes keep the labels of `graph` (clusters of several nodes are labelled by their
+    first and last node) and, if the `positions` of every node are given (see :mod:`abseir.layout`),
+    their `position` (the mean position of clustered nodes).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown view method '{method}' (expected {METHODS})")
+    if budget < 0:
+        raise ValueError(f"Budget must be non-negative (got {budget})")
+    graph = CSRGraph.from_graph(graph)
+    labels = np.asarray(list(graph.nodes()))
+    view = nx.Graph(name=graph.name, method=method, budget=budget)
+
+    if method == "cluster":
+        assignment, weighted_edges = cluster(graph, budget)
+        sizes = np.bincount(assignment)
+        starts = np.cumsum(sizes) - sizes
+        for start, size in zip(starts, sizes):
+            node = (
+                f"{labels[start]}-{labels[start + size - 1]}"
+                if size > 1
+                else str(labels[start])
+            )
+            view.add_node(node, size=int(size))
+            if positions is not None:
+                view.nodes[node]["position"] = positions[start : start + size].mean(
+                    axis=0
+                )
+        nodes = list(view.nodes())
+        view.add_weighted_edges_from(
+            (nodes[u], nodes[v], int(weight)) for u, v, weight in weighted_edges
+        )
+        return view
+
+    if method == "degree":
+        indices, edges = filter_degree(graph, budget)
+    else:
+        indices, edges = sample_edges(graph, budget)
+    degrees = graph.degrees()
+    for index in indices.tolist():
+        view.add_node(labels[index].item(), degree=int(degrees[index]))
+        if positions is not None:
+            view.nodes[labels[index].item()]["position"] = positions[index]
+    view.add_edges_from(labels[edges].tolist())
+    return view
+
+
+def to_cytoscape(view: nx.Graph) -> dict:
+    """Exports a reduced view as cytoscape JSON, with node `position`s where cytoscape
+    expects them.
+    """
+    data = nx.cytoscape_data(view)
+    for node in data["elements"]["nodes"]:
+        position = node["data"].pop("position", None)
+        if position is not None:
+            node["position"] = {"x": float(position[0]), "y": float(position[1])}
+    return data
+
+
+def view_binary(
+    data: bytes, budget: int, method: str = "sample", positions: Optional[bytes] = None
+) -> bytes:
+    """Reduced view of an encoded graph (see :mod:`abseir.serialization`) and its
+    encoded layout, as cytoscape JSON.
+    """
+    return views_binary(data, [budget], [method], positions)[method, budget]
+
+
+def views_binary(
+    data: bytes,
+    budgets: Sequence[int],
+    methods: Sequence[str] = METHODS,
+    positions: Optional[bytes] = None,
+) -> dict:
+    """Reduced views of an encoded graph and its encoded layout with every method at
+    every budget, as `{(method, budget): cytoscape JSON}` (see :func:`view_binary`).
+    The graph is only decoded once.
+    """
+    graph = serialization.loads(data)
+    coordinates = layout.from_bytes(positions) if positions is not None else None
+    return {
+        (method, budget): json.dumps(
+            to_cytoscape(reduce(graph, budget, method, coordinates))
+        ).encode("utf-8")
+        for method in methods
+        for budget in budgets
+    }
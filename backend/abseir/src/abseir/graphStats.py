@@ -1,24 +1,13 @@
-import networkx as nx
+"""
+Prints the metrics (degree distribution, clustering coefficient, eccentricity, ...) of
+graph files.
 
-# import matplotlib.pyplot as plt
+Equivalent to `python -m abseir.metrics [FILES ...]`; see :mod:`abseir.metrics`.
+"""
 
-n, k, d = 1500, 43, 3
+import sys
 
-# Read from file if exists
-path = "graphs/wattsstrogatz_n{n}-k{k}-d{d}.edgelist".format(n=n, k=k, d=d)
-g = []
-g = nx.read_edgelist(path, nodetype=int)
-print(
-    "Read graph from '%s' with %d nodes, %d edges."
-    % (path, g.number_of_nodes(), g.number_of_edges())
-)
+from abseir import metrics
 
-cc = nx.average_clustering(g)
-print("Global Clustering Coefficient: ", cc)
-
-nx.draw_circular(g, width=0.015, node_size=1)
-
-# figmng = plt.get_current_fig_manager()
-# figmng.resize(1080, 1080)
-
-# plt.show()
+if __name__ == "__main__":
+    metrics.main(sys.argv[1:])
@@ -0,0 +1,225 @@
+"""
+Content-addressed cache for generated graphs.
+
+Graphs are keyed by their generator's name and the identifiers they were generated
+with (e.g. `order`, `jumps`, `degree`, `diameter`, `seed`), and are stored as `*.csr`
+files (see :mod:`abseir.csr`) in a size-bounded, least-recently-used directory.
+Recently used graphs are also memoized in-process.
+
+Generators opt in with the :func:`cached` decorator:
+```
+@cached(version=1)
+def complete_graph(order: int) -> Graph:
+    ...
+
+complete_graph.csr(1000)  # The cached, read-only CSR graph
+complete_graph(1000)  # A new networkx graph converted from it
+```
+
+The cache directory is `graph.cache.directory` of the configuration, or the
+`ABSEIR_GRAPH_CACHE` environment variable, and defaults to a per-user cache directory
+(see :func:`user_cache_directory`), never the working directory.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Optional, Union
+
+from abseir import config
+from abseir.csr import EXTENSION, CSRGraph, encode_identifiers
+from abseir.log_handler import logging as log
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+class GraphCache:
+    """Two-level graph cache: an in-process memo of up to `memo_size` graphs in front of
+    a directory of up to `max_size` bytes of `*.csr` files.
+
+    Either level can be disabled by setting `directory` to `None`/`memo_size` to `0`.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[PathLike] = None,
+        max_size: int = 2**30,
+        memo_size: int = 8,
+    ):
+        self.directory = directory
+        self.max_size = max_size
+        self.memo_size = memo_size
+        self._memo = OrderedDict()  # type: OrderedDict[str, CSRGraph]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(name: str, identifiers: dict, version: int = 0) -> str:
+        """Content address of the graph generated by `name` with `identifiers`."""
+        canonical = json.dumps(
+            [name, version, encode_identifiers(identifiers)],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+    def path(self, key: str) -> Optional[str]:
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, key + EXTENSION)
+
+    def get(self, key: str) -> Optional[CSRGraph]:
+        """Returns the cached graph for `key`, or `None` on a cache miss."""
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+        path = self.path(key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            graph = CSRGraph.load(path)
+            # Mark as recently used for eviction
+            os.utime(path)
+        except (OSError, ValueError) as error:
+            log.error(f"Failed to read cached graph '{path}': {error}")
+            return None
+
+        self._memoize(key, graph)
+        return graph
+
+    def put(self, key: str, graph: CSRGraph):
+        """Caches `graph` under `key`, evicting least-recently-used graphs if needed."""
+        path = self.path(key)
+        if path is not None:
+            try:
+                os.makedirs(self.directory, exist_ok=True)  # type: ignore
+                # Write to a temporary file first so readers never see partial files
+                descriptor, temporary_path = tempfile.mkstemp(
+                    suffix=".tmp", dir=self.directory
+                )
+                os.close(descriptor)
+                graph.save(temporary_path)
+                os.replace(temporary_path, path)
+                self.evict()
+            except OSError as error:
+                log.error(f"Failed to cache graph '{path}': {error}")
+        self._memoize(key, graph)
+
+    def evict(self):
+        """Deletes least-recently-used graph files until the directory fits `max_size`."""
+        if self.directory is None:
+            return
+        entries = []
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if entry.name.endswith(EXTENSION):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Empties both cache levels."""
+        with self._lock:
+            self._memo.clear()
+        if self.directory is not None and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(EXTENSION):
+                    os.remove(os.path.join(self.directory, name))
+
+    def _memoize(self, key: str, graph: CSRGraph):
+        if self.memo_size <= 0:
+            return
+        with self._lock:
+            self._memo[key] = graph
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+
+def user_cache_directory() -> str:
+    """Per-user directory of cached graphs: under `%LOCALAPPDATA%` on Windows, and
+    `$XDG_CACHE_HOME` (`~/.cache` by default) elsewhere.
+    """
+    if sys.platform == "win32" and os.getenv("LOCALAPPDATA"):
+        base = os.environ["LOCALAPPDATA"]
+    else:
+        base = os.getenv("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+    return os.path.join(base, "abseir", "graphs")
+
+
+def _default_cache() -> GraphCache:
+    settings = config.settings["graph"].get("cache", {})
+    if not settings.get("enabled", True):
+        return GraphCache(directory=None, memo_size=0)
+    directory = (
+        os.getenv("ABSEIR_GRAPH_CACHE")
+        or settings.get("directory")
+        or user_cache_directory()
+    )
+    return GraphCache(
+        directory=directory,
+        max_size=settings.get("max_size", 2**30),
+        memo_size=settings.get("memo_size", 8),
+    )
+
+
+graph_cache = _default_cache()
+
+
+def cached(version: int = 0, cache: Optional[GraphCache] = None):
+    """Decorator that caches the graphs returned by a generator function.
+
+    The cache key is the generator's name, `version` (bump it whenever the generator's
+    output changes for the same arguments) and its bound arguments.
+
+    The decorated function's `.csr(*args, **kwargs)` attribute returns the (immutable)
+    cached :class:`~abseir.csr.CSRGraph` itself, which is all that callers that only
+    read the graph (e.g. serialization, metrics, simulations) need. Calling the
+    decorated function converts it to a new networkx graph each time, for callers that
+    modify it. Generators may return either a networkx graph or a `CSRGraph`; the
+    latter avoids building a networkx graph at all when only `.csr()` is used.
+    """
+
+    def decorator(generator: Callable):
+        signature = inspect.signature(generator)
+        name = f"{generator.__module__}.{generator.__qualname__}"
+
+        def lookup(*args, **kwargs) -> CSRGraph:
+            store = cache or graph_cache
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            key = store.key(name, dict(arguments.arguments), version)
+
+            graph = store.get(key)
+            if graph is None:
+                graph = CSRGraph.from_graph(generator(*args, **kwargs))
+                store.put(key, graph)
+            return graph
+
+        @wraps(generator)
+        def wrapper(*args, **kwargs):
+            # Converted, so callers may freely modify it (use `.csr()` otherwise)
+            return lookup(*args, **kwargs).to_networkx()
+
+        wrapper.csr = lookup  # type: ignore
+        return wrapper
+
+    return decorator
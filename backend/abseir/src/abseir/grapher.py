@@ -12,15 +12,19 @@ Reads a graph file (`*.adjlist`) from the configured directory according to para
 if it exists, or generates and writes a new one if not.
 """
 
-import json
+import inspect
 import random
 from functools import wraps
-from typing import Callable, Union
+from typing import Callable, Optional, Union
 
 import networkx as nx
 import numpy as np
 
+from abseir import serialization
+from abseir.csr import CSRGraph, sorted_unique
+from abseir.graph_cache import cached
 from abseir.log_handler import logging as log
+from abseir.rewiring import DiameterBound, EdgePool, is_bridge
 
 
 # TODO: remove this once logging is fixed
@@ -63,78 +67,181 @@ class Graph(nx.Graph):
     def __str__(self):
         return self.__repr__()
 
-    def to_binary(self):
-        """Converts the graph into an adjacency list file format
-        (:func:`~networkx.generate_adjlist`) and encodes it into ASCII data.
+    def to_binary(self, compression: str = serialization.DEFAULT_COMPRESSION):
+        """Encodes the graph into compact binary data (see :mod:`abseir.serialization`),
+        which can be decoded with :func:`~abseir.serialization.loads`.
         """
-        # return "\n".join(list(nx.generate_adjlist(self))).encode("ascii")
-        return json.dumps(nx.cytoscape_data(self)).encode("ascii")
+        return serialization.dumps(self, compression)
+
+    def to_cytoscape(self):
+        """Converts the graph into cytoscape JSON (:func:`~networkx.cytoscape_data`)
+        and encodes it into ASCII data.
+        """
+        return serialization.to_cytoscape(self)
 
 
 def randomizable(generator: Callable):
-    """Decorator that initializes a graph's `seed` parameter if it is not provided. Should be"""
+    """Decorator that initializes a graph's `seed` parameter if it is not provided,
+    so that every generated graph can be reproduced (and cached) from its identifiers.
+    """
+    signature = inspect.signature(generator)
+
+    def with_random_seed(function: Callable):
+        @wraps(function)
+        def randomize_seed(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs)
+            if arguments.arguments.get("seed") is None:
+                arguments.arguments["seed"] = np.random.randint(-(2**31), 2**31 - 1)
 
-    @wraps(generator)
-    def randomize_seed(*_, **kwargs):
-        if kwargs["seed"] is None:
-            kwargs["seed"] = np.random.randint(-(2**31), 2**31 - 1)
+            # Return graph to caller function
+            return function(*arguments.args, **arguments.kwargs)
 
-    # Return graph to caller function
+        return randomize_seed
+
+    randomize_seed = with_random_seed(generator)
+    # Also randomize the seed of cached generators' `.csr()` (see `graph_cache.cached`)
+    if hasattr(generator, "csr"):
+        randomize_seed.csr = with_random_seed(generator.csr)  # type: ignore
     return randomize_seed
 
 
+def complete_edges(order: int) -> np.ndarray:
+    """`(order * (order - 1) / 2, 2)` array of every edge `(u, v)` with `u < v` between
+    `order` nodes.
+    """
+    return np.column_stack(np.triu_indices(order, k=1))
+
+
+def circulant_edges(
+    order: int, jumps: Union[range, set[int], list[int], int]
+) -> np.ndarray:
+    """`(number_of_edges, 2)` array of the edges `(node, node ± jump)` of a circulant
+    graph, each edge once with `u < v` (see :func:`circulant_graph`).
+    """
+    if isinstance(jumps, int):
+        jumps = range(1, jumps + 1, 1)
+
+    # `node - jump` is `node + (order - jump)`, which is the same edge as
+    # `node' + jump` from `node' = node - jump`, so only forward jumps are needed
+    nodes = np.arange(order, dtype=np.int64)
+    offsets = np.asarray(sorted(set(jumps)), dtype=np.int64).reshape(-1) % order
+    targets = (nodes[:, np.newaxis] + offsets[np.newaxis, :]) % order
+    sources = np.broadcast_to(nodes[:, np.newaxis], targets.shape)
+
+    # Deduplicate edges by a single sortable key (also drops self-loops from jumps
+    # that are multiples of `order`)
+    keys = np.minimum(sources, targets) * order + np.maximum(sources, targets)
+    keys = sorted_unique(keys[sources != targets])
+    return np.column_stack(np.divmod(keys, order))
+
+
+@cached(version=2)
 def complete_graph(order: int) -> Graph:
     """Connects each of `order` nodes to every other node.
-    This raw function is much faster than using `nx.complete_graph(n).edges()`.
-    Like, around 100 seconds faster (~120s to ~20s) for n = 5000.
     (https://en.wikipedia.org/wiki/Complete_graph)
-    """
-
-    graph = Graph(order=order)
 
-    for i in range(order - 1):
-        for j in range(i + 1, order):
-            graph.add_edge(i, j)
-    return graph
+    The edges are built as arrays (see :func:`complete_edges`) instead of with Python
+    loops. Use `complete_graph.csr(order)` to get the graph as a
+    :class:`~abseir.csr.CSRGraph` without materializing a networkx graph.
+    """
+    return CSRGraph.from_edges(
+        order, complete_edges(order), identifiers={"order": order}
+    )
 
 
 # def circulant_graph(order: int, jumps: range | set[int] | list[int] | int) -> Graph: # python 3.10
+@cached(version=2)
 def circulant_graph(order: int, jumps: Union[range, set[int], list[int], int]) -> Graph:
     """A graph where each vertex has the same number of neighbors;
     i.e. every vertex has the same degree or valency.
     (https://en.wikipedia.org/wiki/Circulant_graph)
-    """
 
+    The edges are built as arrays (see :func:`circulant_edges`). Use
+    `circulant_graph.csr(order, jumps)` to get the graph as a
+    :class:`~abseir.csr.CSRGraph` without materializing a networkx graph.
+    """
     if isinstance(jumps, int):
         jumps = range(1, jumps + 1, 1)
-    elif isinstance(jumps, list):
-        jumps = set(jumps)
-
-    graph = Graph(order=order, jumps=set(jumps))
-    # TODO: This can likely be optimized to not add duplicate edges by only
-    # going up to a certain node index depending on the highest jump value
-    graph.add_edges_from(
-        set(
-            [
-                (node, to(node, jump))
-                for node in range(order)
-                for jump in jumps
-                for to in (
-                    lambda node, jump: (node + jump) % order,
-                    lambda node, jump: (node - jump) % order,
-                )
-            ]
-        )
+
+    return CSRGraph.from_edges(
+        order,
+        circulant_edges(order, jumps),
+        identifiers={"order": order, "jumps": set(jumps)},
     )
-    # assert 0
 
-    return graph
 
+def _is_circulant_edge(u: int, v: int, order: int, max_jump: int) -> bool:
+    """Whether `(u, v)` is an edge of the circulant graph with jumps `1..max_jump`."""
+    distance = (v - u) % order
+    return min(distance, order - distance) <= max_jump
+
+
+def _random_non_edge(
+    graph: nx.Graph, rng: random.Random, max_jump: int, max_attempts: int = 64
+) -> Optional[tuple[int, int]]:
+    """Samples a uniformly random pair of nodes that is neither an edge of `graph` nor
+    an edge of its original circulant graph (with jumps `1..max_jump`), by rejection.
 
-# TODO: Add optional graph arguments (complete, circulant) for function to use
-# instead of creating new ones
-# TODO: Save any generated complete/circulant graphs if they are not provided
+    Uses `graph`'s adjacency hash for membership tests, so the complete set of
+    candidate edges never has to be materialized. Returns `None` after `max_attempts`
+    rejected pairs, i.e. once `graph` is too dense for rejection sampling to be cheap.
+    """
+    order = len(graph)
+    for _ in range(max_attempts):
+        u, v = rng.randrange(order), rng.randrange(order)
+        if (
+            u != v
+            and not _is_circulant_edge(u, v, order, max_jump)
+            and not graph.has_edge(u, v)
+        ):
+            return (u, v) if u < v else (v, u)
+    return None
+
+
+def _node_non_edge(
+    graph: nx.Graph, rng: random.Random, max_jump: int
+) -> tuple[int, int]:
+    """Samples a uniformly random pair of nodes that is neither an edge of `graph` nor
+    an edge of its original circulant graph (with jumps `1..max_jump`), for graphs too
+    dense for :func:`_random_non_edge`. At least one such pair must exist.
+
+    Picks a node with probability proportional to its number of candidate partners (by
+    rejection against the most any node can have), then one of them uniformly from the
+    complement of the node's sorted excluded neighbors. Each attempt costs `O(degree)`,
+    and the set of candidate edges is never materialized.
+    """
+    order = len(graph)
+    offsets = np.unique(
+        np.concatenate([np.arange(1, max_jump + 1), -np.arange(1, max_jump + 1)])
+        % order
+    )
+    offsets = offsets[offsets != 0]
+    most = order - 1 - len(offsets)
+    while True:
+        u = rng.randrange(order)
+        excluded = np.unique(
+            np.concatenate(
+                [
+                    np.fromiter(graph.adj[u], dtype=np.int64),
+                    (u + offsets) % order,
+                    [u],
+                ]
+            )
+        )
+        candidates = order - len(excluded)
+        if candidates <= 0 or rng.random() * most >= candidates:
+            continue
+        # The `k`th node not in `excluded` is `k` plus the number of excluded nodes
+        # before it
+        k = rng.randrange(candidates)
+        v = k + int(np.searchsorted(excluded - np.arange(len(excluded)), k, "right"))
+        return (u, v) if u < v else (v, u)
+
+
+# TODO: Add optional circulant graph argument for function to use
+# instead of creating a new one
 @randomizable
+@cached(version=5)
 def modified_watts_strogatz_graph(
     # order: int, degree: int, diameter: int, seed: int | None = None # python 3.10
     order: int,
@@ -144,64 +251,83 @@ def modified_watts_strogatz_graph(
 ) -> Graph:
     """Decent small-world model with low diameter and high clustering.
     (https://en.wikipedia.org/wiki/Watts%E2%80%93Strogatz_model)
+
+    New edges are sampled by rejection against the graph's adjacency, so memory usage
+    is `O(order * degree)` instead of `O(order^2)`.
     """
     # Seed rng
-    random.seed(seed)
-
-    # Keep track of what edges we will randomly choose from.
-    # Start with a complete list of all possible edges.
-    log.info("Watts-Strogatz generation requires a complete graph.")
-    new_edges = complete_graph(order)
+    rng = random.Random(seed)
 
     # Generate a circulant graph with `order` nodes, `degree` neighbors
     log.info("Watts-Strogatz generation requires a circulant graph.")
-    circulant = circulant_graph(order, degree // 2)
-
-    # Remove the circulant graph edges from our complete set of remaining edges to choose from
-    new_edges.remove_edges_from(circulant.edges())
-    new_edges = np.asarray(new_edges.edges()).tolist()  # type: ignore
-
-    # Clone the circulant_graph to a separate, independent graph graph
-    graph = nx.compose(Graph(), circulant)  # type: Graph
-
-    # Remove bridges so graph cannot become disconnected
-    replaceable_edges = circulant
-    replaceable_edges.remove_edges_from(nx.bridges(replaceable_edges))
+    max_jump = degree // 2
+    # The cached graph itself (read-only), instead of a converted networkx copy
+    circulant_edges_list = list(circulant_graph.csr(order, max_jump).edges())
+
+    # Build the graph to rewire from the circulant graph's edges
+    graph = Graph(order=order, degree=degree, diameter=diameter, seed=seed)
+    graph.add_nodes_from(range(order))
+    graph.add_edges_from(circulant_edges_list)
+
+    # Number of edges we may randomly choose from: every possible edge that is not
+    # part of the circulant graph
+    edges_total = len(circulant_edges_list)
+    new_edges_total = order * (order - 1) // 2 - edges_total
+
+    # Keep track of which circulant edges we may still replace. An edge is only
+    # replaced if it is not a bridge of the remaining circulant edges, so the graph
+    # cannot become disconnected
+    circulant = nx.Graph()
+    circulant.add_nodes_from(range(order))
+    circulant.add_edges_from(circulant_edges_list)
+    replaceable_edges = EdgePool(circulant_edges_list)
+
+    # Candidate edges are sampled by rejection until the graph becomes too dense,
+    # after which they are sampled per node instead
+    dense = False
 
     # Initializations for edge count statistics
     edges_rewired_count = 0
-    edges_total = len(circulant)
+    edges_last_log = 0
 
-    current_diameter = nx.diameter(graph)
-    edges_last_recalculation = 0
+    # Checks whether the diameter is within our goal without recalculating it,
+    # which is cheap enough to do after every rewired edge
+    diameter_bound = DiameterBound(graph, diameter)
 
     # While the current diameter of the graph is bigger than our goal...
-    while current_diameter > diameter:  # type: ignore
-        # Choose one random edge from our replaceable_edges to replace with one
-        # random edge from our list of remaining edges
-        choice = random.choice(new_edges)
-        edge_removed = random.choice(list(replaceable_edges.edges()))
+    while not diameter_bound.holds():
+        if edges_rewired_count >= new_edges_total or not replaceable_edges:
+            raise ValueError(
+                f"Ran out of edges to rewire before reaching a diameter of {diameter}"
+            )
+
+        # Choose one random edge from our replaceable_edges that is not a bridge
+        # (bridges can never become non-bridges as edges are removed, so they are
+        # discarded for good)
+        edge_removed = replaceable_edges.pop(rng)
+        if is_bridge(circulant, *edge_removed):
+            continue
+
+        # Replace it with one random edge that is not in the graph (and never was)
+        choice = None if dense else _random_non_edge(graph, rng, max_jump)
+        if choice is None:
+            dense = True
+            choice = _node_non_edge(graph, rng, max_jump)
 
         # Replace the edge in our watts-strogatz graph
         graph.remove_edge(*edge_removed)
         graph.add_edge(choice[0], choice[1])
 
-        # Remove the randomly chosen edges from our lists so we don't pick them again
-        replaceable_edges.remove_edge(*edge_removed)
-        new_edges.remove(choice)
+        # Remove the replaced edge from the remaining circulant edges
+        # (`choice` is now an edge of `graph`, so it will be rejected from now on)
+        circulant.remove_edge(*edge_removed)
 
         # Increment edges-rewired count
         edges_rewired_count += 1
 
-        # Remove bridges
-        replaceable_edges.remove_edges_from(nx.bridges(replaceable_edges))
-
-        # Recalculate diameter only if % edges rewired changes by at least 1%.
-        # TODO: Dynamically determine this value by the last calculated diameter?
-        # TODO: Calculate min edges before next check using `0.01 * edges_total`
-        if (edges_rewired_count - edges_last_recalculation) / edges_total >= 0.01:
-            current_diameter = nx.diameter(graph)
-            edges_last_recalculation = edges_rewired_count
+        # Log progress every time % edges rewired changes by at least 1%
+        if edges_rewired_count - edges_last_log >= 0.01 * edges_total:
+            edges_last_log = edges_rewired_count
 
             percent_edges_rewired = 100 * edges_rewired_count / edges_total
             log.debug(
@@ -210,7 +336,8 @@ def modified_watts_strogatz_graph(
                         "Watts-Strogatz Graph Generation:"
                         f" {percent_edges_rewired:.2f}% ",
                         f"({edges_rewired_count} of {edges_total}: ",
-                        f"diameter = {current_diameter})",
+                        f"diameter > {diameter}, ",
+                        f"{diameter_bound.full_checks} full diameter checks)",
                     ]
                 )
             )
@@ -226,9 +353,36 @@ def modified_watts_strogatz_graph(
             ]
         )
     )
+    # (imported here since `abseir.metrics` depends on this module)
+    from abseir import metrics  # pylint: disable=import-outside-toplevel
+
+    # Clustering is only estimated for graphs too large to compute it exactly
+    csr_graph = CSRGraph.from_graph(graph)
+    if metrics.wedges(csr_graph) > metrics.EXACT_WEDGES:
+        clustering = f"~{metrics.approximate_clustering(csr_graph, seed=seed):.4f}"
+    else:
+        clustering = f"{metrics.clustering(csr_graph):.4f}"
     log.info(
         "Watts-Strogatz Graph Generation: Mean clustering coefficient:"
-        f" {nx.average_clustering(graph):.4f}."
+        f" {clustering}."
     )
 
     return graph
+
+
+# Generators by the name of the graphs they generate
+GENERATORS = {
+    "complete": complete_graph,
+    "circulant": circulant_graph,
+    "wattsstrogatz": modified_watts_strogatz_graph,
+}
+
+
+def generate_binary(
+    generator: str, compression: str = serialization.DEFAULT_COMPRESSION, **arguments
+) -> bytes:
+    """Generates a graph with `GENERATORS[generator](**arguments)` and encodes it
+    (see :mod:`abseir.serialization`), without materializing a networkx graph where
+    possible. Meant to be run in worker processes.
+    """
+    return serialization.dumps(GENERATORS[generator].csr(**arguments), compression)
@@ -0,0 +1,281 @@
+"""
+Implicit graphs whose edges follow from a formula, so they are never stored.
+
+:class:`CompleteGraph` and :class:`CirculantGraph` answer the networkx-like queries used
+by simulations and statistics (`nodes`, `neighbors`, `adj`, `degree`,
+`number_of_edges`, ...) analytically in `O(1)` memory. Edges are only materialized
+when a graph is explicitly converted:
+```
+graph = CompleteGraph(50_000)
+graph.number_of_edges()  # 1249975000, without storing any of them
+small = CompleteGraph(100).to_networkx()
+```
+"""
+
+from collections.abc import Mapping
+from typing import Iterable, Iterator, Optional, Union
+
+import networkx as nx
+import numpy as np
+
+from abseir import serialization
+from abseir.csr import CSRGraph
+from abseir.grapher import circulant_edges, complete_edges
+
+
+class _ImplicitGraph:
+    """Shared interface of implicit graphs with nodes `0..order - 1` where every node has
+    the same degree. Subclasses define :meth:`_neighbors`, :meth:`has_edge`,
+    :attr:`node_degree` and :meth:`edge_array`.
+    """
+
+    node_degree = 0
+
+    def __init__(self, order: int, **identifiers):
+        if order < 0:
+            raise ValueError(f"Order must be non-negative (got {order})")
+        self.order = order
+        self.identifiers = {"order": order, **identifiers}
+        self.name = ""
+
+    def __repr__(self):
+        arguments = ", ".join(
+            f"{key}={value!r}" for key, value in self.identifiers.items()
+        )
+        return f"{type(self).__name__}({arguments})"
+
+    def __len__(self):
+        return self.order
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.order))
+
+    def __contains__(self, node) -> bool:
+        return isinstance(node, (int, np.integer)) and 0 <= node < self.order
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.identifiers == other.identifiers
+
+    def __hash__(self):
+        return hash((type(self), repr(self)))
+
+    # networkx-like interface
+
+    def number_of_nodes(self) -> int:
+        return self.order
+
+    def number_of_edges(self) -> int:
+        return self.order * self.node_degree // 2
+
+    def nodes(self) -> range:
+        return range(self.order)
+
+    def neighbors(self, node: int) -> Iterator[int]:
+        return iter(self.adj[node])
+
+    @property
+    def adj(self) -> "_Adjacency":
+        """Read-only mapping from each node to a (lazy) collection of its neighbors,
+        like :attr:`networkx.Graph.adj`.
+        """
+        return _Adjacency(self)
+
+    @property
+    def degree(self) -> Iterator[tuple[int, int]]:
+        """`(node, degree)` pairs, like :attr:`networkx.Graph.degree`."""
+        return ((node, self.node_degree) for node in range(self.order))
+
+    def degrees(self) -> np.ndarray:
+        """Degree of every node, in node order."""
+        return np.full(self.order, self.node_degree, dtype=np.int64)
+
+    def edges(self) -> Iterator[tuple[int, int]]:
+        """Each edge `(u, v)` once, with `u < v`."""
+        return ((u, v) for u in range(self.order) for v in self._neighbors(u) if u < v)
+
+    def has_edge(self, u, v) -> bool:
+        raise NotImplementedError
+
+    def edge_array(self) -> np.ndarray:
+        """`(number_of_edges, 2)` array of every edge, each once with `u < v`."""
+        raise NotImplementedError
+
+    def _neighbors(self, node: int) -> Iterable[int]:
+        raise NotImplementedError
+
+    # Conversions
+
+    def to_csr(self) -> CSRGraph:
+        """Materializes every edge as a :class:`~abseir.csr.CSRGraph`."""
+        return CSRGraph.from_edges(
+            self.order, self.edge_array(), identifiers=self.identifiers, name=self.name
+        )
+
+    def to_networkx(self, graph_class: Optional[type] = None) -> nx.Graph:
+        """Materializes every edge as a `graph_class` instance
+        (:class:`~abseir.grapher.Graph` by default).
+        """
+        return self.to_csr().to_networkx(graph_class)
+
+    def to_binary(self, compression: str = serialization.DEFAULT_COMPRESSION) -> bytes:
+        """Serializes the graph like :meth:`abseir.grapher.Graph.to_binary`."""
+        return serialization.dumps(self, compression)
+
+
+class _Adjacency(Mapping):
+    def __init__(self, graph: _ImplicitGraph):
+        self._graph = graph
+
+    def __getitem__(self, node) -> Iterable[int]:
+        if node not in self._graph:
+            raise KeyError(node)
+        return self._graph._neighbors(node)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._graph)
+
+    def __len__(self) -> int:
+        return len(self._graph)
+
+
+class _OtherNodes:
+    """Every node of `0..order - 1` except `node`, without storing them."""
+
+    def __init__(self, order: int, node: int):
+        self.order = order
+        self.node = node
+
+    def __len__(self):
+        return self.order - 1
+
+    def __iter__(self) -> Iterator[int]:
+        yield from range(self.node)
+        yield from range(self.node + 1, self.order)
+
+    def __contains__(self, other) -> bool:
+        return (
+            isinstance(other, (int, np.integer))
+            and 0 <= other < self.order
+            and other != self.node
+        )
+
+
+class CompleteGraph(_ImplicitGraph):
+    """Implicit complete graph on `order` nodes, where every node neighbors every other
+    node (see :func:`~abseir.grapher.complete_graph`).
+    """
+
+    def __init__(self, order: int):
+        super().__init__(order)
+        self.node_degree = max(order - 1, 0)
+
+    def has_edge(self, u, v) -> bool:
+        return u in self and v in self and u != v
+
+    def edge_array(self) -> np.ndarray:
+        return complete_edges(self.order)
+
+    def _neighbors(self, node: int) -> _OtherNodes:
+        return _OtherNodes(self.order, node)
+
+    def average_clustering(self) -> float:
+        return 1.0 if self.order >= 3 else 0.0
+
+    def distance_distribution(self) -> list[int]:
+        """Number of nodes at each distance from any node, starting from distance `0`."""
+        return [1, self.order - 1] if self.order >= 2 else [1] * self.order
+
+    def diameter(self) -> int:
+        return 1 if self.order >= 2 else 0
+
+    def number_connected_components(self) -> int:
+        return 1 if self.order else 0
+
+
+class CirculantGraph(_ImplicitGraph):
+    """Implicit circulant graph on `order` nodes, where each node `node` neighbors
+    `node ± jump (mod order)` for every jump in `jumps`
+    (see :func:`~abseir.grapher.circulant_graph`).
+
+    Circulant graphs are vertex-transitive, so statistics that are the same for every
+    node (clustering, eccentricity) only need to be computed for node `0`.
+    """
+
+    def __init__(self, order: int, jumps: Union[range, set[int], list[int], int]):
+        if isinstance(jumps, int):
+            jumps = range(1, jumps + 1, 1)
+        super().__init__(order, jumps=set(jumps))
+
+        # Equivalent jumps in `1..order // 2` (e.g. `-1` and `order - 1` are both `1`)
+        offsets = set()
+        for jump in jumps if order else ():
+            jump %= order
+            offsets.add(min(jump, order - jump))
+        offsets.discard(0)
+        self.offsets = sorted(offsets)
+        self.node_degree = len(self._neighbors(0)) if order else 0
+
+    def has_edge(self, u, v) -> bool:
+        if u not in self or v not in self:
+            return False
+        distance = (v - u) % self.order
+        return min(distance, self.order - distance) in self.offsets
+
+    def edge_array(self) -> np.ndarray:
+        return circulant_edges(self.order, self.offsets)
+
+    def _neighbors(self, node: int) -> list[int]:
+        neighbors = set()
+        for offset in self.offsets:
+            neighbors.add((node + offset) % self.order)
+            neighbors.add((node - offset) % self.order)
+        return sorted(neighbors)
+
+    def average_clustering(self) -> float:
+        """Clustering coefficient of node `0` (and so of every node)."""
+        neighbors = self._neighbors(0)
+        if len(neighbors) < 2:
+            return 0.0
+        links = sum(
+            self.has_edge(u, v)
+            for i, u in enumerate(neighbors)
+            for v in neighbors[i + 1 :]
+        )
+        return 2 * links / (len(neighbors) * (len(neighbors) - 1))
+
+    def distance_distribution(self) -> list[int]:
+        """Number of nodes at each distance from node `0` (and so from every node),
+        starting from distance `0`. Only counts nodes reachable from node `0`.
+        """
+        if self.order == 0:
+            return []
+        counts, visited, frontier = [1], {0}, [0]
+        while True:
+            next_frontier = []
+            for node in frontier:
+                for neighbor in self._neighbors(node):
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                return counts
+            counts.append(len(next_frontier))
+            frontier = next_frontier
+
+    def diameter(self) -> float:
+        """Eccentricity of node `0` (and so of every node), or infinity if the graph is
+        disconnected.
+        """
+        if self.order <= 1:
+            return 0
+        counts = self.distance_distribution()
+        return len(counts) - 1 if sum(counts) == self.order else float("inf")
+
+    def number_connected_components(self) -> int:
+        """Nodes are connected by the multiples of `gcd(order, *offsets)`."""
+        if not self.offsets:
+            return self.order
+        return int(np.gcd.reduce([self.order, *self.offsets]))
+
+
+ImplicitGraph = Union[CompleteGraph, CirculantGraph]
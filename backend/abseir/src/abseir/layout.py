@@ -0,0 +1,119 @@
+"""
+Node layouts (2D coordinates) for drawing graphs, computed ahead of time so that
+renderers (e.g. the frontend) do not have to lay graphs out themselves.
+
+Layouts are `(order, 2)` float32 arrays of `(x, y)` coordinates in `[-1, 1]`, in node
+order, and are stored as their raw little-endian bytes:
+```
+positions = layout.compute(graph, "force")
+data = layout.to_bytes(positions)
+```
+"""
+
+from typing import Any
+
+import numpy as np
+
+from abseir import serialization
+from abseir.csr import CSRGraph
+
+METHODS = ("circular", "force")
+
+# Nodes whose repulsion is calculated at once (bounds memory usage of force layouts)
+_BLOCK_SIZE = 4096
+
+
+def circular_layout(order: int) -> np.ndarray:
+    """Nodes evenly spaced on the unit circle, in node order. Draws circulant graphs
+    (and complete graphs) symmetrically without any computation.
+    """
+    angles = 2 * np.pi * np.arange(order) / max(order, 1)
+    return np.column_stack([np.cos(angles), np.sin(angles)]).astype(np.float32)
+
+
+def force_layout(
+    graph: Any, iterations: int = 50, samples: int = 256, seed: int = 0
+) -> np.ndarray:
+    """Fruchterman-Reingold force-directed layout, starting from the circular layout.
+
+    Edges attract their nodes, and every node repels a random sample of `samples` nodes
+    per iteration (scaled up to approximate repelling all of them), so each iteration
+    costs `O(order * samples + edges)` instead of `O(order^2)`.
+    """
+    graph = CSRGraph.from_graph(graph)
+    order = graph.number_of_nodes()
+    positions = circular_layout(order).astype(np.float64)
+    if order < 3:
+        return positions.astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    edges = graph.edge_array().astype(np.int64)
+    samples = min(samples, order)
+    # Ideal distance between nodes when spread over the `[-1, 1]` square
+    distance = 2 / np.sqrt(order)
+    temperature = 0.1
+
+    for iteration in range(iterations):
+        displacement = np.zeros_like(positions)
+
+        # Repulsion (`distance^2 / d`) from a random sample of nodes
+        others = positions[rng.choice(order, size=samples, replace=False)]
+        for start in range(0, order, _BLOCK_SIZE):
+            block = positions[start : start + _BLOCK_SIZE]
+            delta = block[:, np.newaxis, :] - others[np.newaxis, :, :]
+            squared = np.maximum(np.einsum("ijk,ijk->ij", delta, delta), 1e-9)
+            displacement[start : start + _BLOCK_SIZE] += np.einsum(
+                "ijk,ij->ik", delta, distance**2 / squared
+            )
+        displacement *= order / samples
+
+        # Attraction (`d^2 / distance`) along edges
+        delta = positions[edges[:, 0]] - positions[edges[:, 1]]
+        forces = delta * (np.linalg.norm(delta, axis=1) / distance)[:, np.newaxis]
+        for axis in range(2):
+            displacement[:, axis] -= np.bincount(
+                edges[:, 0], forces[:, axis], minlength=order
+            )
+            displacement[:, axis] += np.bincount(
+                edges[:, 1], forces[:, axis], minlength=order
+            )
+
+        # Move nodes at most `temperature`, which cools down linearly
+        lengths = np.maximum(np.linalg.norm(displacement, axis=1), 1e-9)
+        step = temperature * (1 - iteration / iterations)
+        positions += displacement * (np.minimum(lengths, step) / lengths)[:, np.newaxis]
+
+    return _normalize(positions).astype(np.float32)
+
+
+def _normalize(positions: np.ndarray) -> np.ndarray:
+    """Centers and scales positions to fit in `[-1, 1]`."""
+    positions = positions - positions.mean(axis=0)
+    scale = np.abs(positions).max()
+    return positions / scale if scale > 0 else positions
+
+
+def compute(graph: Any, method: str = "force", **kwargs) -> np.ndarray:
+    """Lays out `graph` (a networkx, CSR or implicit graph) with `method`
+    (one of `METHODS`).
+    """
+    if method == "circular":
+        return circular_layout(graph.number_of_nodes())
+    if method == "force":
+        return force_layout(graph, **kwargs)
+    raise ValueError(f"Unknown layout method '{method}' (expected {METHODS})")
+
+
+def to_bytes(positions: np.ndarray) -> bytes:
+    return np.ascontiguousarray(positions, dtype="<f4").tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<f4").reshape(-1, 2)
+
+
+def layout_binary(data: bytes, method: str = "force") -> bytes:
+    """Lays out an encoded graph (see :mod:`abseir.serialization`) and returns the
+    layout's bytes. Meant to be run in worker processes.
+    """
+    return to_bytes(compute(serialization.loads(data), method))
@@ -0,0 +1,463 @@
+"""
+Structural metrics of graphs, computed once and stored alongside them (e.g. the API's
+`Graph.metrics` field) instead of being recomputed wherever they are needed:
+```
+metrics.compute(graph)
+# {"order": 1500, "edges": 31500, "mean_degree": 42.0,
+#  "degree_distribution": {"42": 1500}, "clustering": 0.73,
+#  "eccentricity": {"radius": 3, "diameter": 3, "mean": 3.0},
+#  "path_lengths": {"mean": 2.4, "distribution": {"1": 0.03, "2": 0.54, ...}},
+#  "components": 1, "estimate": None}
+```
+
+Metrics are computed on CSR arrays with NumPy, and analytically for implicit graphs
+(see :mod:`abseir.implicit`). Exact clustering takes `O(sum(degree^2))` and exact
+distances `O(order * edges)`, so past `EXACT_WEDGES`/`EXACT_DISTANCE_WORK` they are
+estimated instead (see `estimate` in the metrics):
+
+* clustering by sampling random wedges, within `error` with probability `confidence`
+  (Hoeffding's inequality)
+* the diameter by double sweeps, which bound it from below and above
+* eccentricities and path lengths by breadth-first searches from sampled nodes
+
+Breadth-first searches are split in chunks across `workers` processes.
+Print the metrics of a graph file with:
+```
+python -m abseir.metrics graphs/wattsstrogatz/wattsstrogatz_n1500_k42_d3_rng0.csr
+```
+"""
+
+import argparse
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Optional
+
+import numpy as np
+
+from abseir import csr, serialization
+from abseir.csr import CSRGraph
+from abseir.implicit import CirculantGraph, CompleteGraph
+
+# Implicit graphs of the generators in `abseir.grapher.GENERATORS`
+IMPLICIT = {"complete": CompleteGraph, "circulant": CirculantGraph}
+
+# Past these amounts of work (wedges, and `order * edges`), `compute()` estimates
+# clustering and distances instead of computing them exactly
+EXACT_WEDGES = 10**8
+EXACT_DISTANCE_WORK = 10**9
+
+# Wedges (pairs of neighbors) checked at once when counting triangles
+_WEDGE_BLOCK_SIZE = 1 << 22
+
+
+def _is_implicit(graph: Any) -> bool:
+    return isinstance(graph, (CompleteGraph, CirculantGraph))
+
+
+def _neighborhoods(graph: CSRGraph, frontier: np.ndarray) -> np.ndarray:
+    """Concatenated neighbors of every node in `frontier`."""
+    starts, ends = graph.indptr[frontier], graph.indptr[frontier + 1]
+    lengths = ends - starts
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return graph.indices[offsets + np.arange(lengths.sum())]
+
+
+def _edge_keys(graph: CSRGraph) -> np.ndarray:
+    """Sorted `u * order + v` key of every edge (`u < v`)."""
+    edges = graph.edge_array().astype(np.int64)
+    return edges[:, 0] * graph.number_of_nodes() + edges[:, 1]
+
+
+def _are_edges(keys: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """Whether each key of `queries` is in the sorted `keys` of :func:`_edge_keys`."""
+    if len(keys) == 0:
+        return np.zeros(queries.shape, dtype=bool)
+    positions = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+    return keys[positions] == queries
+
+
+def hoeffding_samples(error: float, confidence: float) -> int:
+    """Number of samples of a variable in `[0, 1]` for their mean to be within `error`
+    of its expected value with probability `confidence` (Hoeffding's inequality).
+    """
+    return math.ceil(math.log(2 / (1 - confidence)) / (2 * error**2))
+
+
+def degree_distribution(graph: Any) -> dict[int, int]:
+    """Number of nodes of each degree."""
+    degrees, counts = np.unique(graph.degrees(), return_counts=True)
+    return dict(zip(degrees.tolist(), counts.tolist()))
+
+
+def mean_degree(graph: Any) -> float:
+    # Every edge adds 1 to the degree of both of its nodes
+    order = graph.number_of_nodes()
+    return 2 * graph.number_of_edges() / order if order else 0.0
+
+
+def wedges(graph: Any) -> int:
+    """Number of wedges (pairs of neighbors of a node), i.e. the work of exact
+    clustering.
+    """
+    degrees = graph.degrees().astype(np.int64)
+    return int((degrees * (degrees - 1) // 2).sum())
+
+
+def triangles(graph: CSRGraph) -> np.ndarray:
+    """Number of triangles through every node, in node order.
+
+    Checks every wedge of every node against the graph's edges, in
+    `O(sum(degree^2) * log(edges))`.
+    """
+    order = graph.number_of_nodes()
+    degrees = graph.degrees()
+    keys = _edge_keys(graph)
+    counts = np.zeros(order, dtype=np.int64)
+
+    # Nodes of the same degree have the same number of wedges, so their neighbors
+    # form a (rows x degree) matrix
+    for degree in np.unique(degrees[degrees >= 2]).tolist():
+        nodes = np.flatnonzero(degrees == degree)
+        first, second = np.triu_indices(degree, 1)
+        rows = max(1, _WEDGE_BLOCK_SIZE // len(first))
+        for start in range(0, len(nodes), rows):
+            block = nodes[start : start + rows]
+            neighbors = graph.indices[
+                graph.indptr[block][:, np.newaxis] + np.arange(degree)
+            ].astype(np.int64)
+            # Neighbors are sorted, so `first < second` are already an edge's `u < v`
+            queries = neighbors[:, first] * order + neighbors[:, second]
+            counts[block] = _are_edges(keys, queries).sum(axis=1)
+    return counts
+
+
+def clustering(graph: Any) -> float:
+    """Average clustering coefficient (like :func:`networkx.average_clustering`)."""
+    if _is_implicit(graph):
+        return graph.average_clustering()
+    graph = CSRGraph.from_graph(graph)
+    if graph.number_of_nodes() == 0:
+        return 0.0
+    degrees = graph.degrees().astype(np.float64)
+    pairs = degrees * (degrees - 1) / 2
+    coefficients = np.divide(
+        triangles(graph), pairs, out=np.zeros_like(pairs), where=pairs > 0
+    )
+    return float(coefficients.mean())
+
+
+def approximate_clustering(
+    graph: Any, error: float = 0.01, confidence: float = 0.99, seed=None
+) -> float:
+    """Estimates the average clustering coefficient within `error` with probability
+    `confidence`, in `O(log(1 / (1 - confidence)) / error^2)` regardless of the graph's
+    size.
+
+    Checks whether a random wedge of each of `hoeffding_samples()` random nodes is
+    closed: the chance that it is is the node's clustering coefficient, so the closed
+    fraction is an unbiased estimate of their average.
+    """
+    graph = CSRGraph.from_graph(graph)
+    order = graph.number_of_nodes()
+    if order == 0:
+        return 0.0
+    rng = np.random.default_rng(seed)
+    samples = hoeffding_samples(error, confidence)
+
+    # Nodes with less than 2 neighbors have no wedges (a coefficient of 0)
+    nodes = rng.integers(order, size=samples)
+    degrees = graph.degrees()[nodes]
+    nodes, degrees = nodes[degrees >= 2], degrees[degrees >= 2]
+
+    # Two distinct random neighbors of each node, in increasing order
+    first = rng.integers(degrees)
+    second = rng.integers(degrees - 1)
+    second += second >= first
+    first, second = np.minimum(first, second), np.maximum(first, second)
+    u = graph.indices[graph.indptr[nodes] + first].astype(np.int64)
+    v = graph.indices[graph.indptr[nodes] + second].astype(np.int64)
+
+    closed = _are_edges(_edge_keys(graph), u * order + v)
+    return float(closed.sum() / samples)
+
+
+def distances(graph: CSRGraph, source: int) -> np.ndarray:
+    """Distance from `source` to every node (`-1` if unreachable), by breadth-first
+    search over whole frontiers at once.
+    """
+    distance = np.full(graph.number_of_nodes(), -1, dtype=np.int64)
+    distance[source] = 0
+    frontier, level = np.array([source]), 0
+    while len(frontier):
+        level += 1
+        neighbors = _neighborhoods(graph, frontier)
+        frontier = csr.sorted_unique(neighbors[distance[neighbors] < 0])
+        distance[frontier] = level
+    return distance
+
+
+def _distances_from(graph: CSRGraph, sources: np.ndarray) -> tuple:
+    """Eccentricity of every node of `sources`, and the number of nodes (reachable) at
+    each distance from them.
+    """
+    eccentricities = np.zeros(len(sources), dtype=np.int64)
+    histogram = np.zeros(1, dtype=np.int64)
+    for index, source in enumerate(sources.tolist()):
+        distance = distances(graph, source)
+        eccentricities[index] = distance.max()
+        counts = np.bincount(distance[distance >= 0])
+        if len(counts) > len(histogram):
+            histogram = np.pad(histogram, (0, len(counts) - len(histogram)))
+        histogram[: len(counts)] += counts
+    return eccentricities, histogram
+
+
+def distance_statistics(
+    graph: CSRGraph, sources: Optional[np.ndarray] = None, workers: int = 1
+) -> tuple:
+    """Eccentricities of `sources` (every node by default), and the number of nodes at
+    each distance (starting from `0`) from them.
+
+    Breadth-first searches are split in chunks across `workers` processes.
+    """
+    if sources is None:
+        sources = np.arange(graph.number_of_nodes())
+    chunks = np.array_split(sources, max(1, min(len(sources), 4 * workers)))
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_distances_from, repeat(graph), chunks))
+    else:
+        results = [_distances_from(graph, chunk) for chunk in chunks]
+
+    eccentricities = np.concatenate([result[0] for result in results])
+    histogram = np.zeros(max(len(result[1]) for result in results), dtype=np.int64)
+    for _, counts in results:
+        histogram[: len(counts)] += counts
+    return eccentricities, histogram
+
+
+def eccentricities(graph: CSRGraph, sources: Optional[np.ndarray] = None) -> np.ndarray:
+    """Eccentricity (greatest distance to any other node) of every node of `sources`
+    (every node by default). Only meaningful for connected graphs.
+    """
+    return distance_statistics(graph, sources)[0]
+
+
+def diameter_bounds(graph: CSRGraph, sweeps: int = 4, seed=None) -> tuple[int, int]:
+    """Lower and upper bound of the diameter of a connected graph, by `sweeps` double
+    sweeps: the eccentricity of the node farthest from a random node is a lower bound,
+    and twice the eccentricity of any node an upper bound.
+
+    The lower bound is often exact, especially for graphs with low diameter.
+    """
+    order = graph.number_of_nodes()
+    if order <= 1:
+        return 0, 0
+    rng = np.random.default_rng(seed)
+    lower, upper = 0, 2 * order
+    for _ in range(sweeps):
+        distance = distances(graph, int(rng.integers(order)))
+        farthest = distances(graph, int(np.argmax(distance)))
+        for eccentricity in (distance.max(), farthest.max()):
+            lower, upper = max(lower, eccentricity), min(upper, 2 * eccentricity)
+        if lower == upper:
+            break
+    return int(lower), int(upper)
+
+
+def _path_lengths(histogram) -> dict:
+    """Mean and distribution of the lengths of shortest paths (between distinct nodes)
+    counted by `histogram`.
+    """
+    counts = np.asarray(histogram, dtype=np.float64)[1:]
+    total = counts.sum()
+    if total == 0:
+        return {"mean": 0.0, "distribution": {}}
+    return {
+        "mean": float((np.arange(1, len(counts) + 1) * counts).sum() / total),
+        "distribution": {
+            str(length): float(count / total)
+            for length, count in enumerate(counts, 1)
+            if count
+        },
+    }
+
+
+def eccentricity(graph: Any) -> Optional[dict]:
+    """Radius, diameter and mean eccentricity of a connected graph (`None` if the graph
+    is disconnected or empty).
+    """
+    if graph.number_of_nodes() == 0 or components(graph) != 1:
+        return None
+    if _is_implicit(graph):
+        # Every node of a vertex-transitive graph has the same eccentricity
+        diameter = graph.diameter()
+        return {"radius": diameter, "diameter": diameter, "mean": float(diameter)}
+    values = eccentricities(CSRGraph.from_graph(graph))
+    return {
+        "radius": int(values.min()),
+        "diameter": int(values.max()),
+        "mean": float(values.mean()),
+    }
+
+
+def component_labels(graph: CSRGraph) -> np.ndarray:
+    """Label of the connected component of every node (the smallest node index in it),
+    by propagating labels between neighbors until they no longer change.
+    """
+    order = graph.number_of_nodes()
+    labels = np.arange(order)
+    connected = graph.degrees() > 0
+    starts = graph.indptr[:-1][connected]
+    while connected.any():
+        neighbor_minimums = np.minimum.reduceat(labels[graph.indices], starts)
+        updated = labels.copy()
+        updated[connected] = np.minimum(labels[connected], neighbor_minimums)
+        # Jump to the label of the label (pointer jumping) to converge faster
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+    return labels
+
+
+def components(graph: Any) -> int:
+    """Number of connected components."""
+    if _is_implicit(graph):
+        return graph.number_connected_components()
+    graph = CSRGraph.from_graph(graph)
+    return int(len(csr.sorted_unique(component_labels(graph))))
+
+
+def compute(
+    graph: Any,
+    approximate: Optional[bool] = None,
+    error: float = 0.01,
+    confidence: float = 0.99,
+    samples: int = 64,
+    workers: int = 1,
+    seed=None,
+) -> dict:
+    """Every metric of `graph` (a networkx, CSR or implicit graph), as a JSON-compatible
+    dictionary (degree distribution keys are strings).
+
+    With `approximate` (by default, only if exact metrics are too much work):
+
+    * `clustering` is estimated within `error` with probability `confidence`
+    * `eccentricity` and `path_lengths` are those of `samples` random nodes, so
+      `radius` is an upper bound of the radius, and `diameter` a lower bound of the
+      diameter (see `estimate` for its upper bound)
+    """
+    if _is_implicit(graph):
+        return _compute_implicit(graph)
+    graph = CSRGraph.from_graph(graph)
+    order, edges = graph.number_of_nodes(), graph.number_of_edges()
+    if approximate is None:
+        approximate = (
+            wedges(graph) > EXACT_WEDGES or order * edges > EXACT_DISTANCE_WORK
+        )
+
+    metrics = {
+        "order": order,
+        "edges": edges,
+        "mean_degree": mean_degree(graph),
+        "degree_distribution": {
+            str(degree): count for degree, count in degree_distribution(graph).items()
+        },
+        "components": components(graph),
+        "estimate": None,
+    }
+
+    rng, sources = np.random.default_rng(seed), None
+    if approximate:
+        metrics["clustering"] = approximate_clustering(graph, error, confidence, rng)
+        sources = np.sort(rng.choice(order, size=min(samples, order), replace=False))
+        metrics["estimate"] = {
+            "error": error,
+            "confidence": confidence,
+            "samples": len(sources),
+            "diameter_upper_bound": None,
+        }
+    else:
+        metrics["clustering"] = clustering(graph)
+    values, histogram = distance_statistics(graph, sources, workers)
+    metrics["path_lengths"] = _path_lengths(histogram)
+
+    metrics["eccentricity"] = None
+    if order and metrics["components"] == 1:
+        metrics["eccentricity"] = {
+            "radius": int(values.min()),
+            "diameter": int(values.max()),
+            "mean": float(values.mean()),
+        }
+        if approximate:
+            lower, upper = diameter_bounds(graph, seed=rng)
+            metrics["eccentricity"]["diameter"] = max(lower, int(values.max()))
+            metrics["estimate"]["diameter_upper_bound"] = min(
+                upper, 2 * int(values.min())
+            )
+    return metrics
+
+
+def _compute_implicit(graph: Any) -> dict:
+    """Metrics of an implicit (vertex-transitive) graph, which are those of any node."""
+    histogram = graph.distance_distribution()
+    return {
+        "order": graph.number_of_nodes(),
+        "edges": graph.number_of_edges(),
+        "mean_degree": mean_degree(graph),
+        "degree_distribution": {
+            str(degree): count for degree, count in degree_distribution(graph).items()
+        },
+        "components": components(graph),
+        "estimate": None,
+        "clustering": clustering(graph),
+        "path_lengths": _path_lengths(histogram),
+        "eccentricity": eccentricity(graph),
+    }
+
+
+def generate_metrics(generator: str, data: bytes, **arguments) -> dict:
+    """Metrics of a graph generated with `abseir.grapher.GENERATORS[generator]` from
+    `arguments` and encoded as `data` (see :mod:`abseir.serialization`). Graphs with an
+    implicit form are not decoded. Meant to be run in worker processes.
+    """
+    if generator in IMPLICIT:
+        return compute(IMPLICIT[generator](**arguments))
+    return compute(serialization.loads(data))
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m abseir.metrics", description="Prints the metrics of graphs."
+    )
+    parser.add_argument("paths", nargs="+", help="graph files (*.csr, *.adjlist)")
+    parser.add_argument(
+        "--approximate",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="estimate clustering and distances (default: only for large graphs)",
+    )
+    parser.add_argument("--error", type=float, default=0.01)
+    parser.add_argument("--confidence", type=float, default=0.99)
+    parser.add_argument(
+        "--samples", type=int, default=64, help="nodes to search from when estimating"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="processes to use")
+    args = parser.parse_args(argv)
+    for path in args.paths:
+        computed = compute(
+            csr.read(path),
+            args.approximate,
+            args.error,
+            args.confidence,
+            args.samples,
+            args.workers,
+        )
+        print(path, json.dumps(computed, indent=4))
+
+
+if __name__ == "__main__":
+    main()
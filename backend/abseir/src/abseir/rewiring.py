@@ -0,0 +1,237 @@
+"""
+Helpers for generators that repeatedly rewire the edges of a graph
+(e.g. :func:`~abseir.grapher.modified_watts_strogatz_graph`).
+"""
+
+import random
+from typing import Hashable, Iterable, Iterator
+
+import networkx as nx
+
+
+Edge = tuple[Hashable, Hashable]
+
+
+class EdgePool:
+    """Set of undirected edges with `O(1)` insertion, removal and uniform sampling.
+
+    Edges are kept in a list, with a dict from each edge to its position in the list.
+    Removing an edge moves the last edge into its place, so the list never has gaps and
+    :meth:`sample` is a single random index.
+    ```
+    pool = EdgePool(graph.edges())
+    edge = pool.sample(rng)
+    pool.remove(edge)
+    ```
+    """
+
+    def __init__(self, edges: Iterable[Edge] = ()):
+        self._edges = []  # type: list[Edge]
+        self._index = {}  # type: dict[frozenset, int]
+        for edge in edges:
+            self.add(edge)
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def __iter__(self) -> Iterator[Edge]:
+        return iter(self._edges)
+
+    def __contains__(self, edge: Edge) -> bool:
+        return frozenset(edge) in self._index
+
+    def add(self, edge: Edge):
+        key = frozenset(edge)
+        if key not in self._index:
+            self._index[key] = len(self._edges)
+            self._edges.append(tuple(edge))
+
+    def remove(self, edge: Edge):
+        """Removes `edge` (in either direction), raising `KeyError` if it is missing."""
+        position = self._index.pop(frozenset(edge))
+        last = self._edges.pop()
+        if position < len(self._edges):
+            self._edges[position] = last
+            self._index[frozenset(last)] = position
+
+    def discard(self, edge: Edge):
+        if edge in self:
+            self.remove(edge)
+
+    def sample(self, rng: random.Random) -> Edge:
+        """Returns a uniformly random edge, raising `IndexError` if the pool is empty."""
+        if not self._edges:
+            raise IndexError("Cannot sample from an empty edge pool")
+        return self._edges[rng.randrange(len(self._edges))]
+
+    def pop(self, rng: random.Random) -> Edge:
+        """Removes and returns a uniformly random edge."""
+        edge = self.sample(rng)
+        self.remove(edge)
+        return edge
+
+
+def distance_exceeds(graph: nx.Graph, source: Hashable, target: Hashable, bound: int):
+    """Whether the shortest path between `source` and `target` is longer than `bound`
+    (or does not exist).
+
+    Runs a bidirectional breadth-first search that always expands the smaller frontier
+    and stops after a combined depth of `bound`, so it only explores the neighborhoods of
+    radius ~`bound / 2` around both nodes instead of the whole graph.
+    """
+    if source == target:
+        return False
+
+    visited = ({source}, {target})
+    frontiers = ([source], [target])
+    for _ in range(bound):
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        this_visited, other_visited = visited[side], visited[1 - side]
+
+        frontier = []
+        for node in frontiers[side]:
+            for neighbor in graph.neighbors(node):
+                if neighbor in other_visited:
+                    return False
+                if neighbor not in this_visited:
+                    this_visited.add(neighbor)
+                    frontier.append(neighbor)
+
+        # One side cannot reach any more nodes: the graph is disconnected
+        if not frontier:
+            return True
+        frontiers[side][:] = frontier
+    return True
+
+
+def is_bridge(graph: nx.Graph, u: Hashable, v: Hashable) -> bool:
+    """Whether removing the edge `(u, v)` would disconnect `u` from `v` in `graph`.
+
+    Searches for another path between `u` and `v` with a bidirectional breadth-first
+    search that ignores the edge itself and always expands the smaller frontier. If the
+    edge lies on a cycle, the search stops as soon as both sides meet, which only takes
+    a few steps in locally well-connected graphs (e.g. circulant graphs). If it is a
+    bridge, the search stops once the side on the smaller component is exhausted.
+    """
+    visited = ({u}, {v})
+    frontiers = ([u], [v])
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        this_visited, other_visited = visited[side], visited[1 - side]
+
+        frontier = []
+        for node in frontiers[side]:
+            for neighbor in graph.neighbors(node):
+                # Skip the edge being checked
+                if (node, neighbor) in ((u, v), (v, u)):
+                    continue
+                if neighbor in other_visited:
+                    return False
+                if neighbor not in this_visited:
+                    this_visited.add(neighbor)
+                    frontier.append(neighbor)
+        frontiers[side][:] = frontier
+    return True
+
+
+def _eccentricity_violations(
+    graph: nx.Graph, bound: int, block_size: int, first_block: int = 0
+) -> Iterator[tuple[int, list[Edge]]]:
+    """Yields, per block of source nodes (starting from block `first_block`), the block's
+    index and the pairs `(source, node)` of that block which are more than `bound` apart.
+
+    Instead of one BFS per source, each block of up to `block_size` sources is expanded
+    at once: `reach[node]` is a bitset of the block's sources that are within distance
+    `radius` of `node`, and growing the radius by one is a single pass of bitwise ORs
+    over the edges. Memory usage is `O(order * block_size)` bits.
+    """
+    nodes = list(graph.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    adjacency = [
+        [index[neighbor] for neighbor in graph.neighbors(node)] for node in nodes
+    ]
+    order = len(nodes)
+
+    block_count = -(-order // block_size)
+    for block in range(first_block, first_block + block_count):
+        block = block % block_count
+        block_start = block * block_size
+        block_end = min(block_start + block_size, order)
+        full = (1 << (block_end - block_start)) - 1
+
+        reach = [0] * order
+        for bit, source in enumerate(range(block_start, block_end)):
+            reach[source] = 1 << bit
+        for _ in range(bound):
+            updated = reach.copy()
+            for node, neighbors in enumerate(adjacency):
+                bits = updated[node]
+                for neighbor in neighbors:
+                    bits |= reach[neighbor]
+                updated[node] = bits
+            reach = updated
+
+        violations = []
+        for node, bits in enumerate(reach):
+            missing = full & ~bits
+            if missing:
+                source = block_start + (missing & -missing).bit_length() - 1
+                violations.append((nodes[source], nodes[node]))
+        yield block, violations
+
+
+class DiameterBound:
+    """Repeatedly answers "is the diameter of `graph` at most `bound`?" while `graph` is
+    being modified, without recalculating its diameter each time.
+
+    Keeps a list of witness pairs of nodes that were more than `bound` apart. While any
+    witness still holds (checked with :func:`distance_exceeds`, which is cheap for small
+    bounds), the answer is no. Only once every witness has been broken is the whole graph
+    checked again, which either finds new witnesses or proves the bound.
+    """
+
+    def __init__(
+        self, graph: nx.Graph, bound: int, witnesses: int = 16, block_size: int = 4096
+    ):
+        self.graph = graph
+        self.bound = bound
+        self.max_witnesses = witnesses
+        self.block_size = block_size
+        self.witnesses = []  # type: list[Edge]
+        self.full_checks = 0
+        self._last_block = 0
+
+    def holds(self) -> bool:
+        """Whether the diameter of `graph` is currently at most `bound`."""
+        while self.witnesses:
+            if distance_exceeds(self.graph, *self.witnesses[-1], self.bound):
+                return False
+            self.witnesses.pop()
+
+        self.witnesses = self._find_witnesses()
+        return not self.witnesses
+
+    def _find_witnesses(self) -> list[Edge]:
+        """Checks the eccentricity of every node (stopping at the first block of nodes
+        with violations) and returns up to `max_witnesses` pairs from distinct sources.
+
+        Starts from the block that last had violations, since it likely still does.
+        """
+        self.full_checks += 1
+        for block, violations in _eccentricity_violations(
+            self.graph, self.bound, self.block_size, self._last_block
+        ):
+            if violations:
+                self._last_block = block
+                step = max(len(violations) // self.max_witnesses, 1)
+                return violations[::step][: self.max_witnesses]
+        return []
+
+
+def diameter_at_most(graph: nx.Graph, bound: int, block_size: int = 4096) -> bool:
+    """Whether the diameter of `graph` is at most `bound` (`False` if it is disconnected).
+
+    Much faster than comparing :func:`networkx.diameter` for small bounds, and
+    stops as soon as any pair of nodes is found to be too far apart.
+    """
+    return DiameterBound(graph, bound, block_size=block_size).holds()
@@ -0,0 +1,224 @@
+"""
+Compact binary encoding of graphs, used to store and transfer them as a single blob
+(e.g. the API's `Graph.data` field).
+
+Layout (little-endian):
+```
+magic    4 bytes  b"ABSG"
+version  uint8
+codec    uint8    compression of the payload (see `CODECS`)
+length   uint32   length of the JSON header
+header   JSON     order, number of edges, identifiers, name (and node labels)
+payload           varints: the upper degree of every node, then the gaps between the
+                  sorted neighbors `v > u` of every node `u` (starting from `u`)
+```
+
+Each edge is stored once (`u < v`), and most gaps fit in a single byte, so graphs take
+about one byte per edge before compression. Blobs are decoded straight into a
+:class:`~abseir.csr.CSRGraph`:
+```
+data = serialization.dumps(grapher.complete_graph.csr(5000))
+graph = serialization.loads(data)
+```
+
+Blobs written before this format (cytoscape JSON, see :func:`to_cytoscape`) are still
+read by :func:`loads`.
+"""
+
+import json
+import struct
+import zlib
+from typing import Any, Union
+
+import networkx as nx
+import numpy as np
+
+from abseir.csr import CSRGraph, decode_identifiers, encode_identifiers
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+MAGIC = b"ABSG"
+VERSION = 1
+# Every codec of the format (`zstd` requires the optional `zstandard` package, see
+# `available_codecs`)
+CODECS = ("none", "zlib", "zstd")
+DEFAULT_COMPRESSION = "zlib"
+
+_PREAMBLE = struct.Struct("<4sBBI")
+
+
+def encode_varints(values: np.ndarray) -> np.ndarray:
+    """LEB128-encodes non-negative integers: 7 bits per byte, least significant first,
+    with the high bit set on every byte but the last of each value.
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    remaining = values >> np.uint64(7)
+    while remaining.any():
+        lengths += remaining > 0
+        remaining >>= np.uint64(7)
+
+    starts = np.cumsum(lengths) - lengths
+    positions = np.arange(lengths.sum()) - np.repeat(starts, lengths)
+    shifts = (7 * positions).astype(np.uint64)
+    encoded = ((np.repeat(values, lengths) >> shifts) & np.uint64(0x7F)).astype(
+        np.uint8
+    )
+    encoded[positions < np.repeat(lengths, lengths) - 1] |= 0x80
+    return encoded
+
+
+def decode_varints(encoded: np.ndarray) -> np.ndarray:
+    """Inverse of :func:`encode_varints`."""
+    ends = np.flatnonzero(encoded < 0x80)
+    if len(ends) == 0 or ends[-1] != len(encoded) - 1:
+        if len(encoded) == 0:
+            return np.zeros(0, dtype=np.uint64)
+        raise ValueError("Truncated varint data")
+
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    positions = np.arange(len(encoded)) - np.repeat(starts, ends - starts + 1)
+    values = (encoded & 0x7F).astype(np.uint64) << (7 * positions).astype(np.uint64)
+    return np.bitwise_or.reduceat(values, starts)
+
+
+def available_codecs() -> tuple[str, ...]:
+    """Codecs of `CODECS` that can be used here (`zstd` only with `zstandard`)."""
+    return tuple(codec for codec in CODECS if codec != "zstd" or zstandard is not None)
+
+
+def compress(payload: bytes, codec: str) -> bytes:
+    """Compresses `payload` with `codec` (one of `CODECS`)."""
+    if codec == "zlib":
+        return zlib.compress(payload, 6)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the `zstandard` package")
+        return zstandard.ZstdCompressor().compress(payload)
+    return payload
+
+
+def decompress(payload: bytes, codec: str) -> bytes:
+    """Inverse of :func:`compress`."""
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the `zstandard` package")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return payload
+
+
+def is_legacy(data: Union[bytes, memoryview]) -> bool:
+    """Whether `data` is a cytoscape JSON blob (the format used before this one)."""
+    return bytes(data[:1]) == b"{"
+
+
+def dumps(graph: Any, compression: str = DEFAULT_COMPRESSION) -> bytes:
+    """Encodes `graph` (a networkx, CSR or implicit graph) with `compression`
+    (one of `CODECS`).
+    """
+    if compression not in CODECS:
+        raise ValueError(f"Unknown compression '{compression}' (expected {CODECS})")
+    graph = CSRGraph.from_graph(graph)
+
+    edges = graph.edge_array().astype(np.int64)
+    order = graph.number_of_nodes()
+    upper_degrees = np.bincount(edges[:, 0], minlength=order)
+
+    # Gaps between consecutive neighbors of the same node, and from each node to its
+    # first neighbor (`edge_array` is sorted by `u`, then `v`)
+    gaps = np.diff(edges[:, 1], prepend=0)
+    first = np.cumsum(upper_degrees) - upper_degrees
+    first = first[upper_degrees > 0]
+    gaps[first] = edges[first, 1] - edges[first, 0]
+
+    payload = encode_varints(np.concatenate([upper_degrees, gaps])).tobytes()
+
+    header = {
+        "order": order,
+        "edges": len(edges),
+        "identifiers": encode_identifiers(graph.identifiers),
+        "name": graph.name,
+    }
+    if graph.labels is not None:
+        header["labels"] = graph.labels.tolist()
+    encoded_header = json.dumps(header).encode("utf-8")
+
+    return b"".join(
+        [
+            _PREAMBLE.pack(
+                MAGIC, VERSION, CODECS.index(compression), len(encoded_header)
+            ),
+            encoded_header,
+            compress(payload, compression),
+        ]
+    )
+
+
+def header(data: Union[bytes, memoryview]) -> dict:
+    """Reads the header of an encoded graph (e.g. its `order`, number of `edges` and
+    `identifiers`) without decoding its edges.
+    """
+    magic, version, codec, length = _PREAMBLE.unpack(bytes(data[: _PREAMBLE.size]))
+    if magic != MAGIC:
+        raise ValueError("Not an encoded graph (bad magic number)")
+    if version > VERSION:
+        raise ValueError(f"Unsupported encoded graph version: {version}")
+    if codec >= len(CODECS):
+        raise ValueError(f"Unknown encoded graph codec: {codec}")
+
+    decoded = json.loads(bytes(data[_PREAMBLE.size : _PREAMBLE.size + length]))
+    decoded["identifiers"] = decode_identifiers(decoded["identifiers"])
+    decoded["codec"] = CODECS[codec]
+    decoded["offset"] = _PREAMBLE.size + length
+    return decoded
+
+
+def loads(data: Union[bytes, memoryview]) -> CSRGraph:
+    """Decodes a graph encoded by :func:`dumps` (or a legacy cytoscape JSON blob)."""
+    if is_legacy(data):
+        return CSRGraph.from_graph(nx.cytoscape_graph(json.loads(bytes(data))))
+
+    decoded = header(data)
+    order, edge_count = decoded["order"], decoded["edges"]
+    payload = decompress(bytes(data[decoded["offset"] :]), decoded["codec"])
+    values = decode_varints(np.frombuffer(payload, dtype=np.uint8)).astype(np.int64)
+    if len(values) != order + edge_count:
+        raise ValueError("Encoded graph payload does not match its header")
+
+    upper_degrees, gaps = values[:order], values[order:]
+    sources = np.repeat(np.arange(order, dtype=np.int64), upper_degrees)
+
+    # Neighbors are the running sum of gaps, restarting from `u` at every node
+    first = np.cumsum(upper_degrees) - upper_degrees
+    first = first[upper_degrees > 0]
+    gaps[first] += sources[first]
+    totals = np.cumsum(gaps)
+    restarts = np.zeros(edge_count, dtype=np.int64)
+    restarts[first[1:]] = totals[first[1:] - 1]
+    targets = totals - np.maximum.accumulate(restarts)
+
+    return CSRGraph.from_edges(
+        order,
+        np.column_stack([sources, targets]),
+        decoded.get("labels"),
+        decoded["identifiers"],
+        decoded["name"],
+    )
+
+
+def to_cytoscape(graph: Any) -> bytes:
+    """Exports `graph` (a graph, or an encoded graph blob) as cytoscape JSON
+    (:func:`networkx.cytoscape_data`), e.g. for rendering it in the browser.
+    """
+    if isinstance(graph, (bytes, bytearray, memoryview)):
+        if is_legacy(graph):
+            return bytes(graph)
+        graph = loads(graph)
+    if not isinstance(graph, nx.Graph):
+        graph = CSRGraph.from_graph(graph).to_networkx()
+    return json.dumps(nx.cytoscape_data(graph)).encode("ascii")
@@ -0,0 +1,103 @@
+"""
+Compact binary encoding of simulation results: the integer matrix of the count of every
+column (e.g. every state) at every cycle of a sample, stored as a single blob
+(e.g. the API's `Sample.series` field). The names of the columns are stored separately.
+
+Layout (little-endian):
+```
+magic    4 bytes  b"ABSS"
+version  uint8
+codec    uint8    compression of the payload (see `abseir.serialization.CODECS`)
+rows     uint32   number of cycles
+columns  uint32
+payload           zigzag varints: every column (one after the other) as the differences
+                  between consecutive cycles
+```
+
+Counts change little from one cycle to the next, so most differences fit in a single
+byte (and compress well):
+```
+data = series.dumps(series.from_counts(simulation.simulate_counts(graph), columns))
+matrix = series.loads(data)
+```
+"""
+
+import struct
+from typing import Sequence, Union
+
+import numpy as np
+
+from abseir.serialization import (
+    CODECS,
+    DEFAULT_COMPRESSION,
+    compress,
+    decode_varints,
+    decompress,
+    encode_varints,
+)
+
+MAGIC = b"ABSS"
+VERSION = 1
+
+_PREAMBLE = struct.Struct("<4sBBII")
+
+
+def from_counts(counts: dict, columns: Sequence[str]) -> np.ndarray:
+    """Matrix of `columns` of simulation counts (`{column: [...]}`, see
+    `abseir.simulation.simulate_counts`), with a row per cycle.
+    """
+    if not columns:
+        return np.zeros((0, 0), dtype=np.int64)
+    return np.column_stack(
+        [np.asarray(counts[column], dtype=np.int64) for column in columns]
+    )
+
+
+def to_counts(matrix: np.ndarray, columns: Sequence[str]) -> dict:
+    """Inverse of :func:`from_counts`."""
+    return {column: matrix[:, index].tolist() for index, column in enumerate(columns)}
+
+
+def dumps(matrix: np.ndarray, compression: str = DEFAULT_COMPRESSION) -> bytes:
+    """Encodes an integer `matrix` (cycles x columns) with `compression` (one of
+    `abseir.serialization.CODECS`).
+    """
+    if compression not in CODECS:
+        raise ValueError(f"Unknown compression '{compression}' (expected {CODECS})")
+    matrix = np.asarray(matrix, dtype=np.int64)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a 2-dimensional matrix (got {matrix.ndim})")
+    rows, columns = matrix.shape
+
+    differences = np.diff(matrix.T, axis=1, prepend=0).ravel()
+    zigzag = (differences << 1) ^ (differences >> 63)
+    payload = encode_varints(zigzag.astype(np.uint64)).tobytes()
+
+    return b"".join(
+        [
+            _PREAMBLE.pack(MAGIC, VERSION, CODECS.index(compression), rows, columns),
+            compress(payload, compression),
+        ]
+    )
+
+
+def loads(data: Union[bytes, memoryview]) -> np.ndarray:
+    """Decodes a matrix encoded by :func:`dumps`."""
+    magic, version, codec, rows, columns = _PREAMBLE.unpack(
+        bytes(data[: _PREAMBLE.size])
+    )
+    if magic != MAGIC:
+        raise ValueError("Not an encoded series (bad magic number)")
+    if version > VERSION:
+        raise ValueError(f"Unsupported encoded series version: {version}")
+    if codec >= len(CODECS):
+        raise ValueError(f"Unknown encoded series codec: {codec}")
+
+    payload = decompress(bytes(data[_PREAMBLE.size :]), CODECS[codec])
+    zigzag = decode_varints(np.frombuffer(payload, dtype=np.uint8))
+    if len(zigzag) != rows * columns:
+        raise ValueError("Encoded series payload does not match its shape")
+    differences = (zigzag >> np.uint64(1)).astype(np.int64) ^ -(
+        zigzag & np.uint64(1)
+    ).astype(np.int64)
+    return np.cumsum(differences.reshape(columns, rows), axis=1).T
@@ -12,7 +12,9 @@ Simulates the infectious spread across a community (graph) based on parameters d
 """
 
 # Modules
-from log_handler import logging as log
+from abseir import serialization
+from abseir.log_handler import logging as log
+from abseir.metrics import mean_degree
 
 # Packages
 import datetime
@@ -20,11 +22,14 @@ import math
 import numpy as np
 import pandas as pd
 
-from typing import List, Set
+from typing import Collection, List, Set
 
 
 class Simulation:
-    def __init__(self, g):
+    def __init__(self, g, metrics=None, seed=None):
+        """Simulates on graph `g`. `metrics` are the graph's precomputed metrics
+        (see `abseir.metrics.compute`), if any, so they are not recomputed.
+        """
         self.all_states = [
             "susceptible",
             "exposed",
@@ -53,8 +58,9 @@ class Simulation:
 
         # Simulation constants
         # TODO(jordan): Log this seed
-        self.rng = np.random.default_rng()  # type: ignore
+        self.rng = np.random.default_rng(seed)  # type: ignore
         self.graph = g
+        self.metrics = dict(metrics or {})
         self.old_index, self.new_index = 0, 1
         self.nodes = [[], []]  # type: List[List[Node]]
         self.nodes[self.old_index] = self.generate_nodes()
@@ -230,6 +236,7 @@ class Simulation:
         self.susceptible_count = data_per_state["susceptible"]
 
         # Save data
+        self.counts = data_per_state
         self.data = self.data.append(data_per_state, ignore_index=True)
 
     def export_data(self):
@@ -248,17 +255,18 @@ class Simulation:
         for node_index in self.graph.nodes():
             nodes.append(Node(self.rng, node_index))
 
-        # TODO(aidan) May result in added time complexity, could be optimized
+        # Share the graph's (read-only) neighbor collections instead of copying them,
+        # so implicit graphs (e.g. `abseir.implicit.CompleteGraph`) stay implicit
         for node in nodes:
-            node.set_neighbors({i for i in self.graph.neighbors(node.index)})
+            node.set_neighbors(self.graph.adj[node.index])
 
         return nodes
 
     def get_mean_node_degree(self):
-        # TODO(jordan): This seems really janky...
-        # https://networkx.org/documentation/stable/reference/classes/generated/networkx.Graph.degree.html
-        mean_degree = np.mean([degree[1] for degree in self.graph.degree])
-        return mean_degree
+        # Computed once per graph, unless it was given with the graph's metrics
+        if "mean_degree" not in self.metrics:
+            self.metrics["mean_degree"] = mean_degree(self.graph)
+        return self.metrics["mean_degree"]
 
     def get_parameters(self, all=False):
         params = {
@@ -320,11 +328,16 @@ class Simulation:
             # Link twin nodes across old/new boundary
             self.link_nodes(old_nodes[index], new_nodes[index])
 
-    def run(self):
+    def run(self, on_cycle=None):
+        """Runs every cycle of the simulation, calling `on_cycle(counts)` (if given)
+        with the count of every state (see `count_states`) after each cycle.
+        """
         t0 = datetime.datetime.now()  # start of sim
         self.pre_step()
         for _ in range(self.time_horizon):
             self.run_step()
+            if on_cycle is not None:
+                on_cycle(self.counts)
         t1 = datetime.datetime.now()  # end of sim
         self.time = (t0, t1)  # (start, end)
 
@@ -445,7 +458,7 @@ class Node:
         # Run-time initialized
         self.index = i  # type: int
         self.generation = 0  # Uninfected
-        self.neighbors = set()  # type: Set[int]
+        self.neighbors = set()  # type: Collection[int]
         self.test = Test(rng, self)
 
         # Node variables
@@ -645,7 +658,7 @@ class Node:
                 v,
             ) in args.items():
                 if hasattr(self, k):
-                    self.__dict__.update((k, v))
+                    self.__dict__.update({k: v})
 
             # Recalculate dependents
             keys = args.keys()
@@ -897,7 +910,7 @@ class Test:
             ) in args.items():
                 if hasattr(self, k):
                     # Update attribute if it already exists in Simulation class
-                    self.__dict__.update((k, v))
+                    self.__dict__.update({k: v})
 
             # Recalculate dependents
             keys = args.keys()
@@ -996,3 +1009,41 @@ def geometric_by_mean(rng, mean, min=0):
     p = 1 / (mean - min)
 
     return rng.geometric(p) + min
+
+
+def _run(graph, parameters=None, metrics=None, seed=None, on_cycle=None):
+    simulation = Simulation(graph, metrics, seed)
+    if parameters:
+        simulation.set_parameters(parameters)
+    simulation.run(on_cycle)
+    return simulation
+
+
+def simulate(graph, parameters=None, metrics=None, seed=None):
+    """Runs one sample of a simulation on `graph` and returns its data (the count of
+    every state at every cycle, see `Simulation.data`).
+
+    `parameters` override the default parameters (see `Simulation.set_parameters`);
+    durations are in days.
+    """
+    return _run(graph, parameters, metrics, seed).data
+
+
+def simulate_counts(graph, parameters=None, metrics=None, seed=None, on_cycle=None):
+    """Runs one sample of a simulation on `graph` (which is left unchanged, so it can
+    be reused by many samples), and returns the count of every state at every cycle as
+    `{"cycle": [...], state: [...]}` lists.
+
+    `on_cycle(counts)` is called with the counts of every cycle as it is simulated.
+    """
+    simulation = _run(graph, parameters, metrics, seed, on_cycle)
+    columns = ["cycle", *simulation.all_states]
+    return {column: simulation.data[column].astype(int).tolist() for column in columns}
+
+
+def simulate_binary(data, parameters=None, metrics=None, seed=None):
+    """Runs one sample of a simulation on an encoded graph
+    (see `abseir.serialization`), like `simulate_counts`. Meant to be run in worker
+    processes.
+    """
+    return simulate_counts(serialization.loads(data), parameters, metrics, seed)
@@ -0,0 +1,10 @@
+import pytest
+from abseir import graph_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_graph_cache(tmp_path, monkeypatch):
+    """Points the graph cache at a temporary directory for every test."""
+    cache = graph_cache.GraphCache(directory=tmp_path / "graph_cache")
+    monkeypatch.setattr(graph_cache, "graph_cache", cache)
+    return cache
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from abseir.aggregate import Aggregate
+
+
+def _samples(count: int, upper: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, upper + 1, size=(30, 4)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("upper", [50, 10**5])
+def test_add(upper: int):
+    """Ensures incrementally added samples give their mean, standard deviation and
+    quantiles (exact for single value bins, within a bin's width otherwise).
+    """
+    samples = _samples(100, upper)
+    aggregate = Aggregate(4, upper)
+    for sample in samples:
+        aggregate.add(sample)
+    stacked = np.stack(samples)
+
+    assert np.array_equal(aggregate.count, np.full(30, 100))
+    assert np.allclose(aggregate.mean, stacked.mean(axis=0))
+    assert np.allclose(aggregate.std(), stacked.std(axis=0, ddof=1))
+    for q in (0, 0.05, 0.37, 0.5, 0.95, 1):
+        error = np.abs(aggregate.quantile(q) - np.quantile(stacked, q, axis=0))
+        if aggregate.width == 1:
+            assert np.allclose(error, 0)
+        else:
+            assert error.max() <= aggregate.width
+
+
+def test_merge():
+    """Ensures merging aggregates of disjoint samples (with different numbers of
+    cycles) matches aggregating them all, and survives a round trip through bytes.
+    """
+    samples = _samples(20, 1000) + [np.ones((10, 4), dtype=np.int64)]
+    first, second = Aggregate(4, 1000), Aggregate(4, 1000)
+    for index, sample in enumerate(samples):
+        (first if index % 3 else second).add(sample)
+    merged = Aggregate.loads(first.dumps()).merge(second)
+
+    expected = Aggregate(4, 1000)
+    for sample in samples:
+        expected.add(sample)
+    assert np.array_equal(merged.count, expected.count)
+    assert np.array_equal(merged.histogram, expected.histogram)
+    assert np.allclose(merged.mean, expected.mean)
+    assert np.allclose(merged.m2, expected.m2)
+
+    with pytest.raises(ValueError):
+        merged.merge(Aggregate(4, 999))
+
+
+def test_summary():
+    """Ensures summaries are JSON-compatible and undefined statistics are `None`."""
+    aggregate = Aggregate(2, 10).add(np.array([[1, 2], [3, 4]]))
+    summary = aggregate.summary(["a", "b"])
+    assert summary["count"] == [1, 1]
+    assert summary["mean"] == {"a": [1, 3], "b": [2, 4]}
+    assert summary["std"] == {"a": [None, None], "b": [None, None]}
+    assert summary["p50"] == summary["p5"] == summary["mean"]
+    assert Aggregate(2, 10).summary(["a", "b"])["p95"] == {"a": [], "b": []}
@@ -0,0 +1,125 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from abseir import analysis
+
+COLUMNS = [
+    "cycle",
+    *analysis.POPULATION_COLUMNS,
+    "test count",
+    "true positive",
+    "false positive",
+    "new false positive",
+    "returning false positive",
+    "exogenous",
+    "generation 1",
+    "generation 2",
+    "generation 3",
+    "generation 4",
+    "generation 5",
+    "generation x",
+    "interactions",
+    "infected nodes",
+    "susceptibles contracting",
+]
+
+
+def _write_output(path, samples: int, cycles: int, seed: int) -> pd.DataFrame:
+    """Writes a fake simulation output file in the same format as `main.py`."""
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(
+        rng.integers(0, 100, size=(samples * cycles, len(COLUMNS))), columns=COLUMNS
+    )
+    data["cycle"] = np.tile(np.arange(cycles), samples)
+    with open(path, "w", newline="") as file:
+        file.write("# {   'population_size': 100,\n#     'r0': 2.5}\n# \n")
+        data.to_csv(file, index=False)
+    return analysis.derive_columns(data)
+
+
+@pytest.mark.parametrize("chunksize", [1, 7, 1000])
+def test_summarize_matches_pandas(tmp_path, chunksize: int):
+    """Ensures chunked summaries of merged files match reducing them all at once."""
+    paths = [tmp_path / f"simulation_{i}.csv" for i in range(2)]
+    data = pd.concat(
+        [_write_output(path, 5, 12, seed) for seed, path in enumerate(paths)]
+    )
+
+    summary = analysis.summarize_files(paths, chunksize=chunksize, cache=False)
+    grouped = data.groupby("cycle")
+
+    pd.testing.assert_frame_equal(
+        summary.mean(), grouped.mean().astype(float), check_names=False
+    )
+    pd.testing.assert_frame_equal(
+        summary.std(), grouped.std().astype(float), check_names=False
+    )
+    assert (summary.count == 10).all()
+
+
+def test_summary_cache(tmp_path):
+    """Ensures summaries are cached next to their file and invalidated by its hash."""
+    path = tmp_path / "simulation.csv"
+    _write_output(path, 3, 4, seed=0)
+
+    summary = analysis.summarize(path)
+    assert os.path.exists(analysis.cache_path(path))
+
+    cached = analysis.read_cache(path, analysis.file_hash(path))
+    assert cached is not None
+    pd.testing.assert_frame_equal(cached.mean(), summary.mean(), check_names=False)
+
+    # Changing the source file invalidates its cached summary
+    data = _write_output(path, 3, 4, seed=1)
+    assert analysis.read_cache(path, analysis.file_hash(path)) is None
+    assert np.allclose(
+        analysis.summarize(path).mean(), data.groupby("cycle").mean().astype(float)
+    )
+
+
+def test_summary_precision():
+    """Ensures standard deviations of large values with a small variance stay precise
+    when summaries of many chunks are merged.
+    """
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({"cycle": np.tile(np.arange(3), 1000)})
+    data["value"] = 1e9 + rng.normal(0, 1e-2, len(data))
+
+    summary = analysis.CycleSummary()
+    for start in range(0, len(data), 7):
+        summary.update(data.iloc[start : start + 7])
+
+    expected = data.groupby("cycle")["value"].std()
+    assert np.allclose(summary.std()["value"], expected, rtol=1e-3)
+
+
+def test_summary_missing_values():
+    """Ensures missing values are left out of their column's summary, except ratios."""
+    data = pd.DataFrame(
+        {
+            "cycle": [0, 0, 1, 1],
+            "value": [1.0, np.nan, 3.0, 5.0],
+            "generation 1": [0, 1, 1, 1],
+            "generation 2": [0, 2, 2, 2],
+            "generation 3": [1, 1, 1, 1],
+            "generation 4": [1, 1, 1, 1],
+            "susceptibles contracting": [1, 1, 1, 1],
+            "infected nodes": [1, 1, 1, 1],
+        }
+    )
+    summary = analysis.CycleSummary()
+    summary.update(analysis.derive_columns(data))
+
+    assert summary.mean()["value"].tolist() == [1.0, 4.0]
+    assert summary.mean()["r0"].tolist() == [1.0, 2.0]
+    assert summary.count.tolist() == [2, 2]
+
+
+def test_mean_path(tmp_path):
+    """Ensures means are written next to their input file by default."""
+    path = tmp_path / "data" / "simulation.csv"
+    assert analysis.mean_path(path) == str(
+        tmp_path / "data" / "mean" / "simulation.csv"
+    )
@@ -0,0 +1,77 @@
+import os
+import shutil
+
+import networkx as nx
+import pytest
+from abseir import csr, grapher
+
+GRAPHS_DIRECTORY = os.path.join(
+    os.path.dirname(__file__), os.pardir, "graphs", "wattsstrogatz"
+)
+ADJLIST_PATH = os.path.join(GRAPHS_DIRECTORY, "wattsstrogatz_n1500_k42_d3_rng0.adjlist")
+
+
+def _assert_same_graph(graph: csr.CSRGraph, expected: nx.Graph):
+    assert graph.number_of_nodes() == expected.number_of_nodes()
+    assert graph.number_of_edges() == expected.number_of_edges()
+    assert set(graph.nodes()) == set(expected.nodes())
+    for node in expected.nodes():
+        assert set(graph.neighbors(node)) == set(expected.neighbors(node))
+        assert set(graph.adj[node]) == set(expected.adj[node])
+    assert len(graph.adj) == expected.number_of_nodes()
+    assert dict(graph.degree) == dict(expected.degree)
+
+
+@pytest.mark.parametrize("order", [2, 16, 128])
+def test_from_graph(order: int):
+    """Ensures `grapher.Graph`s are converted to CSR and back without changes."""
+    graph = grapher.complete_graph(order)
+    converted = csr.CSRGraph.from_graph(graph)
+
+    _assert_same_graph(converted, graph)
+    assert converted.labels is None
+    assert converted.identifiers == graph.identifiers
+    assert converted.nbytes == converted.indptr.nbytes + converted.indices.nbytes
+
+    restored = converted.to_networkx()
+    assert isinstance(restored, grapher.Graph)
+    assert nx.utils.graphs_equal(restored, graph)
+
+
+def test_from_text_files(tmp_path):
+    """Ensures `.adjlist` and `.edgelist` files are read like networkx reads them."""
+    expected = nx.read_adjlist(ADJLIST_PATH, nodetype=int)
+    _assert_same_graph(csr.CSRGraph.from_adjlist(ADJLIST_PATH), expected)
+
+    edgelist_path = tmp_path / "graph.edgelist"
+    nx.write_edgelist(expected, edgelist_path)
+    _assert_same_graph(csr.CSRGraph.from_edgelist(edgelist_path), expected)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load(tmp_path, mmap: bool):
+    """Ensures graphs (including node labels and identifiers) survive a save/load."""
+    graph = nx.relabel_nodes(grapher.circulant_graph(64, 4), lambda node: 3 * node)
+    graph.identifiers = {"order": 64, "jumps": {1, 2, 3, 4}}
+    converted = csr.CSRGraph.from_graph(graph)
+
+    path = tmp_path / "graph.csr"
+    converted.save(path)
+    loaded = csr.CSRGraph.load(path, mmap=mmap)
+
+    assert loaded == converted
+    assert loaded.identifiers == graph.identifiers
+    _assert_same_graph(loaded, graph)
+    # Memory-mapped arrays are read-only views of the file
+    assert loaded.indices.flags.writeable != mmap
+
+
+def test_read_caches_binary_file(tmp_path):
+    """Ensures text graph files are converted to a `.csr` file next to them once."""
+    path = tmp_path / "graph.adjlist"
+    shutil.copy(ADJLIST_PATH, path)
+
+    graph = csr.read(path)
+    assert os.path.exists(tmp_path / "graph.csr")
+    assert csr.read(path) == graph
+    assert csr.read(tmp_path / "graph.csr") == graph
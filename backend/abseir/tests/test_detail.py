@@ -0,0 +1,69 @@
+import json
+
+import networkx as nx
+import numpy as np
+import pytest
+from abseir import detail, grapher, implicit, layout, serialization
+
+GRAPH = implicit.CirculantGraph(1000, {1, 2, 50})
+
+
+@pytest.mark.parametrize("method", detail.METHODS)
+@pytest.mark.parametrize("budget", [0, 10, 500, 10_000])
+def test_reduce_budget(method: str, budget: int):
+    """Ensures views never exceed their edge budget, and keep every edge if they can."""
+    view = detail.reduce(GRAPH, budget, method)
+    assert view.number_of_edges() <= budget
+    if budget >= GRAPH.number_of_edges():
+        assert view.number_of_edges() == GRAPH.number_of_edges()
+        assert view.number_of_nodes() == GRAPH.number_of_nodes()
+
+    # Clusters account for every node and (inter-cluster) edge they stand for
+    if method == "cluster":
+        sizes = nx.get_node_attributes(view, "size")
+        assert sum(sizes.values()) == GRAPH.number_of_nodes()
+        assert view.size(weight="weight") <= GRAPH.number_of_edges()
+
+
+def test_reduce_edges():
+    """Ensures sampled and degree-filtered views only keep edges of the graph."""
+    graph = nx.relabel_nodes(nx.barabasi_albert_graph(500, 3, seed=0), str)
+    for method in ("sample", "degree"):
+        view = detail.reduce(graph, 200, method)
+        assert all(graph.has_edge(u, v) for u, v in view.edges())
+        assert all(view.nodes[node]["degree"] == graph.degree[node] for node in view)
+
+    # The highest-degree nodes are kept first
+    view = detail.reduce(graph, 200, "degree")
+    hub = max(graph.degree, key=lambda pair: pair[1])[0]
+    assert hub in view
+    with pytest.raises(ValueError):
+        detail.reduce(graph, 200, "random")
+
+
+def test_view_binary():
+    """Ensures views of encoded graphs carry the positions of their layouts."""
+    graph = grapher.complete_graph(30)
+    positions = layout.circular_layout(30)
+    data = detail.view_binary(
+        serialization.dumps(graph), 20, "cluster", layout.to_bytes(positions)
+    )
+    elements = json.loads(data)["elements"]
+    assert sum(node["data"]["size"] for node in elements["nodes"]) == 30
+    assert all(
+        np.hypot(node["position"]["x"], node["position"]["y"]) <= 1 + 1e-6
+        for node in elements["nodes"]
+    )
+    assert len(elements["edges"]) <= 20
+
+
+def test_views_binary():
+    """Ensures views computed together match views computed one at a time."""
+    data = serialization.dumps(grapher.complete_graph(40))
+    positions = layout.to_bytes(layout.circular_layout(40))
+    views = detail.views_binary(data, [10, 100], positions=positions)
+    assert set(views) == {
+        (method, budget) for method in detail.METHODS for budget in (10, 100)
+    }
+    for (method, budget), view in views.items():
+        assert view == detail.view_binary(data, budget, method, positions)
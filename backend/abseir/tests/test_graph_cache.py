@@ -0,0 +1,88 @@
+import os
+
+import networkx as nx
+from abseir import grapher
+from abseir import graph_cache
+from abseir.graph_cache import GraphCache, cached
+
+
+def test_cached_generator(isolated_graph_cache: GraphCache):
+    """Ensures generated graphs are only generated once per set of identifiers,
+    and that cache hits return independent copies."""
+    calls = []
+
+    @cached()
+    def generator(order: int, seed: int = 0):
+        calls.append((order, seed))
+        graph = grapher.Graph(order=order, seed=seed)
+        graph.add_edges_from(nx.path_graph(order).edges())
+        return graph
+
+    first = generator(16)
+    second = generator(order=16, seed=0)
+    assert calls == [(16, 0)]
+    assert nx.utils.graphs_equal(first, second)
+    assert second.identifiers == {"order": 16, "seed": 0}
+
+    # Modifying a returned graph does not modify the cache
+    second.remove_edge(0, 1)
+    assert generator(16).has_edge(0, 1)
+
+    generator(16, seed=1)
+    assert calls == [(16, 0), (16, 1)]
+
+    # Graphs persist on disk between processes (simulated by clearing the memo)
+    isolated_graph_cache._memo.clear()
+    assert nx.utils.graphs_equal(generator(16), first)
+    assert len(calls) == 2
+
+    # `.csr()` returns the cached graph itself, without converting it
+    assert generator.csr(16) is generator.csr(order=16)
+
+
+def test_cache_eviction(tmp_path):
+    """Ensures the least recently used graph files are evicted once the cache is full."""
+    cache = GraphCache(directory=tmp_path, memo_size=0)
+    graph = grapher.complete_graph.csr(32)
+    graph.save(tmp_path / "size.tmp")
+    size = os.path.getsize(tmp_path / "size.tmp")
+    cache.max_size = 2 * size
+
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.put(key, graph)
+        os.utime(cache.path(key), (index, index))  # type: ignore
+        if key == "b":
+            # Reading `a` marks it as recently used
+            assert cache.get("a") is not None
+    cache.evict()
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_randomizable_seed():
+    """Ensures randomized generators receive (and are cached under) a concrete seed."""
+    seeds = []
+
+    @grapher.randomizable
+    def generator(order: int, seed=None):
+        seeds.append(seed)
+        return order
+
+    generator(4)
+    generator(4, seed=None)
+    generator(4, 7)
+    assert None not in seeds
+    assert seeds[-1] == 7
+
+
+def test_default_cache_directory(tmp_path, monkeypatch):
+    """Ensures the cache defaults to a per-user directory, not the working directory."""
+    monkeypatch.setattr(graph_cache.sys, "platform", "linux")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.delenv("ABSEIR_GRAPH_CACHE", raising=False)
+    assert graph_cache._default_cache().directory == str(tmp_path / "abseir" / "graphs")
+
+    monkeypatch.setenv("ABSEIR_GRAPH_CACHE", str(tmp_path / "graphs"))
+    assert graph_cache._default_cache().directory == str(tmp_path / "graphs")
@@ -8,12 +8,14 @@
 ###
 
 import functools
+import random
+from collections import Counter
 from typing import Callable
 
 import networkx as nx
 import numpy as np
 import pytest
-from abseir import grapher
+from abseir import csr, grapher, serialization
 
 GRAPH_INPUT_ORDERS = [
     2,
@@ -111,6 +113,25 @@ def test_circulant_graph_jump_int(expected: nx.Graph, order: int, degree: int):
     )
 
 
+@pytest.mark.parametrize("order", [1, 5, 64])
+@pytest.mark.parametrize("jumps", [3, {1, 4}, [2, 2, 5], range(1, 3)])
+def test_circulant_graph_edges(order: int, jumps, isolated_graph_cache):
+    """Ensures the vectorized circulant graph matches networkx's, for every type of
+    `jumps`, both as a networkx graph and as a CSR graph.
+    """
+    offsets = range(1, jumps + 1) if isinstance(jumps, int) else jumps
+    expected = nx.circulant_graph(order, offsets)
+    expected.remove_edges_from(nx.selfloop_edges(expected))
+
+    graph = grapher.circulant_graph(order, jumps)
+    assert set(graph.nodes()) == set(range(order))
+    assert set(map(frozenset, graph.edges())) == set(map(frozenset, expected.edges()))
+
+    converted = grapher.circulant_graph.csr(order, jumps)
+    assert converted.number_of_edges() == expected.number_of_edges()
+    assert converted.identifiers == {"order": order, "jumps": set(offsets)}
+
+
 @pytest.mark.skip
 @pytest.mark.parametrize(
     "order,degree,diameter,seed",
@@ -150,6 +171,61 @@ def test_modified_watts_strogatz_graph(
     )
 
 
+@pytest.mark.parametrize(
+    "order,degree,diameter,seed",
+    [(64, 8, 4, 0), (128, 6, 6, 5318008), (256, 10, 4, None)],
+)
+def test_modified_watts_strogatz_graph_small(
+    order: int, degree: int, diameter: int, seed: int | None, isolated_graph_cache
+):
+    """Ensures small Watts-Strogatz graphs keep their edge count and connectivity,
+    reach the target diameter, and are reproducible from their seed.
+    """
+    graph = grapher.modified_watts_strogatz_graph(order, degree, diameter, seed=seed)
+
+    assert graph.number_of_nodes() == order
+    assert graph.number_of_edges() == order * degree // 2
+    assert nx.is_connected(graph)
+    assert nx.diameter(graph) <= diameter
+
+    if seed is not None:
+        assert graph.identifiers["seed"] == seed
+        isolated_graph_cache.clear()
+        regenerated = grapher.modified_watts_strogatz_graph(
+            order, degree, diameter, seed=seed
+        )
+        assert set(map(frozenset, regenerated.edges())) == set(
+            map(frozenset, graph.edges())
+        )
+
+
+def test_modified_watts_strogatz_graph_dense(monkeypatch, isolated_graph_cache):
+    """Ensures Watts-Strogatz graphs are still valid once candidate edges are sampled
+    per node (as for graphs too dense for rejection sampling).
+    """
+    monkeypatch.setattr(grapher, "_random_non_edge", lambda *args, **kwargs: None)
+    graph = grapher.modified_watts_strogatz_graph(64, 8, 4, seed=0)
+
+    assert graph.number_of_edges() == 64 * 8 // 2
+    assert nx.is_connected(graph)
+    assert nx.diameter(graph) <= 4
+
+
+def test_node_non_edge():
+    """Ensures candidate edges sampled per node are uniform among the pairs that are
+    neither edges nor original circulant edges.
+    """
+    order, max_jump = 12, 2
+    graph = nx.complete_graph(order)
+    graph.remove_edges_from([(0, 5), (3, 9), (4, 10), (0, 1)])
+    rng = random.Random(0)
+
+    counts = Counter(grapher._node_non_edge(graph, rng, max_jump) for _ in range(6000))
+    # `(0, 1)` was a circulant edge, so it may not be added back
+    assert set(counts) == {(0, 5), (3, 9), (4, 10)}
+    assert min(counts.values()) > 1800
+
+
 def _graph_validator(generator: Callable, expected: nx.Graph | None = None, **kwargs):
     """Tests a graph's properties based on `order` and `**kwargs`."""
     graph = generator()
@@ -176,3 +252,19 @@ def _graph_validator(generator: Callable, expected: nx.Graph | None = None, **kw
     # # have the correct diameter
     if "diameter" in kwargs.keys():
         assert nx.diameter(graph) == kwargs.get("diameter")
+
+
+def test_generate_binary(isolated_graph_cache):
+    """Ensures graphs generated by name decode to the generator's graph, and that
+    random graphs still get a random seed when generated as CSR.
+    """
+    data = grapher.generate_binary("circulant", order=32, jumps=[1, 3])
+    decoded = serialization.loads(data)
+    assert decoded == csr.CSRGraph.from_graph(grapher.circulant_graph(32, [1, 3]))
+    assert decoded.identifiers == {"order": 32, "jumps": {1, 3}}
+
+    seeds = {
+        grapher.modified_watts_strogatz_graph.csr(64, 8, 4).identifiers["seed"]
+        for _ in range(2)
+    }
+    assert len(seeds) == 2 and None not in seeds
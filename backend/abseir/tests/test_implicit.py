@@ -0,0 +1,51 @@
+import networkx as nx
+import pytest
+from abseir import csr, implicit
+
+GRAPHS = [
+    (implicit.CompleteGraph(1), nx.complete_graph(1)),
+    (implicit.CompleteGraph(2), nx.complete_graph(2)),
+    (implicit.CompleteGraph(33), nx.complete_graph(33)),
+    (implicit.CirculantGraph(10, 3), nx.circulant_graph(10, range(1, 4))),
+    (implicit.CirculantGraph(12, {6, 1}), nx.circulant_graph(12, [1, 6])),
+    (implicit.CirculantGraph(16, [4, -4, 12]), nx.circulant_graph(16, [4])),
+    (implicit.CirculantGraph(64, range(1, 6)), nx.circulant_graph(64, range(1, 6))),
+]
+
+
+@pytest.mark.parametrize("graph,expected", GRAPHS)
+def test_implicit_graph(graph: implicit.ImplicitGraph, expected: nx.Graph):
+    """Ensures implicit graphs answer queries like their materialized networkx graph."""
+    assert graph.number_of_nodes() == expected.number_of_nodes()
+    assert graph.number_of_edges() == expected.number_of_edges()
+    assert list(graph.nodes()) == list(expected.nodes())
+    assert dict(graph.degree) == dict(expected.degree)
+    for node in expected.nodes():
+        assert set(graph.neighbors(node)) == set(expected.neighbors(node))
+        assert len(graph.adj[node]) == expected.degree(node)
+        for other in expected.nodes():
+            assert graph.has_edge(node, other) == expected.has_edge(node, other)
+            assert (other in graph.adj[node]) == expected.has_edge(node, other)
+    assert set(graph.edges()) == set(map(tuple, map(sorted, expected.edges())))
+
+
+@pytest.mark.parametrize("graph,expected", GRAPHS)
+def test_implicit_graph_statistics(graph: implicit.ImplicitGraph, expected: nx.Graph):
+    """Ensures the analytic statistics of implicit graphs match networkx's."""
+    assert graph.average_clustering() == pytest.approx(nx.average_clustering(expected))
+    diameter = nx.diameter(expected) if nx.is_connected(expected) else float("inf")
+    assert graph.diameter() == diameter
+
+
+@pytest.mark.parametrize("graph,expected", GRAPHS)
+def test_implicit_graph_conversions(graph: implicit.ImplicitGraph, expected: nx.Graph):
+    """Ensures implicit graphs materialize to the same CSR and networkx graphs."""
+    converted = graph.to_csr()
+    assert converted == csr.CSRGraph.from_graph(expected)
+    assert csr.CSRGraph.from_graph(graph) == converted
+    assert converted.identifiers == graph.identifiers
+
+    materialized = graph.to_networkx()
+    assert set(map(frozenset, materialized.edges())) == set(
+        map(frozenset, expected.edges())
+    )
@@ -0,0 +1,42 @@
+import networkx as nx
+import numpy as np
+import pytest
+from abseir import grapher, implicit, layout, serialization
+
+
+def test_circular_layout():
+    """Ensures circular layouts space nodes evenly on the unit circle."""
+    positions = layout.circular_layout(8)
+    assert positions.shape == (8, 2) and positions.dtype == np.float32
+    assert np.allclose(np.linalg.norm(positions, axis=1), 1)
+    assert np.allclose(positions[2], [0, 1], atol=1e-6)
+    assert layout.circular_layout(0).shape == (0, 2)
+
+
+def test_force_layout():
+    """Ensures force layouts are deterministic, bounded and pull neighbors together."""
+    graph = nx.barbell_graph(30, 0)
+    positions = layout.force_layout(graph, seed=1)
+    assert positions.shape == (60, 2) and positions.dtype == np.float32
+    assert np.abs(positions).max() == pytest.approx(1)
+    assert np.array_equal(positions, layout.force_layout(graph, seed=1))
+
+    # Both cliques of the barbell end up apart from each other
+    first, second = positions[:30].mean(axis=0), positions[30:].mean(axis=0)
+    spread = np.linalg.norm(positions[:30] - first, axis=1).mean()
+    assert np.linalg.norm(first - second) > 2 * spread
+
+
+@pytest.mark.parametrize(
+    "graph", [grapher.complete_graph(1), implicit.CirculantGraph(200, 3)]
+)
+@pytest.mark.parametrize("method", layout.METHODS)
+def test_layout_binary(graph, method: str):
+    """Ensures layouts of encoded graphs survive a round trip through bytes."""
+    data = layout.layout_binary(serialization.dumps(graph), method)
+    positions = layout.from_bytes(data)
+    assert len(data) == 8 * graph.number_of_nodes()
+    assert np.array_equal(positions, layout.compute(graph, method))
+
+    with pytest.raises(ValueError):
+        layout.compute(graph, "spring")
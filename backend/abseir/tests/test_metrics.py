@@ -0,0 +1,98 @@
+import networkx as nx
+import numpy as np
+import pytest
+from abseir import csr, grapher, implicit, metrics, serialization
+
+GRAPHS = [
+    nx.watts_strogatz_graph(300, 8, 0.2, seed=0),
+    nx.barabasi_albert_graph(200, 3, seed=1),
+    nx.disjoint_union(nx.path_graph(5), nx.cycle_graph(7)),
+    nx.empty_graph(4),
+    grapher.complete_graph(30),
+]
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_compute(graph: nx.Graph):
+    """Ensures metrics match networkx's."""
+    computed = metrics.compute(graph)
+    assert computed["order"] == graph.number_of_nodes()
+    assert computed["edges"] == graph.number_of_edges()
+    assert computed["degree_distribution"] == {
+        str(degree): count
+        for degree, count in enumerate(nx.degree_histogram(graph))
+        if count
+    }
+    assert computed["clustering"] == pytest.approx(nx.average_clustering(graph))
+    assert computed["components"] == nx.number_connected_components(graph)
+
+    if nx.is_connected(graph):
+        if graph.number_of_nodes() > 1:
+            assert computed["path_lengths"]["mean"] == pytest.approx(
+                nx.average_shortest_path_length(graph)
+            )
+        eccentricities = list(nx.eccentricity(graph).values())
+        assert computed["eccentricity"] == {
+            "radius": min(eccentricities),
+            "diameter": max(eccentricities),
+            "mean": pytest.approx(np.mean(eccentricities)),
+        }
+    else:
+        assert computed["eccentricity"] is None
+
+
+@pytest.mark.parametrize(
+    "graph",
+    [
+        implicit.CompleteGraph(40),
+        implicit.CirculantGraph(100, {2, 5}),
+        implicit.CirculantGraph(60, {6, 9}),
+    ],
+)
+def test_implicit(graph):
+    """Ensures implicit graphs' metrics match those of their materialized graphs."""
+    computed, expected = metrics.compute(graph), metrics.compute(graph.to_csr())
+    assert computed.pop("clustering") == pytest.approx(expected.pop("clustering"))
+    paths, expected_paths = computed.pop("path_lengths"), expected.pop("path_lengths")
+    assert paths["mean"] == pytest.approx(expected_paths["mean"])
+    assert paths["distribution"] == pytest.approx(expected_paths["distribution"])
+    assert computed == expected
+
+
+def test_generate_metrics():
+    """Ensures metrics of encoded graphs are those of the graphs."""
+    graph = nx.relabel_nodes(nx.karate_club_graph(), str)
+    data = serialization.dumps(graph)
+    assert metrics.generate_metrics("wattsstrogatz", data) == metrics.compute(graph)
+    assert metrics.generate_metrics(
+        "circulant", b"", order=50, jumps=[1, 3]
+    ) == metrics.compute(implicit.CirculantGraph(50, [1, 3]))
+    assert metrics.distances(csr.CSRGraph.from_graph(graph), 0).max() == 3
+
+
+def test_approximate():
+    """Ensures estimates are within their bounds of the exact metrics."""
+    graph = nx.watts_strogatz_graph(1000, 10, 0.1, seed=2)
+    exact = metrics.compute(graph, approximate=False)
+    estimated = metrics.compute(graph, approximate=True, error=0.02, seed=0)
+
+    assert exact["estimate"] is None
+    assert estimated["estimate"]["samples"] == 64
+    assert estimated["clustering"] == pytest.approx(exact["clustering"], abs=0.02)
+    diameter = exact["eccentricity"]["diameter"]
+    assert estimated["eccentricity"]["diameter"] <= diameter
+    assert estimated["estimate"]["diameter_upper_bound"] >= diameter
+    assert estimated["eccentricity"]["radius"] >= exact["eccentricity"]["radius"]
+    assert estimated["path_lengths"]["mean"] == pytest.approx(
+        exact["path_lengths"]["mean"], rel=0.05
+    )
+
+
+def test_distance_statistics_workers():
+    """Ensures breadth-first searches split across processes give the same results."""
+    graph = csr.CSRGraph.from_graph(nx.barabasi_albert_graph(300, 2, seed=3))
+    serial = metrics.distance_statistics(graph)
+    parallel = metrics.distance_statistics(graph, workers=2)
+    assert all(np.array_equal(a, b) for a, b in zip(serial, parallel))
+    lower, upper = metrics.diameter_bounds(graph, seed=0)
+    assert lower <= serial[0].max() <= upper
@@ -0,0 +1,85 @@
+import itertools
+import random
+
+import networkx as nx
+import pytest
+from abseir import rewiring
+
+GRAPHS = [
+    nx.path_graph(12),
+    nx.cycle_graph(17),
+    nx.connected_watts_strogatz_graph(64, 4, 0.1, seed=0),
+    nx.connected_watts_strogatz_graph(128, 6, 0.3, seed=1),
+    nx.disjoint_union(nx.complete_graph(4), nx.complete_graph(3)),
+]
+
+
+@pytest.mark.parametrize("graph", GRAPHS[:3] + GRAPHS[4:])
+@pytest.mark.parametrize("bound", [1, 2, 3, 5])
+def test_distance_exceeds(graph: nx.Graph, bound: int):
+    """Ensures the bidirectional bounded search agrees with networkx's shortest paths."""
+    distances = dict(nx.all_pairs_shortest_path_length(graph))
+    for source, target in itertools.combinations(graph.nodes(), 2):
+        distance = distances[source].get(target, float("inf"))
+        assert rewiring.distance_exceeds(graph, source, target, bound) == (
+            distance > bound
+        )
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+@pytest.mark.parametrize("block_size", [1, 5, 4096])
+def test_diameter_at_most(graph: nx.Graph, block_size: int):
+    """Ensures bound checks agree with networkx's diameter for every bound."""
+    diameter = nx.diameter(graph) if nx.is_connected(graph) else float("inf")
+    for bound in range(1, min(len(graph), 12)):
+        assert rewiring.diameter_at_most(graph, bound, block_size) == (
+            diameter <= bound
+        )
+
+
+def test_diameter_bound_tracks_changes():
+    """Ensures a `DiameterBound` stays correct while its graph is modified."""
+    graph = nx.cycle_graph(40)
+    bound = rewiring.DiameterBound(graph, 5, block_size=8)
+
+    for node in range(0, 40, 4):
+        assert bound.holds() == (nx.diameter(graph) <= 5)
+        graph.add_edge(node, (node + 20) % 40)
+        graph.add_edge(node, (node + 10) % 40)
+    assert bound.holds() == (nx.diameter(graph) <= 5)
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_is_bridge(graph: nx.Graph):
+    """Ensures bridge checks agree with networkx's bridges."""
+    bridges = {frozenset(edge) for edge in nx.bridges(graph)}
+    for u, v in graph.edges():
+        assert rewiring.is_bridge(graph, u, v) == (frozenset((u, v)) in bridges)
+
+
+def test_edge_pool():
+    """Ensures edge pools behave like a set of undirected edges."""
+    rng = random.Random(0)
+    graph = nx.connected_watts_strogatz_graph(64, 4, 0.1, seed=0)
+    pool = rewiring.EdgePool(graph.edges())
+    expected = {frozenset(edge) for edge in graph.edges()}
+    assert len(pool) == len(expected)
+
+    pool.add((1, 0) if graph.has_edge(0, 1) else next(iter(graph.edges())))
+    assert len(pool) == len(expected)
+
+    while pool:
+        edge = pool.sample(rng)
+        assert edge in pool and edge[::-1] in pool
+        if rng.random() < 0.5:
+            pool.remove(edge[::-1])
+        else:
+            assert frozenset(pool.pop(rng)) in expected
+        assert {frozenset(edge) for edge in pool} <= expected
+        expected = {frozenset(edge) for edge in pool}
+        assert len(expected) == len(pool)
+
+    with pytest.raises(IndexError):
+        pool.sample(rng)
+    with pytest.raises(KeyError):
+        pool.remove((0, 1))
@@ -0,0 +1,72 @@
+import json
+
+import networkx as nx
+import numpy as np
+import pytest
+from abseir import csr, grapher, implicit, serialization
+
+GRAPHS = [
+    grapher.complete_graph(1),
+    grapher.complete_graph(64),
+    grapher.circulant_graph(500, {1, 7, 100}),
+    nx.relabel_nodes(nx.gnm_random_graph(300, 2000, seed=0), lambda node: f"n{node}"),
+    implicit.CirculantGraph(1000, 4),
+]
+
+
+@pytest.mark.parametrize("values", [[], [0], [127, 128, 300, 2**35, 2**64 - 1]])
+def test_varints(values: list):
+    """Ensures varints survive a round trip, including 64-bit values."""
+    values = np.array(values, dtype=np.uint64)
+    encoded = serialization.encode_varints(values)
+    assert np.array_equal(serialization.decode_varints(encoded), values)
+    with pytest.raises(ValueError):
+        serialization.decode_varints(np.append(encoded, np.uint8(0x80)))
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+@pytest.mark.parametrize("compression", serialization.available_codecs())
+def test_round_trip(graph, compression: str):
+    """Ensures encoded graphs decode to the same CSR graph, identifiers and name."""
+    graph.name = "graph"
+    expected = csr.CSRGraph.from_graph(graph)
+    data = serialization.dumps(graph, compression)
+
+    decoded = serialization.loads(data)
+    assert decoded == expected
+    assert decoded.identifiers == expected.identifiers
+    assert decoded.name == "graph"
+    assert serialization.header(data)["edges"] == expected.number_of_edges()
+
+
+def test_without_zstandard(monkeypatch):
+    """Ensures `zstd` is only available with `zstandard`, and that other codecs still
+    work without it.
+    """
+    monkeypatch.setattr(serialization, "zstandard", None)
+    assert serialization.available_codecs() == ("none", "zlib")
+
+    graph = GRAPHS[1]
+    with pytest.raises(ValueError, match="zstandard"):
+        serialization.dumps(graph, "zstd")
+    data = serialization.dumps(graph, "zlib")
+    assert serialization.loads(data) == csr.CSRGraph.from_graph(graph)
+
+
+def test_smaller_than_cytoscape():
+    """Ensures the binary encoding is much smaller than the cytoscape JSON export."""
+    graph = grapher.complete_graph(200)
+    assert len(graph.to_binary(compression="none")) * 20 < len(graph.to_cytoscape())
+
+
+def test_legacy_cytoscape():
+    """Ensures cytoscape JSON blobs (the previous `to_binary` format) still load."""
+    graph = grapher.circulant_graph(32, 3)
+    legacy = json.dumps(nx.cytoscape_data(graph)).encode("ascii")
+
+    assert serialization.is_legacy(legacy)
+    assert serialization.loads(legacy) == csr.CSRGraph.from_graph(graph)
+    assert serialization.to_cytoscape(legacy) == legacy
+    assert json.loads(serialization.to_cytoscape(graph.to_binary())) == json.loads(
+        legacy
+    )
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from abseir import series, serialization
+
+COLUMNS = ["cycle", "susceptible", "recovered"]
+
+
+@pytest.mark.parametrize("compression", serialization.available_codecs())
+@pytest.mark.parametrize(
+    "matrix",
+    [
+        np.zeros((0, 3), dtype=np.int64),
+        np.array([[0, 1000, 0], [1, 990, 10], [2, 995, 5]]),
+        np.random.default_rng(0).integers(-(2**40), 2**40, size=(240, 6)),
+    ],
+)
+def test_round_trip(matrix: np.ndarray, compression: str):
+    """Ensures encoded series decode to the same matrix, including negative values."""
+    decoded = series.loads(series.dumps(matrix, compression))
+    assert decoded.shape == matrix.shape
+    assert np.array_equal(decoded, matrix)
+
+
+def test_counts():
+    """Ensures counts convert to matrices and back, and slowly changing counts are
+    encoded in about a byte each.
+    """
+    cycles = np.arange(240)
+    counts = {
+        "cycle": cycles.tolist(),
+        "susceptible": (10**6 - 40 * cycles).tolist(),
+        "recovered": (40 * cycles).tolist(),
+    }
+    matrix = series.from_counts(counts, COLUMNS)
+    assert matrix.shape == (240, 3)
+    assert series.to_counts(matrix, COLUMNS) == counts
+    assert len(series.dumps(matrix, "none")) < 240 * 3 + 32
+
+
+def test_invalid():
+    """Ensures malformed blobs and matrices are rejected."""
+    data = series.dumps(np.ones((4, 2)))
+    with pytest.raises(ValueError):
+        series.loads(b"ABSG" + data[4:])
+    with pytest.raises(ValueError):
+        series.dumps(np.ones(4))
+    with pytest.raises(ValueError):
+        series.dumps(np.ones((4, 2)), "lz4")
@@ -0,0 +1,118 @@
+"""
+ASGI config for absier-api project.
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+Requests are handled by Django (and its middleware, e.g. CORS), but the live progress
+of simulation instances (`simulations/instances/<id>/progress`) is then streamed
+asynchronously, without holding a thread per client. Other streaming responses (e.g.
+exports, whose iterators query the database) are iterated in Django's synchronous
+thread, as Django 4.0 would iterate them inside the event loop.
+"""
+import asyncio
+import contextvars
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api.config")
+os.environ.setdefault("DJANGO_CONFIGURATION", "Production")
+
+import configurations  # noqa
+
+configurations.setup()
+
+from asgiref.sync import sync_to_async  # noqa
+from django.core.handlers.asgi import ASGIHandler  # noqa
+
+from api.simulations import progress  # noqa
+
+# `receive` channel of the request being handled
+_receive: contextvars.ContextVar = contextvars.ContextVar("receive")
+
+
+async def _disconnected(receive) -> None:
+    """Returns once the client disconnects."""
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _send_progress(instance_id, send) -> None:
+    """Sends the progress of an instance as server-sent events (see
+    `api.simulations.progress`) until it completes.
+    """
+    async for chunk in progress.stream_async(instance_id):
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _next_part(parts):
+    """Next part of a streaming response, or `None` once exhausted."""
+    return next(parts, None)
+
+
+class ProgressASGIHandler(ASGIHandler):
+    """Django's ASGI handler, streaming the events of `ProgressResponse`s
+    asynchronously until their instance completes or the client disconnects, and the
+    parts of other streaming responses from Django's synchronous thread.
+    """
+
+    async def handle(self, scope, receive, send):
+        _receive.set(receive)
+        await super().handle(scope, receive, send)
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            await super().send_response(response, send)
+            return
+
+        headers = [
+            (header.encode("ascii"), value.encode("latin1"))
+            for header, value in response.items()
+        ]
+        headers += [
+            (b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+            for cookie in response.cookies.values()
+        ]
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": headers,
+            }
+        )
+
+        if not isinstance(response, progress.ProgressResponse):
+            try:
+                await self._send_parts(response, send)
+            finally:
+                await sync_to_async(response.close, thread_sensitive=True)()
+            return
+
+        streaming = asyncio.ensure_future(_send_progress(response.instance_id, send))
+        disconnected = asyncio.ensure_future(_disconnected(_receive.get()))
+        try:
+            await asyncio.wait(
+                (streaming, disconnected), return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            disconnected.cancel()
+            streaming.cancel()
+            try:
+                await streaming
+            except asyncio.CancelledError:
+                pass
+            await sync_to_async(response.close, thread_sensitive=True)()
+
+    async def _send_parts(self, response, send) -> None:
+        """Sends the parts of a streaming response, iterated in the thread its
+        view ran in (`thread_sensitive`) rather than the event loop.
+        """
+        parts = iter(response)
+        next_part = sync_to_async(_next_part, thread_sensitive=True)
+        while (part := await next_part(parts)) is not None:
+            for chunk, _ in self.chunk_bytes(part):
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+        await send({"type": "http.response.body", "body": b""})
+
+
+application = ProgressASGIHandler()
@@ -197,3 +197,73 @@ class Common(Configuration):
             "rest_framework.authentication.TokenAuthentication",
         ),
     }
+
+    # Background jobs
+    # Number of server processes (e.g. gunicorn workers), which share the worker
+    # processes below between them
+    SERVER_PROCESSES = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # Number of processes generating graphs (0 = one per CPU)
+    GRAPH_GENERATION_WORKERS = int(os.getenv("DJANGO_GRAPH_GENERATION_WORKERS", "0"))
+    # Seconds a graph may stay pending or generating before it is failed
+    GRAPH_GENERATION_TIMEOUT = float(
+        os.getenv("DJANGO_GRAPH_GENERATION_TIMEOUT", "3600")
+    )
+    # Seconds between checks of graphs being generated by other server processes
+    GRAPH_STATUS_POLL_INTERVAL = float(
+        os.getenv("DJANGO_GRAPH_STATUS_POLL_INTERVAL", "1")
+    )
+
+    # Number of processes simulating samples (0 = one per CPU)
+    SIMULATION_WORKERS = int(os.getenv("DJANGO_SIMULATION_WORKERS", "0"))
+    # Bytes of decoded graphs each simulation worker keeps resident (least recently
+    # used graphs beyond it are evicted)
+    SIMULATION_GRAPH_CACHE_BYTES = int(
+        os.getenv("DJANGO_SIMULATION_GRAPH_CACHE_BYTES", str(512 * 2**20))
+    )
+    # Pending samples a simulation worker holding a sample's graph may have beyond the
+    # least busy worker and still get the sample (rather than the least busy worker
+    # decoding the graph too)
+    SIMULATION_AFFINITY_BACKLOG = int(
+        os.getenv("DJANGO_SIMULATION_AFFINITY_BACKLOG", "2")
+    )
+    # Store simulation data as `rows` (`Data`) or compressed `series` per sample (see
+    # `api.simulations.ingest`)
+    SIMULATION_DATA_STORAGE = os.getenv("DJANGO_SIMULATION_DATA_STORAGE", "rows")
+    # Write simulation data with Postgres `COPY` (or else batches of `bulk_create`)
+    SIMULATION_DATA_COPY = strtobool(os.getenv("DJANGO_SIMULATION_DATA_COPY", "yes"))
+    SIMULATION_DATA_BATCH_SIZE = int(
+        os.getenv("DJANGO_SIMULATION_DATA_BATCH_SIZE", "5000")
+    )
+
+    # Data rows per page of `simulations/data` by default, and at most (`?page_size=`)
+    SIMULATION_DATA_PAGE_SIZE = int(
+        os.getenv("DJANGO_SIMULATION_DATA_PAGE_SIZE", "1000")
+    )
+    SIMULATION_DATA_MAX_PAGE_SIZE = int(
+        os.getenv("DJANGO_SIMULATION_DATA_MAX_PAGE_SIZE", "10000")
+    )
+
+    # Rows read at a time (by a server-side cursor) by simulation result exports
+    SIMULATION_EXPORT_CHUNK_SIZE = int(
+        os.getenv("DJANGO_SIMULATION_EXPORT_CHUNK_SIZE", "10000")
+    )
+
+    # Live progress streams of instances (see `api.simulations.progress`): seconds
+    # between keepalives (and status snapshots) of idle streams, and the events queued
+    # for a slow client before the oldest are dropped
+    SIMULATION_PROGRESS_KEEPALIVE = float(
+        os.getenv("DJANGO_SIMULATION_PROGRESS_KEEPALIVE", "15")
+    )
+    SIMULATION_PROGRESS_QUEUE = int(
+        os.getenv("DJANGO_SIMULATION_PROGRESS_QUEUE", "1000")
+    )
+
+    # Graph views (reduced graphs for browsing, see `abseir.detail`), precomputed with
+    # every method at each of `GRAPH_VIEW_BUDGETS` edges as graphs are generated.
+    # Requests get the largest view within their `budget` (or the default budget)
+    GRAPH_VIEW_BUDGETS = list(
+        map(int, os.getenv("DJANGO_GRAPH_VIEW_BUDGETS", "1000,5000,20000").split(","))
+    )
+    GRAPH_VIEW_DEFAULT_BUDGET = int(
+        os.getenv("DJANGO_GRAPH_VIEW_DEFAULT_BUDGET", "5000")
+    )
@@ -0,0 +1,382 @@
+"""
+Background graph generation.
+
+Creating a graph only saves it as `pending`; its data (along with its layout, metrics
+and views, see `abseir.layout`, `abseir.metrics` and `abseir.detail`) is generated by a
+worker process of its own, and its `status` moves through `generating` to `ready` (or
+`failed`). The process is killed when its job ends, so a graph that takes longer than
+`GRAPH_GENERATION_TIMEOUT` does not keep computing.
+Anything that needs a graph's data (e.g. simulation instances) can wait for it with
+`when_ready()`.
+
+Graphs that stay `pending` or `generating` for longer than `GRAPH_GENERATION_TIMEOUT`
+(e.g. because the server process generating them stopped) are failed, and `recover()`
+(the `recover_graphs` command) generates the `pending` graphs left behind when servers
+start.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import timedelta
+from multiprocessing.pool import Pool
+from typing import Callable, Iterator, Optional
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from abseir import detail, grapher, layout, metrics
+
+from .models import Circulant, Complete, Graph, GraphView, hash_data
+
+log = logging.getLogger(__name__)
+
+# Name of each graph model's generator (see `abseir.grapher.GENERATORS`) and its arguments
+GENERATORS: dict[type, tuple[str, Callable[[Graph], dict]]] = {
+    Circulant: (
+        "circulant",
+        lambda graph: {"order": graph.order, "jumps": graph.jumps},
+    ),
+    Complete: ("complete", lambda graph: {"order": graph.order}),
+}
+
+# Layout method of each graph model (see `abseir.layout.METHODS`), force-directed if
+# unlisted. Circulant and complete graphs are drawn symmetrically on a circle.
+LAYOUTS: dict[type, str] = {Circulant: "circular", Complete: "circular"}
+
+UNFINISHED = (Graph.Status.PENDING, Graph.Status.GENERATING)
+
+_lock = threading.Lock()
+_threads: Optional[ThreadPoolExecutor] = None
+_poller: Optional[threading.Thread] = None
+_generating: set = set()  # ids of graphs generated by this process
+_viewing: set = set()  # ids of graphs whose views are generated by this process
+_waiting: dict = defaultdict(list)  # graph id -> callbacks waiting for it
+_polled: dict = defaultdict(list)  # (model, graph id) -> callbacks polling it
+
+
+def worker_processes(workers: int) -> int:
+    """This server process' share of `workers` processes (0 = one per CPU), split
+    between the `SERVER_PROCESSES` server processes.
+    """
+    return max(1, (workers or os.cpu_count() or 1) // settings.SERVER_PROCESSES)
+
+
+def _executors() -> ThreadPoolExecutor:
+    """Lazily starts the threads that run jobs (each in a worker process, see
+    `_worker()`) and save their results.
+    """
+    global _threads  # pylint: disable=global-statement
+    with _lock:
+        if _threads is None:
+            _threads = ThreadPoolExecutor(
+                max_workers=worker_processes(settings.GRAPH_GENERATION_WORKERS),
+                thread_name_prefix="graph-generation",
+            )
+    return _threads
+
+
+@contextmanager
+def _worker() -> Iterator[Pool]:
+    """A worker process for a single job, killed (rather than left running) when the
+    job ends, e.g. on a timeout.
+
+    It is spawned rather than forked from the (threaded) server process.
+    """
+    with multiprocessing.get_context("spawn").Pool(1) as worker:
+        yield worker
+
+
+def _run(worker: Pool, deadline: float, function: Callable, *args, **kwargs):
+    """Result of `function(*args, **kwargs)` run in `worker`, raising
+    `multiprocessing.TimeoutError` if it is not done by `deadline` (`time.monotonic()`).
+    """
+    return worker.apply_async(function, args, kwargs).get(
+        max(0, deadline - time.monotonic())
+    )
+
+
+def generate(graph: Graph):
+    """Generates the data of a `pending` graph in the background.
+
+    Call this after the graph's row is committed (e.g. `transaction.on_commit()`).
+    """
+    name, arguments = GENERATORS[type(graph)]
+    with _lock:
+        _generating.add(graph.id)
+    threads = _executors()
+    threads.submit(_generate, type(graph), graph.id, name, arguments(graph))
+
+
+def recover() -> int:
+    """Fails the graphs left `generating` for longer than `GRAPH_GENERATION_TIMEOUT`,
+    and generates the `pending` ones (e.g. those of stopped server processes), waiting
+    for them. Returns how many graphs were generated.
+
+    Run once as servers start (see the `recover_graphs` command). Graphs are claimed
+    atomically, so recovering in several processes at once generates each graph once.
+    """
+    threads = _executors()
+    futures = []
+    for model, (name, arguments) in GENERATORS.items():
+        _fail_stale(model.objects.filter(status=Graph.Status.GENERATING))
+        pending = model.objects.filter(status=Graph.Status.PENDING)
+        for graph in pending.defer("data", "layout", "metrics"):
+            if _claim(model, graph.id):
+                futures.append(
+                    threads.submit(
+                        _generate, model, graph.id, name, arguments(graph), True
+                    )
+                )
+    wait(futures)
+    return len(futures)
+
+
+def _claim(model: type, graph_id) -> bool:
+    """Claims a `pending` graph for generation, unless another process did first."""
+    return bool(
+        model.objects.filter(id=graph_id, status=Graph.Status.PENDING).update(
+            status=Graph.Status.GENERATING, status_changed=timezone.now()
+        )
+    )
+
+
+def _fail_stale(graphs: QuerySet) -> int:
+    """Fails the unfinished `graphs` whose status last changed more than
+    `GRAPH_GENERATION_TIMEOUT` ago, and returns how many.
+    """
+    now = timezone.now()
+    deadline = now - timedelta(seconds=settings.GRAPH_GENERATION_TIMEOUT)
+    return graphs.filter(status__in=UNFINISHED, status_changed__lt=deadline).update(
+        status=Graph.Status.FAILED, status_changed=now
+    )
+
+
+def _generate(model: type, graph_id, name: str, arguments: dict, claimed: bool = False):
+    close_old_connections()
+    status = Graph.Status.FAILED
+    try:
+        if not (claimed or _claim(model, graph_id)):
+            # Generated (or failed) by another server process: poll it instead
+            _hand_over(model, graph_id)
+            return
+
+        deadline = time.monotonic() + settings.GRAPH_GENERATION_TIMEOUT
+        with _worker() as worker:
+            data = _run(worker, deadline, grapher.generate_binary, name, **arguments)
+            graph_metrics = _run(
+                worker, deadline, metrics.generate_metrics, name, data, **arguments
+            )
+            positions = _run(
+                worker,
+                deadline,
+                layout.layout_binary,
+                data,
+                LAYOUTS.get(model, "force"),
+            )
+            views = _run(
+                worker,
+                deadline,
+                detail.views_binary,
+                data,
+                settings.GRAPH_VIEW_BUDGETS,
+                positions=positions,
+            )
+
+        with transaction.atomic():
+            saved = model.objects.filter(
+                id=graph_id, status=Graph.Status.GENERATING
+            ).update(
+                data=data,
+                data_hash=hash_data(data),
+                layout=positions,
+                metrics=graph_metrics,
+                status=Graph.Status.READY,
+                status_changed=timezone.now(),
+            )
+            if saved:
+                _save_views(model, graph_id, views)
+        if saved:
+            status = Graph.Status.READY
+        else:
+            log.error("%s graph %s was failed while generating", name, graph_id)
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Failed to generate %s graph %s", name, graph_id)
+        model.objects.filter(id=graph_id, status__in=UNFINISHED).update(
+            status=Graph.Status.FAILED, status_changed=timezone.now()
+        )
+    finally:
+        connection.close()
+        _finish(graph_id, status == Graph.Status.READY)
+
+
+def generate_views(graph: Graph):
+    """Generates the views of a `ready` graph that has none yet (e.g. one generated
+    before views were), and its layout if it has none either, in the background.
+    """
+    with _lock:
+        if graph.id in _viewing:
+            return
+        _viewing.add(graph.id)
+    threads = _executors()
+    threads.submit(_generate_views, type(graph), graph.id)
+
+
+def _generate_views(model: type, graph_id):
+    close_old_connections()
+    try:
+        graph = model.objects.get(id=graph_id)
+        data = bytes(graph.data)
+        deadline = time.monotonic() + settings.GRAPH_GENERATION_TIMEOUT
+        with _worker() as worker:
+            if graph.layout is None:
+                graph.layout = _run(
+                    worker,
+                    deadline,
+                    layout.layout_binary,
+                    data,
+                    LAYOUTS.get(model, "force"),
+                )
+                graph.save(update_fields=["layout"])
+            views = _run(
+                worker,
+                deadline,
+                detail.views_binary,
+                data,
+                settings.GRAPH_VIEW_BUDGETS,
+                positions=bytes(graph.layout),
+            )
+        _save_views(model, graph_id, views)
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Failed to generate the views of graph %s", graph_id)
+    finally:
+        connection.close()
+        with _lock:
+            _viewing.discard(graph_id)
+
+
+def _save_views(model: type, graph_id, views: dict):
+    """Saves the views of a graph (see `abseir.detail.views_binary`)."""
+    graph_type = ContentType.objects.get_for_model(model)
+    GraphView.objects.bulk_create(
+        [
+            GraphView(
+                graph_type=graph_type,
+                graph_id=graph_id,
+                method=method,
+                budget=budget,
+                data=data,
+            )
+            for (method, budget), data in views.items()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _finish(graph_id, ready: bool):
+    with _lock:
+        _generating.discard(graph_id)
+        callbacks = _waiting.pop(graph_id, [])
+    for callback in callbacks:
+        _run_callback(callback, ready)
+
+
+def _hand_over(model: type, graph_id):
+    """Polls a graph that this process stopped generating for its waiting callbacks."""
+    with _lock:
+        _generating.discard(graph_id)
+        callbacks = _waiting.pop(graph_id, [])
+    for callback in callbacks:
+        _poll(model, graph_id, callback)
+
+
+def _run_callback(callback: Callable[[bool], None], ready: bool):
+    try:
+        callback(ready)
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Graph generation callback failed")
+    finally:
+        connection.close()
+
+
+def _poll(model: type, graph_id, callback: Callable[[bool], None]):
+    """Calls `callback(ready)` once the poller sees the graph finish."""
+    global _poller  # pylint: disable=global-statement
+    with _lock:
+        _polled[model, graph_id].append(callback)
+        if _poller is None:
+            _poller = threading.Thread(
+                target=_poll_forever, name="graph-status-poller", daemon=True
+            )
+            _poller.start()
+
+
+def _poll_forever():
+    """Checks the status of every polled graph every `GRAPH_STATUS_POLL_INTERVAL`
+    seconds, failing those unfinished past `GRAPH_GENERATION_TIMEOUT`.
+    """
+    while True:
+        time.sleep(settings.GRAPH_STATUS_POLL_INTERVAL)
+        with _lock:
+            polled = list(_polled)
+        graph_ids = defaultdict(list)
+        for model, graph_id in polled:
+            graph_ids[model].append(graph_id)
+
+        finished = {}
+        try:
+            for model, ids in graph_ids.items():
+                _fail_stale(model.objects.filter(id__in=ids))
+                statuses = dict(
+                    model.objects.filter(id__in=ids).values_list("id", "status")
+                )
+                for graph_id in ids:
+                    # Deleted graphs never become ready
+                    status = statuses.get(graph_id, Graph.Status.FAILED)
+                    if status not in UNFINISHED:
+                        finished[model, graph_id] = status == Graph.Status.READY
+        except DatabaseError:
+            log.exception("Failed to poll the status of graphs")
+        finally:
+            connection.close()
+
+        with _lock:
+            callbacks = [
+                (callback, ready)
+                for key, ready in finished.items()
+                for callback in _polled.pop(key, [])
+            ]
+        for callback, ready in callbacks:
+            _run_callback(callback, ready)
+
+
+def when_ready(graph: Graph, callback: Callable[[bool], None]):
+    """Calls `callback(ready)` in the background once `graph` has finished generating,
+    where `ready` is whether it succeeded (which it does not once it stays unfinished
+    for `GRAPH_GENERATION_TIMEOUT` seconds).
+
+    Graphs generated by other server processes are polled every
+    `GRAPH_STATUS_POLL_INTERVAL` seconds.
+    """
+    graph.refresh_from_db(fields=["status"])
+    if graph.status in UNFINISHED:
+        with _lock:
+            if graph.id in _generating:
+                _waiting[graph.id].append(callback)
+                return
+        # Not generated by this process, or it finished since
+        graph.refresh_from_db(fields=["status"])
+
+    if graph.status in UNFINISHED:
+        _poll(type(graph), graph.id, callback)
+    else:
+        threads = _executors()
+        threads.submit(_run_callback, callback, graph.status == Graph.Status.READY)
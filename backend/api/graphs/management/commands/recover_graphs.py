@@ -0,0 +1,15 @@
+"""
+Generates the graphs left unfinished by stopped servers (see `api.graphs.jobs.recover`).
+Run once as servers start.
+"""
+from django.core.management.base import BaseCommand
+
+from api.graphs import jobs
+
+
+class Command(BaseCommand):
+    help = "Fails graphs stuck generating, and generates pending graphs"
+
+    def handle(self, *args, **options):
+        generated = jobs.recover()
+        self.stdout.write(f"Generated {generated} pending graph(s)")
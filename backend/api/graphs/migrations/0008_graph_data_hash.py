@@ -0,0 +1,37 @@
+# Generated by Django 4.0.4 on 2026-10-19 01:52
+
+import hashlib
+
+from django.db import migrations, models
+from django.db.migrations.state import StateApps
+from django.db.backends.postgresql.schema import BaseDatabaseSchemaEditor
+
+
+def populate_data_hashes(apps: StateApps, schema_editor: BaseDatabaseSchemaEditor):
+    # Hash the data of graphs created before `data_hash` existed
+    for model_name in ("Circulant", "Complete"):
+        Graph = apps.get_model("graphs", model_name)
+        for graph in Graph.objects.only("id", "data").iterator():
+            graph.data_hash = hashlib.sha256(bytes(graph.data or b"")).hexdigest()
+            graph.save(update_fields=["data_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graphs', '0007_rename_circulantgraph_circulant_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='circulant',
+            name='data_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='complete',
+            name='data_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(populate_data_hashes, migrations.RunPython.noop),
+    ]
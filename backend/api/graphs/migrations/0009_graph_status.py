@@ -0,0 +1,45 @@
+# Generated by Django 4.0.4 on 2026-10-19 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graphs', '0008_graph_data_hash'),
+    ]
+
+    operations = [
+        # Graphs created before background generation were generated synchronously
+        migrations.AddField(
+            model_name='circulant',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('generating', 'Generating'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', editable=False, max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='circulant',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('generating', 'Generating'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', editable=False, max_length=16),
+        ),
+        # Graphs created before background generation were generated synchronously
+        migrations.AddField(
+            model_name='complete',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('generating', 'Generating'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', editable=False, max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='complete',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('generating', 'Generating'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', editable=False, max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='circulant',
+            name='data',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='complete',
+            name='data',
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.4 on 2026-10-19 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graphs', '0009_graph_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='circulant',
+            name='layout',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name='complete',
+            name='layout',
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.4 on 2026-10-19 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graphs', '0010_graph_layout'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='circulant',
+            name='metrics',
+            field=models.JSONField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='complete',
+            name='metrics',
+            field=models.JSONField(editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.0.4 on 2026-10-19 02:44
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graphs', '0011_graph_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='circulant',
+            name='status_changed',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='complete',
+            name='status_changed',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.0.4 on 2026-10-19 02:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('graphs', '0012_graph_status_changed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GraphView',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('graph_id', models.UUIDField()),
+                ('method', models.CharField(max_length=16)),
+                ('budget', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('graph_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='graphview',
+            constraint=models.UniqueConstraint(fields=('graph_type', 'graph_id', 'method', 'budget'), name='AK_graph_view_properties'),
+        ),
+    ]
@@ -1,10 +1,19 @@
 """Contains models for Graph objects"""
 
+import hashlib
 import uuid
 
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.contrib.postgres import fields
 from django.core import validators
 from django.db import models
+from django.utils import timezone
+
+
+def hash_data(data) -> str:
+    """Hex digest identifying the contents of a graph's `data`."""
+    return hashlib.sha256(bytes(data or b"")).hexdigest()
 
 
 class _GraphModel(models.Model):
@@ -21,15 +30,44 @@ class Graph(_GraphModel):
     Common properties that all graphs share
     ```
     id: UUID
-    data: Blob
+    data: Blob     # See `abseir.serialization`, null until generated
+    data_hash: str # SHA-256 of `data`
+    layout: Blob   # float32 (x, y) of every node (see `abseir.layout`), null until laid out
+    metrics: dict  # See `abseir.metrics.compute`, null until generated
     order: int # Positive
+    status: str    # pending -> generating -> ready/failed
+    status_changed: datetime
+    views: GraphView # Precomputed reduced views, generated along with `data`
     ```
     """
 
-    data = models.BinaryField(editable=False)
+    class Status(models.TextChoices):
+        """Progress of a graph's (background) generation"""
+
+        PENDING = "pending"
+        GENERATING = "generating"
+        READY = "ready"
+        FAILED = "failed"
+
+    data = models.BinaryField(editable=False, null=True)
+    data_hash = models.CharField(max_length=64, editable=False, blank=True)
+    layout = models.BinaryField(editable=False, null=True)
+    metrics = models.JSONField(editable=False, null=True)
     order = models.PositiveIntegerField(validators=[validators.MinValueValidator(1)])
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING, editable=False
+    )
+    status_changed = models.DateTimeField(default=timezone.now, editable=False)
+    views = GenericRelation(
+        "GraphView", content_type_field="graph_type", object_id_field="graph_id"
+    )
     # owner_id = models.ForeignKey(to=Users, on_delete=models.CASCADE)
 
+    def save(self, *args, **kwargs):
+        """Keeps `data_hash` (used as the ETag of the graph's data) up to date."""
+        self.data_hash = hash_data(self.data) if self.data is not None else ""
+        super().save(*args, **kwargs)
+
     def __str__(self):
         """Converts print output of Graph models from e.g. `"Complete ..."` to `"Complete graph ..."`"""
         return (
@@ -43,6 +81,34 @@ class Graph(_GraphModel):
         ordering = ["-order"]
 
 
+class GraphView(_GraphModel):
+    """
+    Reduced view of a graph for browsing (see `abseir.detail`), precomputed when the
+    graph is generated
+    ```
+    graph: Graph  # Circulant, complete, ...
+    method: str   # See `abseir.detail.METHODS`
+    budget: int   # Most edges of the view
+    data: Blob    # cytoscape JSON
+    ```
+    """
+
+    graph_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    graph_id = models.UUIDField()
+    graph = GenericForeignKey("graph_type", "graph_id")
+    method = models.CharField(max_length=16)
+    budget = models.PositiveIntegerField()
+    data = models.BinaryField()
+
+    class Meta(_GraphModel.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["graph_type", "graph_id", "method", "budget"],
+                name="AK_graph_view_properties",
+            )
+        ]
+
+
 class Circulant(Graph):
     """
     Database representation of the circulant graph
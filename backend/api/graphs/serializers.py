@@ -4,21 +4,26 @@ Defines how graph views interact with graph models, in addition to:
 * gracefully handling unique constraint violations (400 Bad Request)
 * providing validation for more complicated graphs (e.g. circulant)
 """
+import base64
 import operator
+from typing import Optional
 
 from django.db import IntegrityError
 from rest_framework import serializers
 
+from abseir import serialization
+
 from .models import Circulant, Complete
 
 
 class _GraphSerializer(serializers.ModelSerializer):
     """Abstract graph serializer that provides common behavior:
-    * defines common exposed fields (`id`, `order`)
+    * defines common exposed fields (`id`, `order`, `status`, `metrics`)
     * handles unique constraint violations as HTTP 400s (Bad Request)
 
     This serializer does not expose raw graph data for network traffic speed reasons
-    (see: `_GraphDataSerializer`).
+    (see: `_GraphDataSerializer`). Graph data is generated in the background, and
+    `status` tells whether it is ready.
     """
 
     def save(self, **kwargs):
@@ -26,7 +31,7 @@ class _GraphSerializer(serializers.ModelSerializer):
         violations as HTTP 400s (Bad Request).
         """
         try:
-            super().save(**kwargs)
+            return super().save(**kwargs)
         except IntegrityError as error:
             if "unique constraint" in str(error):
                 raise serializers.ValidationError(
@@ -38,18 +43,34 @@ class _GraphSerializer(serializers.ModelSerializer):
         fields = (
             "id",
             "order",
+            "status",
+            "metrics",
         )
-        read_only_fields = ("id",)
+        read_only_fields = ("id", "status", "metrics")
 
 
 class _GraphDataSerializer(serializers.ModelSerializer):
-    """Abstract graph data serializer that defines common exposed fields (`id`, `data`)."""
+    """Abstract graph data serializer that defines common exposed fields (`id`, `data`).
+
+    Graphs are stored in a compact binary format (see :mod:`abseir.serialization`),
+    but `data` is exported on demand as base64-encoded cytoscape JSON for rendering.
+    """
+
+    data = serializers.SerializerMethodField()
+
+    def get_data(self, graph) -> Optional[str]:
+        if graph.data is None:
+            return None
+        return base64.b64encode(serialization.to_cytoscape(bytes(graph.data))).decode(
+            "ascii"
+        )
 
     class Meta:
         fields = (
             "id",
             "data",
             "order",
+            "status",
         )
         read_only_fields = fields
 
@@ -0,0 +1,153 @@
+"""
+Streams raw graph data as cacheable HTTP responses.
+
+Graphs never change once generated, so responses carry a strong `ETag` derived from the
+hash of their data and may be cached forever by clients. Supports:
+
+* conditional requests (`If-None-Match` -> 304 Not Modified)
+* partial requests (`Range`/`If-Range` -> 206 Partial Content) of unencoded data
+* compression (`Accept-Encoding: zstd/gzip`, `zstd` only with the optional `zstandard`
+  package, see `available_encodings`)
+"""
+
+import gzip
+import re
+from typing import Callable, Iterator, Optional, Union
+
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+CHUNK_SIZE = 64 * 1024
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _chunks(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """Yields `data[start:end]` in chunks of `CHUNK_SIZE` bytes without copying it."""
+    view = memoryview(data)[start:end]
+    for offset in range(0, len(view), CHUNK_SIZE):
+        yield bytes(view[offset : offset + CHUNK_SIZE])
+
+
+def available_encodings() -> list[str]:
+    """Content codings that can be served here, preferred first."""
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+def _accepted_encoding(request: HttpRequest) -> Optional[str]:
+    """The preferred available content coding of the request (`zstd` or `gzip`)."""
+    accepted = {}
+    for coding in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, parameters = coding.strip().partition(";")
+        quality = 1.0
+        match = re.search(r"q=([\d.]+)", parameters)
+        if match:
+            quality = float(match.group(1))
+        accepted[name.strip().lower()] = quality
+
+    candidates = [
+        coding for coding in available_encodings() if accepted.get(coding, 0) > 0
+    ]
+    return max(candidates, key=lambda coding: accepted[coding], default=None)
+
+
+def _encode(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor().compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _matches(header: str, etag: str) -> bool:
+    """Whether an `If-None-Match` header matches `etag` (weak comparison)."""
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+
+def _parse_range(header: str, length: int) -> Optional[tuple[int, int]]:
+    """Parses a single-range `Range` header into an inclusive `(start, end)` pair, or
+    raises `ValueError` if it cannot be satisfied. Returns `None` if it is ignored.
+    """
+    match = _RANGE_PATTERN.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), length - 1) if last else length - 1
+    elif last:
+        start, end = max(length - int(last), 0), length - 1
+    else:
+        return None
+    if start > end or start >= length:
+        raise ValueError(header)
+    return start, end
+
+
+def data_response(
+    request: HttpRequest,
+    data: Union[bytes, Callable[[], bytes]],
+    content_hash: str,
+    content_type: str = "application/octet-stream",
+    variant: str = "",
+) -> HttpResponse:
+    """Responds with `data` (identified by `content_hash`) for `request`.
+
+    `data` may be a function returning the data, which is only called if the client does
+    not already have it cached. Different representations of the same data (e.g.
+    exports) must pass a distinct `variant`, since it is part of their ETag.
+    """
+    identity = f"{content_hash}-{variant}" if variant else content_hash
+    encoding = _accepted_encoding(request)
+    has_range = "Range" in request.headers
+
+    # Range requests are only served for unencoded data, since offsets into
+    # compressed data are meaningless for clients
+    if has_range:
+        encoding = None
+    etag = f'"{identity}-{encoding}"' if encoding else f'"{identity}"'
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+        "Accept-Ranges": "bytes",
+    }
+
+    if _matches(request.headers.get("If-None-Match", ""), etag):
+        return HttpResponse(status=304, headers=headers)
+    if callable(data):
+        data = data()
+
+    if has_range and request.headers.get("If-Range", etag) == etag:
+        try:
+            byte_range = _parse_range(request.headers["Range"], len(data))
+        except ValueError:
+            return HttpResponse(
+                status=416, headers={**headers, "Content-Range": f"bytes */{len(data)}"}
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            return StreamingHttpResponse(
+                _chunks(data, start, end + 1),
+                status=206,
+                content_type=content_type,
+                headers={
+                    **headers,
+                    "Content-Range": f"bytes {start}-{end}/{len(data)}",
+                    "Content-Length": str(end - start + 1),
+                },
+            )
+
+    if encoding:
+        data = _encode(data, encoding)
+        headers["Content-Encoding"] = encoding
+    return StreamingHttpResponse(
+        _chunks(data),
+        content_type=content_type,
+        headers={**headers, "Content-Length": str(len(data))},
+    )
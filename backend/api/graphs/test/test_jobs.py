@@ -0,0 +1,72 @@
+import multiprocessing
+import os
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from nose.tools import assert_raises, eq_, ok_
+
+from .. import jobs
+from ..models import Complete, Graph
+
+
+class TestRecover(TestCase):
+    """
+    Tests the recovery of graphs left unfinished by stopped servers.
+    """
+
+    def test_recover(self):
+        pending = Complete.objects.create(order=10)
+        stale = Complete.objects.create(
+            order=11,
+            status=Graph.Status.GENERATING,
+            status_changed=timezone.now() - timedelta(days=1),
+        )
+        running = Complete.objects.create(order=12, status=Graph.Status.GENERATING)
+
+        with mock.patch.object(jobs, "_generate") as generate:
+            eq_(jobs.recover(), 1)
+            # Already claimed (e.g. by another server process)
+            eq_(jobs.recover(), 0)
+        generate.assert_called_once_with(
+            Complete, pending.id, "complete", {"order": 10}, True
+        )
+
+        statuses = dict(Complete.objects.values_list("id", "status"))
+        eq_(statuses[pending.id], Graph.Status.GENERATING)
+        eq_(statuses[stale.id], Graph.Status.FAILED)
+        eq_(statuses[running.id], Graph.Status.GENERATING)
+
+
+class TestTimeout(TransactionTestCase):
+    """
+    Tests that jobs running past their timeout are killed.
+    """
+
+    serialized_rollback = True
+
+    def test_worker_killed(self):
+        with jobs._worker() as worker:
+            pid = worker.apply(os.getpid)
+            with assert_raises(multiprocessing.TimeoutError):
+                jobs._run(worker, time.monotonic() + 0.1, time.sleep, 60)
+        with assert_raises(ProcessLookupError):
+            os.kill(pid, 0)
+
+    def test_generation(self):
+        graph = Complete.objects.create(order=10)
+        jobs._generate(Complete, graph.id, "complete", {"order": 10})
+        graph.refresh_from_db()
+        eq_(graph.status, Graph.Status.READY)
+        ok_(graph.views.exists())
+        eq_(multiprocessing.active_children(), [])
+
+    @override_settings(GRAPH_GENERATION_TIMEOUT=0.01)
+    def test_generation_timeout(self):
+        graph = Complete.objects.create(order=10)
+        jobs._generate(Complete, graph.id, "complete", {"order": 10})
+        graph.refresh_from_db()
+        eq_(graph.status, Graph.Status.FAILED)
+        eq_(multiprocessing.active_children(), [])
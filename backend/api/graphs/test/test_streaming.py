@@ -0,0 +1,44 @@
+import gzip
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase
+from nose.tools import eq_, ok_
+
+from .. import streaming
+
+DATA = bytes(range(256)) * 1024
+
+
+class TestDataResponse(SimpleTestCase):
+    """
+    Tests content negotiation of streamed graph data.
+    """
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def get(self, **headers):
+        request = self.factory.get("/", **headers)
+        response = streaming.data_response(request, DATA, "hash")
+        return response, b"".join(response.streaming_content)
+
+    def test_zstd_falls_back_to_gzip_without_zstandard(self):
+        with mock.patch.object(streaming, "zstandard", None):
+            eq_(streaming.available_encodings(), ["gzip"])
+            response, body = self.get(HTTP_ACCEPT_ENCODING="zstd, gzip;q=0.5")
+        eq_(response["Content-Encoding"], "gzip")
+        eq_(response["ETag"], '"hash-gzip"')
+        eq_(gzip.decompress(body), DATA)
+
+    def test_zstd_only_is_unencoded_without_zstandard(self):
+        with mock.patch.object(streaming, "zstandard", None):
+            response, body = self.get(HTTP_ACCEPT_ENCODING="zstd")
+        ok_(not response.has_header("Content-Encoding"))
+        eq_(body, DATA)
+
+    def test_zstd_with_zstandard(self):
+        if streaming.zstandard is None:
+            self.skipTest("zstandard is not installed")
+        response, body = self.get(HTTP_ACCEPT_ENCODING="zstd, gzip;q=0.5")
+        eq_(response["Content-Encoding"], "zstd")
+        eq_(streaming.zstandard.ZstdDecompressor().decompress(body), DATA)
@@ -0,0 +1,39 @@
+from unittest import mock
+
+from nose.tools import eq_
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import jobs
+from ..models import Complete, Graph
+
+
+class TestLayout(APITestCase):
+    """
+    Tests serving graph layouts, computed in the background when missing.
+    """
+
+    def setUp(self):
+        self.graph = Complete.objects.create(
+            order=3, data=b"data", status=Graph.Status.READY
+        )
+        self.url = f"/api/v1/graphs/complete/{self.graph.id}/layout"
+
+    def test_layout_computed_in_background(self):
+        with mock.patch.object(jobs, "generate_views") as generate_views:
+            response = self.client.get(self.url)
+        eq_(response.status_code, status.HTTP_409_CONFLICT)
+        generate_views.assert_called_once_with(self.graph)
+
+    def test_layout(self):
+        Complete.objects.filter(id=self.graph.id).update(layout=b"layout")
+        with mock.patch.object(jobs, "generate_views") as generate_views:
+            response = self.client.get(self.url)
+        eq_(response.status_code, status.HTTP_200_OK)
+        eq_(b"".join(response.streaming_content), b"layout")
+        generate_views.assert_not_called()
+
+    def test_pending(self):
+        Complete.objects.filter(id=self.graph.id).update(status=Graph.Status.PENDING)
+        response = self.client.get(self.url)
+        eq_(response.status_code, status.HTTP_409_CONFLICT)
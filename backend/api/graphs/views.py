@@ -1,15 +1,19 @@
 """
 Endpoints to create, list, and retrieve individual graphs.
 """
-import operator
-
-from rest_framework import mixins, viewsets
+from django.conf import settings
+from django.db import transaction
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.permissions import AllowAny
+from rest_framework.request import Request
 
-from abseir import grapher
+from abseir import detail, serialization
 
 # from .permissions import IsUserOrReadOnly
-from .models import Circulant, Complete
+from . import jobs, streaming
+from .models import Circulant, Complete, Graph, hash_data
 from .serializers import (
     CirculantGraphDataSerializer,
     CirculantGraphSerializer,
@@ -23,8 +27,26 @@ class _GraphViewSet(
     mixins.ListModelMixin,
     viewsets.GenericViewSet,
 ):
+    """Creating a graph responds immediately with its `id` and `pending` status, and
+    generates its data in the background (see `jobs`).
+    """
+
     permission_classes = (AllowAny,)
 
+    def get_queryset(self):
+        # Listed graphs never include their data or layout
+        return super().get_queryset().defer("data", "layout")
+
+    def perform_create(self, serializer):
+        graph = serializer.save(status=Graph.Status.PENDING)
+        transaction.on_commit(lambda: jobs.generate(graph))
+
+
+class GraphNotReady(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Graph has not finished generating"
+    default_code = "graph_not_ready"
+
 
 class _GraphDataViewSet(
     mixins.RetrieveModelMixin,
@@ -32,6 +54,111 @@ class _GraphDataViewSet(
 ):
     permission_classes = (AllowAny,)
 
+    #: Representations of graph data available with `?export=`
+    EXPORTS = ("binary", "cytoscape")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("data", "layout", "view"):
+            # Graph data/layouts are only loaded if actually sent (see `data()`)
+            queryset = queryset.defer("data", "layout")
+        return queryset
+
+    @action(detail=True, methods=["get"], url_path="data")
+    def data(self, request: Request, pk=None):
+        """Streams the raw data of a graph (see `abseir.serialization`), or a
+        cytoscape JSON export of it with `?export=cytoscape`.
+
+        Responses are cacheable (`ETag`/`If-None-Match`), support `Range`s, and are
+        compressed according to `Accept-Encoding`.
+        """
+        export = request.query_params.get("export", "binary")
+        if export not in self.EXPORTS:
+            raise ValidationError({"export": f"Must be one of {self.EXPORTS}"})
+
+        graph = self.get_object()
+        if graph.status != Graph.Status.READY:
+            raise GraphNotReady(f"Graph is {graph.status}")
+        content_hash = graph.data_hash or hash_data(graph.data)
+
+        # Data is only loaded/exported if the client does not already have it cached
+        if export == "cytoscape":
+            return streaming.data_response(
+                request,
+                lambda: serialization.to_cytoscape(bytes(graph.data)),
+                content_hash,
+                content_type="application/json",
+                variant=export,
+            )
+        return streaming.data_response(request, lambda: bytes(graph.data), content_hash)
+
+    @action(detail=True, methods=["get"], url_path="layout")
+    def layout(self, request: Request, pk=None):
+        """Streams the precomputed layout of a graph: the float32 (little-endian)
+        `(x, y)` coordinates in `[-1, 1]` of every node, in node order (see
+        `abseir.layout`). Cached and compressed like `data()`.
+
+        Graphs generated before layouts were are laid out in the background (see
+        `jobs.generate_views`) meanwhile.
+        """
+        graph = self.get_object()
+        if graph.status != Graph.Status.READY:
+            raise GraphNotReady(f"Graph is {graph.status}")
+        if type(graph).objects.filter(id=graph.id, layout__isnull=True).exists():
+            jobs.generate_views(graph)
+            raise GraphNotReady("Graph layout is being computed")
+
+        return streaming.data_response(
+            request,
+            lambda: bytes(graph.layout),
+            graph.data_hash or hash_data(graph.data),
+            variant="layout",
+        )
+
+    @action(detail=True, methods=["get"], url_path="view")
+    def view(self, request: Request, pk=None):
+        """Streams a reduced view of a graph with at most `?budget=` edges as cytoscape
+        JSON, for browsing large graphs (see `abseir.detail`). `?method=` is one of:
+
+        * `sample` (default): a random sample of edges
+        * `degree`: the nodes of highest degree
+        * `cluster`: clusters of nodes, joined by weighted edges
+
+        Nodes are positioned by the graph's layout. Views are generated along with the
+        graph at each of `GRAPH_VIEW_BUDGETS` edges (see `jobs`), and the largest within
+        the budget is served.
+        """
+        method = request.query_params.get("method", "sample")
+        if method not in detail.METHODS:
+            raise ValidationError({"method": f"Must be one of {detail.METHODS}"})
+        try:
+            budget = int(
+                request.query_params.get("budget", settings.GRAPH_VIEW_DEFAULT_BUDGET)
+            )
+        except ValueError as error:
+            raise ValidationError({"budget": "Must be an integer"}) from error
+
+        graph = self.get_object()
+        if graph.status != Graph.Status.READY:
+            raise GraphNotReady(f"Graph is {graph.status}")
+        views = graph.views.filter(method=method).defer("data")
+        view = views.filter(budget__lte=budget).order_by("-budget").first()
+        if view is None:
+            smallest = views.order_by("budget").values_list("budget", flat=True).first()
+            if smallest is None:
+                jobs.generate_views(graph)
+                raise GraphNotReady("Graph views are being generated")
+            raise ValidationError({"budget": f"Must be at least {smallest}"})
+
+        # View data is only loaded if the client does not already have it cached
+        return streaming.data_response(
+            request,
+            lambda: bytes(view.data),
+            graph.data_hash or hash_data(graph.data),
+            content_type="application/json",
+            variant=f"view-{method}-{view.budget}",
+        )
+
 
 class CirculantGraphViewSet(_GraphViewSet):
     """
@@ -43,12 +170,6 @@ class CirculantGraphViewSet(_GraphViewSet):
     queryset = Circulant.objects.all()
     serializer_class = CirculantGraphSerializer
 
-    def perform_create(self, serializer: CirculantGraphSerializer):
-        order, jumps = operator.itemgetter("order", "jumps")(serializer.initial_data)
-        graph = grapher.circulant_graph(order, jumps)
-
-        serializer.save(data=graph.to_binary())
-
 
 class CirculantGraphDataViewSet(_GraphDataViewSet):
     """Retrieves the data of circulant graphs."""
@@ -69,12 +190,6 @@ class CompleteGraphViewSet(_GraphViewSet):
     queryset = Complete.objects.all()
     serializer_class = CompleteGraphSerializer
 
-    def perform_create(self, serializer: CompleteGraphSerializer):
-        order = operator.itemgetter("order")(serializer.initial_data)
-        graph = grapher.complete_graph(order)
-
-        serializer.save(data=graph.to_binary())
-
 
 class CompleteGraphDataViewSet(_GraphDataViewSet):
     """Retrieves the data of complete graphs."""
@@ -0,0 +1,179 @@
+"""
+Streaming exports of the results of simulation instances, for offline analysis.
+
+An export is a table with a row per sample and cycle, and a column per population (like
+the CSVs of `abseir.main`), preceded by a header describing the instance and its
+parameters:
+
+* `csv`: the header as `#` comments, like `abseir.main`
+  (`pandas.read_csv(url, comment="#")`)
+* `ndjson`: the header as the first line (`{"header": ...}`), then a JSON object per row
+  (`pandas.read_json(url, lines=True)` after skipping the first line)
+* `arrow`: an Arrow IPC stream with the header in its schema's metadata
+  (`pyarrow.ipc.open_stream(...)`), only available with the optional `pyarrow` package
+  (see `available_formats`)
+
+Samples are read from the database a chunk of `SIMULATION_EXPORT_CHUNK_SIZE` rows at a
+time, each with a short keyset query (see `.pagination`) rather than a cursor held open
+(with its transaction) for the whole download, and streamed one at a time, so memory
+stays flat for any instance. The header is read by the view, before streaming.
+"""
+
+import csv
+import io
+import itertools
+import json
+import pprint
+from typing import Iterator, Union
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from abseir import series
+
+from .ingest import NAMES, pivot
+from .models import Data, Instance, Population, Sample
+from .pagination import beyond
+from .serializers import ParametersSerializer
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+# Content type of each export format
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def available_formats() -> list[str]:
+    """Export formats of `FORMATS` that can be served here."""
+    return [name for name in FORMATS if name != "arrow" or pyarrow is not None]
+
+
+# Columns of exported rows
+COLUMNS = ("sample", "cycle", *NAMES)
+
+
+def header(instance: Instance) -> dict:
+    """Description of `instance` and its parameters."""
+    return {
+        "instance": str(instance.id),
+        "graph_type": instance.graph_type.model,
+        "graph_id": str(instance.graph_id),
+        "timestamp_start": instance.timestamp_start.isoformat(),
+        "parameters": dict(ParametersSerializer(instance.parameters).data),
+    }
+
+
+def _chunked(queryset: QuerySet, ordering: tuple[str, ...], *fields: str) -> Iterator:
+    """`(*ordering, *fields)` of every row of `queryset` in `ordering` (a unique key),
+    read a chunk of `SIMULATION_EXPORT_CHUNK_SIZE` rows per query.
+    """
+    chunk_size = settings.SIMULATION_EXPORT_CHUNK_SIZE
+    queryset = queryset.order_by(*ordering).values_list(*ordering, *fields)
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        position = list(chunk[-1][: len(ordering)])
+        chunk = list(queryset.filter(beyond(ordering, position))[:chunk_size])
+
+
+def sample_counts(instance: Instance) -> Iterator[tuple[str, dict]]:
+    """`(sample id, counts)` of every finished sample of `instance`, where `counts` are
+    `{"cycle": [...], population: [...]}` lists.
+    """
+    samples = Sample.objects.filter(instance=instance, timestamp_end__isnull=False)
+
+    if instance.columns is not None:
+        # Stored as series (see `.ingest`)
+        for sample_id, data in _chunked(samples, ("id",), "series"):
+            matrix = series.loads(data)
+            yield str(sample_id), series.to_counts(matrix, instance.columns)
+        return
+
+    names = dict(Population.objects.values_list("id", "name"))
+    rows = _chunked(
+        Data.objects.filter(sample__in=samples),
+        ("sample_id", "population_id", "cycle_index", "id"),
+        "population_size",
+    )
+    for sample_id, sample_rows in itertools.groupby(rows, key=lambda row: row[0]):
+        yield str(sample_id), pivot(
+            (names[population_id], cycle, size)
+            for _, population_id, cycle, _, size in sample_rows
+        )
+
+
+def _sample_rows(sample_id: str, counts: dict) -> Iterator[list]:
+    columns = [counts.get(name, itertools.repeat(0)) for name in NAMES]
+    for cycle, *sizes in zip(counts["cycle"], *columns):
+        yield [sample_id, cycle, *sizes]
+
+
+def _drain(buffer: Union[io.StringIO, io.BytesIO]) -> Union[str, bytes]:
+    """Contents of `buffer`, which is emptied."""
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def export_csv(instance: Instance, described: dict) -> Iterator[str]:
+    """CSV export of `instance`, after its header (`described`) as `#` comments."""
+    formatted = pprint.PrettyPrinter(indent=4).pformat(described)
+    yield "".join(f"# {line}\n" for line in (formatted + "\n").split("\n"))
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for sample_id, counts in sample_counts(instance):
+        writer.writerows(_sample_rows(sample_id, counts))
+        yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def export_ndjson(instance: Instance, described: dict) -> Iterator[str]:
+    """Newline-delimited JSON export of `instance`, after its header (`described`)."""
+    yield json.dumps({"header": described}) + "\n"
+    for sample_id, counts in sample_counts(instance):
+        yield "".join(
+            json.dumps(dict(zip(COLUMNS, row))) + "\n"
+            for row in _sample_rows(sample_id, counts)
+        )
+
+
+def export_arrow(instance: Instance, described: dict) -> Iterator[bytes]:
+    """Arrow IPC stream export of `instance`, a record batch per sample, with its
+    header (`described`) in the schema's metadata.
+    """
+    if pyarrow is None:  # pragma: no cover
+        raise RuntimeError("Arrow exports require `pyarrow`")
+    schema = pyarrow.schema(
+        [
+            ("sample", pyarrow.string()),
+            ("cycle", pyarrow.int64()),
+            *[(name, pyarrow.int64()) for name in NAMES],
+        ],
+        metadata={"header": json.dumps(described)},
+    )
+    buffer = io.BytesIO()
+    with pyarrow.ipc.new_stream(buffer, schema) as writer:
+        for sample_id, counts in sample_counts(instance):
+            cycles = len(counts["cycle"])
+            columns = [
+                [sample_id] * cycles,
+                counts["cycle"],
+                *[counts.get(name, [0] * cycles) for name in NAMES],
+            ]
+            writer.write_batch(pyarrow.record_batch(columns, schema=schema))
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+EXPORTERS = {"csv": export_csv, "ndjson": export_ndjson, "arrow": export_arrow}
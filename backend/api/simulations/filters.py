@@ -0,0 +1,18 @@
+"""Filters of the simulation endpoints (`?field=value` query parameters)."""
+
+import django_filters
+
+from .models import Data
+
+
+class DataFilter(django_filters.FilterSet):
+    """Filters data rows by `instance`, `sample` and `population` (ids), and by
+    `cycle_index_min`/`cycle_index_max` (inclusive).
+    """
+
+    instance = django_filters.UUIDFilter(field_name="sample__instance")
+    cycle_index = django_filters.RangeFilter()
+
+    class Meta:
+        model = Data
+        fields = ("instance", "sample", "population", "cycle_index")
@@ -0,0 +1,227 @@
+"""
+Bulk ingestion of simulation results, and reading them back.
+
+A sample's output (the count of every state at every cycle, see
+`abseir.simulation.simulate_counts`) is buffered and written in a single transaction,
+along with the sample's `timestamp_end`, as either (`SIMULATION_DATA_STORAGE`):
+
+* `rows`: a `Data` row per cycle and population. On Postgres the rows are streamed with
+  `COPY` (unless `SIMULATION_DATA_COPY` is disabled), and are otherwise inserted with
+  `bulk_create` in batches of `SIMULATION_DATA_BATCH_SIZE` rows.
+* `series`: a single compressed matrix, the sample's `series` (see `abseir.series`),
+  whose columns are named once by its instance's `columns`. Takes a fraction of the
+  space of rows, which are only derived from it when requested (see `data_rows`).
+
+Each sample also updates the per-cycle statistics of its instance's samples, its
+`InstanceAggregate` (see `abseir.aggregate`), in the same transaction.
+"""
+
+import io
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from pytz import utc
+
+from abseir import series
+from abseir.aggregate import Aggregate
+
+from .models import Data, Instance, InstanceAggregate, Population, Sample
+
+# Name of the `Population` (created by the migrations) of each simulated state
+POPULATIONS = {
+    "susceptible": "uninfected",
+    "exposed": "exposed",
+    "infected asymptomatic": "infected asymptomatic",
+    "infected symptomatic": "infected symptomatic",
+    "recovered": "recovered",
+    "deceased": "dead",
+}
+NAMES = tuple(POPULATIONS.values())
+
+# Columns of the `series` of samples
+COLUMNS = ("cycle", *NAMES)
+
+# Columns written by `COPY`, in order
+_COPY_COLUMNS = (
+    "id",
+    "sample_id",
+    "timestamp",
+    "cycle_index",
+    "population_id",
+    "population_size",
+)
+
+
+def populations() -> dict[str, Population]:
+    """Every `Population` of simulated states, by name (see `POPULATIONS`)."""
+    found = {
+        population.name: population
+        for population in Population.objects.filter(name__in=NAMES)
+    }
+    return {name: found[name] for name in NAMES}
+
+
+def from_engine(results: dict) -> dict:
+    """Counts of the engine's states (see `abseir.simulation.simulate_counts`) named
+    by their `Population`s.
+    """
+    return {
+        "cycle": results["cycle"],
+        **{name: results[state] for state, name in POPULATIONS.items()},
+    }
+
+
+def _rows(
+    results: dict, states: dict[str, Population]
+) -> Iterator[tuple[int, Population, int]]:
+    """`(cycle, population, size)` of every count of `results`."""
+    for name, population in states.items():
+        for cycle, size in zip(results["cycle"], results[name]):
+            yield cycle, population, size
+
+
+def copy_data(sample: Sample, results: dict, states: dict[str, Population]):
+    """Writes `sample`'s data with Postgres `COPY` (in its text format, which needs no
+    escaping for UUIDs, timestamps and integers).
+    """
+    timestamp = datetime.now(utc).isoformat()
+    buffer = io.StringIO()
+    buffer.writelines(
+        f"{uuid.uuid4()}\t{sample.id}\t{timestamp}\t{cycle}\t{population.id}\t{size}\n"
+        for cycle, population, size in _rows(results, states)
+    )
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {connection.ops.quote_name(Data._meta.db_table)} "
+            f"({', '.join(_COPY_COLUMNS)}) FROM STDIN",
+            buffer,
+        )
+
+
+def bulk_create_data(sample: Sample, results: dict, states: dict[str, Population]):
+    """Writes `sample`'s data with batched `bulk_create`s."""
+    Data.objects.bulk_create(
+        (
+            Data(
+                sample=sample,
+                cycle_index=cycle,
+                population=population,
+                population_size=size,
+            )
+            for cycle, population, size in _rows(results, states)
+        ),
+        batch_size=settings.SIMULATION_DATA_BATCH_SIZE,
+    )
+
+
+def save_sample(sample: Sample, results: dict, states: dict[str, Population]):
+    """Saves `results` (of the engine) as `sample`'s data and marks it finished,
+    atomically.
+    """
+    results = from_engine(results)
+    with transaction.atomic():
+        fields = ["timestamp_end"]
+        if settings.SIMULATION_DATA_STORAGE == "series":
+            sample.series = series.dumps(series.from_counts(results, COLUMNS))
+            fields.append("series")
+        elif settings.SIMULATION_DATA_COPY and connection.vendor == "postgresql":
+            copy_data(sample, results, states)
+        else:
+            bulk_create_data(sample, results, states)
+        sample.timestamp_end = datetime.now(utc)
+        sample.save(update_fields=fields)
+        # Last, since samples of the same instance wait on each other from here
+        update_aggregate(sample, results)
+
+
+def update_aggregate(sample: Sample, results: dict):
+    """Adds `results` to the statistics of `sample`'s instance (if it has any)."""
+    aggregate = (
+        InstanceAggregate.objects.select_for_update()
+        .filter(instance_id=sample.instance_id)
+        .first()
+    )
+    if aggregate is None:
+        return
+    statistics = Aggregate.loads(aggregate.statistics)
+    statistics.add(series.from_counts(results, NAMES))
+    aggregate.samples += 1
+    aggregate.statistics = statistics.dumps()
+    aggregate.summary = statistics.summary(NAMES)
+    aggregate.save(update_fields=["samples", "statistics", "summary"])
+
+
+def start_instance(instance: Instance, order: int):
+    """Creates the (empty) statistics of `instance`'s samples, whose populations
+    are at most `order` (the order of its graph), and names the columns of its samples
+    if stored as `series`.
+    """
+    InstanceAggregate.objects.get_or_create(
+        instance=instance,
+        defaults={"statistics": Aggregate(len(NAMES), order).dumps()},
+    )
+    if settings.SIMULATION_DATA_STORAGE == "series":
+        instance.columns = list(COLUMNS)
+        Instance.objects.filter(id=instance.id).update(columns=instance.columns)
+
+
+def counts(sample: Sample) -> Optional[dict]:
+    """The count of every state at every cycle of `sample` as `{"cycle": [...],
+    state: [...]}` lists (see `abseir.simulation.simulate_counts`), decoded from its
+    `series` or gathered from its `Data` rows. `None` if it has not finished.
+    """
+    if sample.timestamp_end is None:
+        return None
+    if sample.series is not None:
+        return series.to_counts(series.loads(sample.series), sample.instance.columns)
+
+    rows = (
+        Data.objects.filter(sample=sample)
+        .order_by("population__name", "cycle_index")
+        .values_list("population__name", "cycle_index", "population_size")
+    )
+    return pivot(rows.iterator())
+
+
+def pivot(rows: Iterable[tuple[str, int, int]]) -> dict:
+    """Counts as `{"cycle": [...], population: [...]}` lists of `(population, cycle,
+    size)` rows (`0` for missing rows).
+    """
+    sizes: dict = defaultdict(dict)
+    for name, cycle, size in rows:
+        sizes[name][cycle] = size
+    cycles = sorted({cycle for column in sizes.values() for cycle in column})
+    return {
+        "cycle": cycles,
+        **{
+            name: [column.get(cycle, 0) for cycle in cycles]
+            for name, column in sizes.items()
+        },
+    }
+
+
+def data_rows(sample: Sample, states: dict[str, Population]) -> Iterator[dict]:
+    """Row-level view of `sample`'s data (like `Data` rows, without their `id` and
+    `timestamp`), derived from its `series` or read from its `Data` rows.
+    """
+    if sample.series is None:
+        yield from (
+            Data.objects.filter(sample=sample)
+            .order_by("population_id", "cycle_index")
+            .values("sample", "cycle_index", "population", "population_size")
+            .iterator()
+        )
+        return
+    results = series.to_counts(series.loads(sample.series), sample.instance.columns)
+    for cycle, population, size in _rows(results, states):
+        yield {
+            "sample": sample.id,
+            "cycle_index": cycle,
+            "population": population.id,
+            "population_size": size,
+        }
@@ -1,27 +1,127 @@
 """
 Asynchronous jobs for views/serializers to start running under
 specific circumstances.
+
+Samples of simulation instances are simulated by the abseir engine in a pool of worker
+processes that keep their graphs decoded (see `.workers`), running at most
+`SIMULATION_WORKERS` (one per CPU by default, split between the `SERVER_PROCESSES`)
+samples at once across every instance.
+The count of every state (`Population`) at every cycle of a sample is saved in bulk as
+its `Data` rows or its compressed `series` (see `.ingest`).
+
+The progress of instances (their samples' status, and the counts of running samples at
+every cycle, reported by the workers only while the instance is streamed) is published
+to clients streaming it (see `.progress`).
 """
 
-from datetime import datetime
+import logging
+import multiprocessing
 import threading
-import time
-from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection
 from pytz import utc
 
+from api.graphs import jobs as graph_jobs
+
+from . import ingest
+from .progress import broker
 from .models import Instance, Parameters, Sample
 from .serializers import InstanceSerializer, SampleSerializer
-
-
-MAX_RUNNING_SAMPLES = 2
+from .workers import WorkerPool
+
+log = logging.getLogger(__name__)
+
+# `Parameters` fields named differently than their engine parameter
+# (see `abseir.simulation.Simulation.set_parameters`)
+RENAMED_PARAMETERS = {
+    "test_specificity": "specificity",
+    "test_sensitivity": "sensitivity",
+    "test_cost": "cost",
+    "test_results_delay": "results_delay",
+    "test_rate": "rate",
+}
+# `Parameters` fields that are not engine parameters, or are passed differently
+_OTHER_FIELDS = ("id", "sample_size", "initial_infected_count")
+
+_lock = threading.Lock()
+_workers: Optional[WorkerPool] = None
+_threads: Optional[ThreadPoolExecutor] = None
+
+
+def _report_progress(progress: multiprocessing.Queue):
+    """Publishes the counts of running samples at every cycle, as reported by the
+    workers, to the clients streaming their instance's progress (forever).
+    """
+    while True:
+        (instance_id, sample_id), counts = progress.get()
+        if broker.subscribed(instance_id):
+            broker.publish(
+                instance_id,
+                "cycle",
+                {"sample": sample_id, **ingest.from_engine(counts)},
+            )
+
+
+def _executors() -> tuple[WorkerPool, ThreadPoolExecutor]:
+    """Lazily starts the worker processes, and as many threads that hand them samples
+    and save their results (so samples wait in the threads' queue for a free worker).
+    """
+    global _workers, _threads  # pylint: disable=global-statement
+    with _lock:
+        if _workers is None:
+            workers = graph_jobs.worker_processes(settings.SIMULATION_WORKERS)
+            progress: multiprocessing.Queue = multiprocessing.get_context(
+                "spawn"
+            ).Queue()
+            threading.Thread(
+                target=_report_progress,
+                args=(progress,),
+                name="simulation-progress",
+                daemon=True,
+            ).start()
+            _workers = WorkerPool(
+                workers,
+                settings.SIMULATION_GRAPH_CACHE_BYTES,
+                progress,
+                settings.SIMULATION_AFFINITY_BACKLOG,
+            )
+            broker.listen(_workers.watch)
+            _threads = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="simulation"
+            )
+    return _workers, _threads  # type: ignore
+
+
+def engine_parameters(parameters: Parameters) -> dict:
+    """Engine parameters of a `Parameters` row, without those it does not define."""
+    arguments = {}
+    for field in Parameters._meta.concrete_fields:
+        value = getattr(parameters, field.name)
+        if field.name in _OTHER_FIELDS or value is None:
+            continue
+        if isinstance(value, Decimal):
+            value = float(value)
+        arguments[RENAMED_PARAMETERS.get(field.name, field.name)] = value
+    if parameters.initial_infected_count is not None:
+        arguments["initial_cases"] = {
+            "exposed": 0,
+            "infected asymptomatic": parameters.initial_infected_count,
+            "recovered": 0,
+        }
+    return arguments
 
 
 class InstanceSamples:
-    """Generates `sample` threads based on inputted simulation parameters,
-    and updates the `timestamp_end` upon all `sample`s finishing.
+    """Simulates every `sample` of a simulation instance in the background, and updates
+    the `timestamp_end` of the instance upon all `sample`s finishing.
 
     Tracks which samples of a simulation `Instance` have completed
-    running and which samples still need to be ran.
+    running and which samples are still running.
     """
 
     def __init__(self, instance: Instance, instance_serializer: InstanceSerializer):
@@ -29,7 +129,10 @@ class InstanceSamples:
         self.instance_serializer = instance_serializer
         self.samples_complete: set[Sample] = set()
         self.samples_running: set[Sample] = set()
-        self.queue: set[SampleSerializer] = set()
+        self.failed = 0
+        self.finished = 0  # Samples that completed or failed
+        self._lock = threading.Lock()  # Guards the samples (completed by many threads)
+        self._data: Optional[bytes] = None  # Graph data, read once workers need it
 
         parameters: Parameters = self.instance.parameters
         self.total: int = parameters.sample_size
@@ -37,64 +140,99 @@ class InstanceSamples:
         self._generate_samples()
 
     def _generate_samples(self):
-        """Generates samples to be run based on `self.instance.parameters.sample_size.
+        """Queues `self.instance.parameters.sample_size` samples to be simulated.
 
-        Starts simulating a number of samples based on the maximum number of threads that
-        can be ran.
+        Samples start simulating as soon as a worker process is free.
         """
-        for idx in range(self.total):
-            # Create new sample serializer
-            sample_serializer = SampleSerializer(data={"instance": self.instance.id})
-            sample_serializer.is_valid(raise_exception=True)
-
-            # Track samples to be ran
-            self.queue.add(sample_serializer)
-
-            # Start a maximum of `MAX_RUNNING_SAMPLES` sample threads
-            if idx < MAX_RUNNING_SAMPLES:
-                self.run_sample()
-
-    def run_sample(self):
-        """Starts simulating a sample by popping one off the queue.
+        # The graph's data is only read if a worker does not hold it already
+        graph = (
+            self.instance.graph_type.model_class()
+            .objects.defer("data", "layout")
+            .get(id=self.instance.graph_id)
+        )
+        key, metrics = (graph.id, graph.data_hash), graph.metrics
+        arguments = engine_parameters(self.instance.parameters)
+        self.populations = ingest.populations()
+        ingest.start_instance(self.instance, graph.order)
+
+        _, threads = _executors()
+        for _ in range(self.total):
+            threads.submit(self.run_sample, key, arguments, metrics)
+        self.publish_status()
+
+    def publish_status(self):
+        """Publishes how many samples are queued, running, complete and failed."""
+        with self._lock:
+            running = len(self.samples_running)
+            status = {
+                "queued": self.total - self.finished - running,
+                "running": running,
+                "complete": len(self.samples_complete),
+                "failed": self.failed,
+                "total": self.total,
+            }
+        broker.publish(self.instance.id, "status", status)
+
+    def load_graph(self) -> bytes:
+        """Encoded data of the instance's graph (read from the database once)."""
+        with self._lock:
+            if self._data is None:
+                graph = self.instance.graph_type.model_class().objects.only("data")
+                self._data = bytes(graph.get(id=self.instance.graph_id).data)
+            return self._data
+
+    def run_sample(self, key: tuple, arguments: dict, metrics: Optional[dict]):
+        """Simulates a sample in a worker process and saves its results.
 
         Also saves the sample to the database to indicate it has began
         simulating.
         """
-        # TODO: re-use thread instead of creating new one? unsure (pros/cons)
-        sample_serializer = self.queue.pop()
-        sample = (
-            sample_serializer.save()
-        )  # Save new sample to database when we start running it
-
-        def sample_callback():
-            """Runs upon sample completion"""
-            self.complete_sample(sample)
-
-        # Start thread to run sample simulation
-        sample_thread = threading.Thread(
-            target=simulate,
-            args=[
-                sample,
-                sample_serializer,
-                sample_callback,
-            ],
-        )
-        sample_thread.start()
-        self.samples_running.add(sample)
-
-    def complete_sample(self, sample: Sample):
+        close_old_connections()
+        sample, failed = None, True
+        try:
+            sample_serializer = SampleSerializer(data={"instance": self.instance.id})
+            sample_serializer.is_valid(raise_exception=True)
+            # Save new sample to database when we start running it
+            sample = sample_serializer.save()
+            with self._lock:
+                self.samples_running.add(sample)
+            self.publish_status()
+
+            workers, _ = _executors()
+            tag = (str(self.instance.id), str(sample.id))
+            results = workers.simulate(key, self.load_graph, arguments, metrics, tag)
+
+            # Also updates `sample.timestamp_end` upon sample simulation completion
+            ingest.save_sample(sample, results, self.populations)
+            failed = False
+        except Exception:  # pylint: disable=broad-except
+            log.exception(
+                "Failed to simulate a sample of instance %s", self.instance.id
+            )
+            if sample is not None:
+                Sample.objects.filter(id=sample.id).update(failed=True)
+        finally:
+            self.complete_sample(sample, failed)
+            connection.close()
+
+    def complete_sample(self, sample: Optional[Sample], failed: bool = False):
         """Mark a `Sample` as complete by moving it from the
-        incomplete set to the complete set
+        running set to the complete set (`None` for a sample that failed to start)
 
-        Runs `self.complete()` if all `Sample`s have complewed
+        Runs `self.complete()` once all `Sample`s have completed
         """
-        self.samples_running.remove(sample)
-        self.samples_complete.add(sample)
-
-        if len(self.samples_complete) == self.total:
+        with self._lock:
+            if sample is not None:
+                self.samples_running.discard(sample)
+            if failed:
+                self.failed += 1
+            else:
+                self.samples_complete.add(sample)
+            self.finished += 1
+            done = self.finished == self.total
+        self.publish_status()
+        if done:
             self.complete()
-        elif len(self.queue) > 0:
-            self.run_sample()
 
     def complete(self):
         """Runs when all instance samples have finished simulating.
@@ -105,13 +243,4 @@ class InstanceSamples:
         self.instance_serializer.update(
             self.instance, {"timestamp_end": datetime.now(utc)}
         )
-
-
-def simulate(sample: Sample, serializer: SampleSerializer, callback: Callable):
-    """Placeholder code to have `sample`s finish simulating after 5 seconds."""
-    time.sleep(5)
-
-    # Update `sample.timestamp_end` upon sample simulation completion
-    serializer.update(sample, {"timestamp_end": datetime.now(utc)})
-
-    callback()
+        broker.publish(self.instance.id, "complete", {"cancelled": False})
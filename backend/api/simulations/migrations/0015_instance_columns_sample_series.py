@@ -0,0 +1,23 @@
+# Generated by Django 4.0.4 on 2026-10-19 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulations', '0014_alter_parameters_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='instance',
+            name='columns',
+            field=models.JSONField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='sample',
+            name='series',
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.0.4 on 2026-10-19 02:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulations', '0015_instance_columns_sample_series'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstanceAggregate',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('statistics', models.BinaryField()),
+                ('summary', models.JSONField(default=dict, editable=False)),
+                ('instance', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='aggregate', to='simulations.instance')),
+            ],
+            options={
+                'ordering': ('id',),
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.4 on 2026-10-19 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulations', '0016_instanceaggregate'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='data',
+            options={'ordering': ('sample_id', 'population_id', 'cycle_index')},
+        ),
+        migrations.AddIndex(
+            model_name='data',
+            index=models.Index(fields=['sample', 'population', 'cycle_index'], name='IDX_data_sample_pop_cycle'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.4 on 2026-10-19 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulations', '0017_data_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sample',
+            name='failed',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -142,6 +142,9 @@ class Instance(_SimulationModel):
     graph_id = models.UUIDField()
     graph = GenericForeignKey("graph_type", "graph_id")
 
+    # Names of the columns of its samples' `series` (see `abseir.series`)
+    columns = models.JSONField(editable=False, null=True)
+
     def clean(self):
         if self.timestamp_start >= self.timestamp_end:
             raise exceptions.ValidationError("Start time should be before end time")
@@ -158,12 +161,32 @@ class Instance(_SimulationModel):
         ordering = ("id",)
 
 
+class InstanceAggregate(_SimulationModel):
+    """Per-cycle statistics of the samples of an instance that finished so far,
+    updated as each sample finishes (see `abseir.aggregate`)
+    """
+
+    instance = models.OneToOneField(
+        Instance, on_delete=models.CASCADE, related_name="aggregate"
+    )
+    samples = models.PositiveIntegerField(default=0)
+    # Mergeable statistics (`abseir.aggregate.Aggregate.dumps`), and their summary
+    statistics = models.BinaryField(editable=False)
+    summary = models.JSONField(editable=False, default=dict)
+
+
 class Sample(_SimulationModel):
     """A single run (sample) of a parent simulation instance"""
 
     instance = models.ForeignKey(Instance, on_delete=models.CASCADE)
     timestamp_start = models.DateTimeField(auto_now_add=True, editable=False)
     timestamp_end = models.DateTimeField(null=True)
+    # Whether it failed to simulate (so it never ends)
+    failed = models.BooleanField(default=False, editable=False)
+
+    # Count of every column of its instance at every cycle (see `abseir.series`), when
+    # not stored as `Data` rows
+    series = models.BinaryField(editable=False, null=True)
 
 
 class Data(_SimulationModel):
@@ -177,3 +200,13 @@ class Data(_SimulationModel):
 
     # TODO: maybe add something (`clean`) to check if `population_size`/`cycle_index` are
     # not bigger than their max size(s)
+
+    class Meta:
+        # Rows are read a sample's population at a time (see `DataFilter`)
+        indexes = [
+            models.Index(
+                fields=["sample", "population", "cycle_index"],
+                name="IDX_data_sample_pop_cycle",
+            ),
+        ]
+        ordering = ("sample_id", "population_id", "cycle_index")
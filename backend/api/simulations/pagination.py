@@ -0,0 +1,137 @@
+"""
+Keyset (cursor) pagination of the simulation endpoints.
+
+Pages start right after (or before) the ordering key of the last (or first) row of the
+page they were linked from, instead of at an `OFFSET`, so any page is read with an index
+range scan in constant time, however deep. Pages link to the `next`/`previous` pages
+with an opaque `?cursor=`, and the total count of rows (a full scan) is omitted.
+"""
+
+import base64
+import binascii
+import json
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def beyond(ordering: tuple[str, ...], position: list, reverse: bool = False) -> Q:
+    """Rows after (or before) `position` in `ordering`: the first field is at least
+    `position`'s (a range of the index), and some field is beyond it while the fields
+    before it are equal.
+    """
+    lookup = "lt" if reverse else "gt"
+    after = Q()
+    for index, field in enumerate(ordering):
+        equal = dict(zip(ordering[:index], position[:index]))
+        after |= Q(**equal, **{f"{field}__{lookup}": position[index]})
+    return Q(**{f"{ordering[0]}__{lookup}e": position[0]}) & after
+
+
+class KeysetPagination(BasePagination):
+    """Pages of `page_size` rows (up to `max_page_size` with `?page_size=`) ordered by
+    `ordering`, a unique key of the rows (ideally indexed).
+    """
+
+    ordering: tuple[str, ...] = ("id",)
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.SIMULATION_DATA_MAX_PAGE_SIZE
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(requested, 1), self.max_page_size)
+
+    def decode_cursor(self, request: Request) -> tuple[Optional[list], bool]:
+        """Ordering key the page starts after, and whether it goes backwards."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            position, reverse = cursor["position"], cursor["reverse"]
+        except (binascii.Error, KeyError, TypeError, UnicodeError, ValueError) as error:
+            raise NotFound(self.invalid_cursor_message) from error
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(reverse)
+
+    def encode_cursor(self, position: list, reverse: bool) -> str:
+        cursor = json.dumps({"position": position, "reverse": reverse})
+        encoded = base64.urlsafe_b64encode(cursor.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _beyond(self, position: list, reverse: bool) -> Q:
+        return beyond(self.ordering, position, reverse)
+
+    def _position(self, row: Model) -> list:
+        return [str(getattr(row, field)) for field in self.ordering]
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> list:
+        self.base_url = remove_query_param(
+            request.build_absolute_uri(), self.cursor_query_param
+        )
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        ordering = [f"-{field}" if reverse else field for field in self.ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._beyond(position, reverse))
+        rows = list(queryset[: page_size + 1])
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Going forwards, the rows before the page are those skipped to reach it (and
+        # conversely backwards)
+        has_next = more if not reverse else position is not None
+        has_previous = position is not None if not reverse else more
+        self.next = (
+            self.encode_cursor(self._position(rows[-1]), False)
+            if rows and has_next
+            else None
+        )
+        self.previous = (
+            self.encode_cursor(self._position(rows[0]), True)
+            if rows and has_previous
+            else None
+        )
+        return rows
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({"next": self.next, "previous": self.previous, "results": data})
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class DataPagination(KeysetPagination):
+    """Pages of `SIMULATION_DATA_PAGE_SIZE` data rows, or up to
+    `SIMULATION_DATA_MAX_PAGE_SIZE` with `?page_size=`, in the order of their index.
+    """
+
+    ordering = ("sample_id", "population_id", "cycle_index", "id")
+    page_size = settings.SIMULATION_DATA_PAGE_SIZE
@@ -0,0 +1,199 @@
+"""
+Live progress of running simulation instances, pushed to clients as server-sent events
+(`instances/<id>/progress`) instead of clients polling instances and samples.
+
+Events of an instance are published (by `.jobs`) to the subscribers of this server
+process:
+
+* `status`: how many of its samples are `queued`, `running`, `complete` and `failed`
+* `cycle`: the count of every population at a cycle of a running sample, as it is
+  simulated
+* `complete`: the instance finished (ends the stream)
+
+Streams start with a `status` snapshot read from the database. Instances running in
+another server process only stream `status` snapshots, re-read every
+`SIMULATION_PROGRESS_KEEPALIVE` seconds (which also keep idle connections open).
+
+Under ASGI (see `api.asgi`), `ProgressResponse`s are streamed asynchronously so they do
+not hold a worker thread each.
+"""
+
+import asyncio
+import json
+import queue
+import threading
+from collections import defaultdict
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Q
+from django.http import StreamingHttpResponse
+
+from .models import Instance, Sample
+
+
+class Subscription:
+    """Events of an instance queued for one client. Once `SIMULATION_PROGRESS_QUEUE`
+    events are waiting (e.g. for a slow client), the oldest are dropped.
+
+    Asynchronous subscriptions (with an event `loop`) are read with `await get()`,
+    others with `get(timeout)`.
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.queue: Any = asyncio.Queue() if loop is not None else queue.Queue()
+
+    def _put(self, event: tuple[str, dict]):
+        if self.queue.qsize() >= settings.SIMULATION_PROGRESS_QUEUE:
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def put(self, event: tuple[str, dict]):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._put, event)
+        else:
+            self._put(event)
+
+
+class Broker:
+    """Publishes the events of instances to their subscriptions (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: dict[str, set[Subscription]] = defaultdict(set)
+        self._listeners: list[Callable[[str, bool], None]] = []
+
+    def listen(self, listener: Callable[[str, bool], None]):
+        """Calls `listener(instance_id, True)` once an instance has subscribers (now,
+        for those that have some already), and `listener(instance_id, False)` once it
+        has none left. Listeners are called with the broker locked.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            for instance_id in self._subscriptions:
+                listener(instance_id, True)
+
+    def subscribe(self, instance_id: Any, subscription: Subscription) -> Subscription:
+        with self._lock:
+            subscriptions = self._subscriptions[str(instance_id)]
+            if not subscriptions:
+                for listener in self._listeners:
+                    listener(str(instance_id), True)
+            subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, instance_id: Any, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(str(instance_id), set())
+            subscriptions.discard(subscription)
+            if subscriptions or str(instance_id) not in self._subscriptions:
+                return
+            del self._subscriptions[str(instance_id)]
+            for listener in self._listeners:
+                listener(str(instance_id), False)
+
+    def subscribed(self, instance_id: Any) -> bool:
+        """Whether anyone is subscribed to the events of an instance."""
+        return str(instance_id) in self._subscriptions
+
+    def publish(self, instance_id: Any, event: str, data: dict):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(str(instance_id), ()))
+        for subscription in subscriptions:
+            subscription.put((event, data))
+
+
+broker = Broker()
+
+
+def snapshot(instance_id: Any) -> Optional[tuple[str, dict]]:
+    """Event of the progress of an instance according to the database: `complete` if
+    it finished, its `status` otherwise (`None` if it does not exist).
+    """
+    instance = (
+        Instance.objects.filter(id=instance_id)
+        .select_related("parameters")
+        .only("timestamp_end", "cancelled", "parameters__sample_size")
+        .first()
+    )
+    if instance is None:
+        return None
+    if instance.timestamp_end is not None or instance.cancelled:
+        return "complete", {"cancelled": instance.cancelled}
+
+    counts = Sample.objects.filter(instance_id=instance_id).aggregate(
+        complete=Count("id", filter=Q(timestamp_end__isnull=False, failed=False)),
+        running=Count("id", filter=Q(timestamp_end__isnull=True, failed=False)),
+        failed=Count("id", filter=Q(failed=True)),
+    )
+    total = instance.parameters.sample_size
+    return "status", {
+        "queued": max(total - sum(counts.values()), 0),
+        **counts,
+        "total": total,
+    }
+
+
+def encode(event: str, data: dict) -> bytes:
+    """Server-sent event `event` with JSON `data`."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+def stream(instance_id: Any) -> Iterator[bytes]:
+    """Server-sent events of an instance until it completes (blocks a thread)."""
+    subscription = broker.subscribe(instance_id, Subscription())
+    try:
+        event = snapshot(instance_id)
+        while event is not None:
+            yield encode(*event)
+            if event[0] == "complete":
+                return
+            try:
+                event = subscription.queue.get(
+                    timeout=settings.SIMULATION_PROGRESS_KEEPALIVE
+                )
+            except queue.Empty:
+                yield KEEPALIVE
+                event = snapshot(instance_id)
+    finally:
+        broker.unsubscribe(instance_id, subscription)
+
+
+class ProgressResponse(StreamingHttpResponse):
+    """Server-sent events of an instance until it completes, iterated from `stream()`
+    (or streamed from `stream_async()` under ASGI, see `api.asgi`).
+    """
+
+    def __init__(self, instance_id: Any):
+        super().__init__(stream(instance_id), content_type="text/event-stream")
+        self.instance_id = instance_id
+        self["Cache-Control"] = "no-cache"
+        self["X-Accel-Buffering"] = "no"
+
+
+async def stream_async(instance_id: Any) -> AsyncIterator[bytes]:
+    """Server-sent events of an instance until it completes (see `stream`)."""
+    read_snapshot = sync_to_async(snapshot, thread_sensitive=False)
+    subscription = broker.subscribe(
+        instance_id, Subscription(asyncio.get_running_loop())
+    )
+    try:
+        event = await read_snapshot(instance_id)
+        while event is not None:
+            yield encode(*event)
+            if event[0] == "complete":
+                return
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), settings.SIMULATION_PROGRESS_KEEPALIVE
+                )
+            except asyncio.TimeoutError:
+                yield KEEPALIVE
+                event = await read_snapshot(instance_id)
+    finally:
+        broker.unsubscribe(instance_id, subscription)
@@ -195,10 +195,12 @@ class SampleSerializer(_SimulationSerializer[Sample]):
             "instance",
             "timestamp_start",
             "timestamp_end",
+            "failed",
         )
         read_only_fields = (
             *_SimulationSerializer[Sample].Meta.fields,
             "timestamp_start",
+            "failed",
         )
 
 
@@ -0,0 +1,55 @@
+import factory
+from django.contrib.contenttypes.models import ContentType
+
+
+class CompleteFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "graphs.Complete"
+        django_get_or_create = ("order",)
+
+    order = 10
+    status = "ready"
+
+
+class ParametersFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "simulations.Parameters"
+
+    sample_size = factory.Sequence(lambda n: n + 1)
+    initial_infected_count = 1
+    cycles_per_day = 1
+    time_horizon = 3
+    exogenous_amount = 0
+    exogenous_frequency = 0
+    r0 = 2
+    time_to_infection_mean = 2
+    time_to_infection_min = 1
+    time_to_recovery_mean = 5
+    time_to_recovery_min = 2
+    symptoms_probability = "0.5"
+    death_probability = "0.01"
+    test_specificity = "0.9"
+    test_sensitivity = "0.9"
+    test_cost = 0
+    test_results_delay = 0
+    test_rate = 0
+
+
+class InstanceFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "simulations.Instance"
+        exclude = ("graph",)
+
+    parameters = factory.SubFactory(ParametersFactory)
+    graph = factory.SubFactory(CompleteFactory)
+    graph_type = factory.LazyAttribute(
+        lambda instance: ContentType.objects.get_for_model(instance.graph)
+    )
+    graph_id = factory.SelfAttribute("graph.id")
+
+
+class SampleFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "simulations.Sample"
+
+    instance = factory.SubFactory(InstanceFactory)
@@ -0,0 +1,132 @@
+import uuid
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from nose.tools import eq_, ok_
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api import asgi
+
+from .. import export, ingest
+from .factories import InstanceFactory, SampleFactory
+
+RESULTS = {
+    "cycle": [0, 1, 2],
+    "susceptible": [9, 8, 6],
+    "exposed": [0, 1, 2],
+    "infected asymptomatic": [1, 0, 1],
+    "infected symptomatic": [0, 1, 1],
+    "recovered": [0, 0, 0],
+    "deceased": [0, 0, 0],
+}
+
+
+class TestExportFormats(SimpleTestCase):
+    """
+    Tests which export formats are advertised and accepted.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = f"/api/v1/simulations/instances/{uuid.uuid4()}/results"
+
+    def test_arrow_unavailable_without_pyarrow(self):
+        with mock.patch.object(export, "pyarrow", None):
+            eq_(export.available_formats(), ["csv", "ndjson"])
+            response = self.client.get(self.url, {"export": "arrow"})
+        eq_(response.status_code, status.HTTP_400_BAD_REQUEST)
+        ok_("arrow" not in str(response.data["export"]))
+
+    def test_arrow_available_with_pyarrow(self):
+        if export.pyarrow is None:
+            self.skipTest("pyarrow is not installed")
+        eq_(export.available_formats(), ["csv", "ndjson", "arrow"])
+
+    def test_unknown_format(self):
+        response = self.client.get(self.url, {"export": "xml"})
+        eq_(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(SIMULATION_EXPORT_CHUNK_SIZE=4)
+class TestSampleCounts(TestCase):
+    """
+    Tests reading the samples of an export in chunks smaller than a sample.
+    """
+
+    def export(self, storage: str):
+        instance = InstanceFactory()
+        with override_settings(SIMULATION_DATA_STORAGE=storage):
+            ingest.start_instance(instance, instance.graph.order)
+            samples = sorted(
+                (SampleFactory(instance=instance) for _ in range(5)),
+                key=lambda sample: sample.id,
+            )
+            for sample in samples:
+                ingest.save_sample(sample, RESULTS, ingest.populations())
+        SampleFactory(instance=instance)  # unfinished
+
+        expected = ingest.from_engine(RESULTS)
+        exported = list(export.sample_counts(instance))
+        eq_([sample_id for sample_id, _ in exported], [str(s.id) for s in samples])
+        for _, counts in exported:
+            eq_(counts, expected)
+
+    def test_rows(self):
+        self.export("rows")
+
+    def test_series(self):
+        self.export("series")
+
+
+class TestExportOverASGI(TransactionTestCase):
+    """
+    Tests exports streamed by the ASGI application, whose iterators query the database.
+    """
+
+    serialized_rollback = True
+
+    def test_csv(self):
+        sample = SampleFactory()
+        ingest.save_sample(sample, RESULTS, ingest.populations())
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/api/v1/simulations/instances/{sample.instance_id}/results",
+            "query_string": b"export=csv",
+            "headers": [(b"host", b"testserver")],
+            "server": ("testserver", 80),
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        async_to_sync(asgi.application)(scope, receive, send)
+
+        eq_(messages[0]["type"], "http.response.start")
+        eq_(messages[0]["status"], status.HTTP_200_OK)
+        ok_((b"Content-Type", b"text/csv") in messages[0]["headers"])
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        lines = [
+            line
+            for line in body.decode().splitlines()
+            if line and not line.startswith("#")
+        ]
+        eq_(lines[0], ",".join(export.COLUMNS))
+        eq_(
+            lines[1:],
+            [
+                f"{sample.id},0,9,0,1,0,0,0",
+                f"{sample.id},1,8,1,0,1,0,0",
+                f"{sample.id},2,6,2,1,1,0,0",
+            ],
+        )
+        ok_(not messages[-1].get("more_body", False))
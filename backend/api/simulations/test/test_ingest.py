@@ -0,0 +1,140 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from nose.tools import assert_raises, eq_, ok_
+
+from .. import ingest
+from ..models import Data, InstanceAggregate, Sample
+from .factories import SampleFactory
+
+# Engine results (see `abseir.simulation.simulate_counts`) of a 10 node graph
+RESULTS = {
+    "cycle": [0, 1, 2, 3],
+    "susceptible": [9, 7, 5, 5],
+    "exposed": [0, 2, 1, 0],
+    "infected asymptomatic": [1, 0, 2, 1],
+    "infected symptomatic": [0, 1, 1, 2],
+    "recovered": [0, 0, 1, 1],
+    "deceased": [0, 0, 0, 1],
+}
+
+
+class _IngestTestCase(TestCase):
+    def setUp(self):
+        self.sample = SampleFactory()
+        self.start()
+
+    def start(self):
+        self.states = ingest.populations()
+        ingest.start_instance(self.sample.instance, self.sample.instance.graph.order)
+
+    def save(self):
+        ingest.save_sample(self.sample, RESULTS, self.states)
+        return Sample.objects.get(id=self.sample.id)
+
+    def assert_aggregated(self, samples: int):
+        aggregate = InstanceAggregate.objects.get(instance=self.sample.instance)
+        eq_(aggregate.samples, samples)
+        if samples:
+            eq_(aggregate.summary["count"], [1] * len(RESULTS["cycle"]))
+            eq_(aggregate.summary["mean"]["uninfected"], RESULTS["susceptible"])
+
+
+class TestSaveRows(_IngestTestCase):
+    """
+    Tests saving samples as data rows, with `COPY` or `bulk_create`.
+    """
+
+    def assert_rows(self, sample: Sample):
+        ok_(sample.timestamp_end is not None)
+        eq_(sample.series, None)
+        rows = Data.objects.filter(sample=sample)
+        eq_(rows.count(), len(RESULTS["cycle"]) * len(ingest.NAMES))
+        eq_(
+            set(rows.values_list("population__name", "cycle_index", "population_size")),
+            {
+                (name, cycle, size)
+                for state, name in ingest.POPULATIONS.items()
+                for cycle, size in zip(RESULTS["cycle"], RESULTS[state])
+            },
+        )
+        eq_(ingest.counts(sample), ingest.from_engine(RESULTS))
+        self.assert_aggregated(1)
+
+    def test_copy(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("COPY requires Postgres")
+        with mock.patch.object(
+            ingest, "copy_data", wraps=ingest.copy_data
+        ) as copy_data, mock.patch.object(
+            ingest, "bulk_create_data"
+        ) as bulk_create_data:
+            sample = self.save()
+        copy_data.assert_called_once()
+        bulk_create_data.assert_not_called()
+        self.assert_rows(sample)
+        # Text format columns are parsed as the fields' types
+        timestamps = set(Data.objects.values_list("timestamp", flat=True))
+        eq_(len(timestamps), 1)
+        ok_(timestamps.pop() <= sample.timestamp_end)
+        eq_(len(set(Data.objects.values_list("id", flat=True))), Data.objects.count())
+
+    @override_settings(SIMULATION_DATA_COPY=False, SIMULATION_DATA_BATCH_SIZE=5)
+    def test_bulk_create(self):
+        with mock.patch.object(ingest, "copy_data") as copy_data:
+            sample = self.save()
+        copy_data.assert_not_called()
+        self.assert_rows(sample)
+
+    def test_rolled_back_with_aggregate(self):
+        with mock.patch.object(
+            ingest, "update_aggregate", side_effect=RuntimeError
+        ), assert_raises(RuntimeError):
+            self.save()
+        eq_(Data.objects.filter(sample=self.sample).count(), 0)
+        eq_(Sample.objects.get(id=self.sample.id).timestamp_end, None)
+        self.assert_aggregated(0)
+
+
+@override_settings(SIMULATION_DATA_STORAGE="series")
+class TestSaveSeries(_IngestTestCase):
+    """
+    Tests saving samples as series, and reading them back.
+    """
+
+    def test_start_instance(self):
+        self.sample.instance.refresh_from_db()
+        eq_(self.sample.instance.columns, list(ingest.COLUMNS))
+        # Restarting keeps the statistics
+        self.save()
+        self.start()
+        self.assert_aggregated(1)
+
+    def test_save(self):
+        sample = self.save()
+        ok_(sample.timestamp_end is not None)
+        ok_(sample.series is not None)
+        eq_(Data.objects.filter(sample=sample).count(), 0)
+        eq_(ingest.counts(sample), ingest.from_engine(RESULTS))
+        self.assert_aggregated(1)
+
+    def test_data_rows(self):
+        sample = self.save()
+        rows = list(ingest.data_rows(sample, self.states))
+        eq_(len(rows), len(RESULTS["cycle"]) * len(ingest.NAMES))
+        eq_(
+            {
+                (row["population"], row["cycle_index"], row["population_size"])
+                for row in rows
+            },
+            {
+                (self.states[name].id, cycle, size)
+                for state, name in ingest.POPULATIONS.items()
+                for cycle, size in zip(RESULTS["cycle"], RESULTS[state])
+            },
+        )
+        eq_({row["sample"] for row in rows}, {sample.id})
+
+    def test_unfinished(self):
+        eq_(ingest.counts(self.sample), None)
@@ -0,0 +1,22 @@
+from django.test import SimpleTestCase
+from nose.tools import eq_
+
+from ..progress import Broker, Subscription
+
+
+class TestBrokerListeners(SimpleTestCase):
+    """
+    Tests that listeners hear when instances gain their first and lose their last
+    subscriber.
+    """
+
+    def test_listen(self):
+        broker, heard = Broker(), []
+        first = broker.subscribe("a", Subscription())
+        broker.listen(lambda instance_id, watched: heard.append((instance_id, watched)))
+        second = broker.subscribe("a", Subscription())
+        broker.subscribe("b", Subscription())
+        broker.unsubscribe("a", first)
+        broker.unsubscribe("a", second)
+        broker.unsubscribe("a", second)
+        eq_(heard, [("a", True), ("b", True), ("a", False)])
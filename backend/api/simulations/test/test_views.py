@@ -0,0 +1,218 @@
+import uuid
+
+import numpy as np
+from nose.tools import eq_
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import ingest
+from ..models import Data
+from .factories import InstanceFactory, SampleFactory
+
+
+def _results(susceptible: list, exposed: list) -> dict:
+    """Engine results of a 10 node graph with only susceptible and exposed nodes."""
+    zeros = [0] * len(susceptible)
+    return {
+        "cycle": list(range(len(susceptible))),
+        "susceptible": susceptible,
+        "exposed": exposed,
+        "infected asymptomatic": zeros,
+        "infected symptomatic": zeros,
+        "recovered": zeros,
+        "deceased": zeros,
+    }
+
+
+class TestInstanceAggregate(APITestCase):
+    """
+    Tests the statistics of the samples of an instance, merged as they are saved.
+    """
+
+    def setUp(self):
+        self.instance = InstanceFactory()
+        self.url = f"/api/v1/simulations/instances/{self.instance.id}/aggregate"
+
+    def save(self, instance, results: dict):
+        ingest.start_instance(instance, instance.graph.order)
+        ingest.save_sample(
+            SampleFactory(instance=instance), results, ingest.populations()
+        )
+
+    def test_no_aggregate(self):
+        response = self.client.get(self.url)
+        eq_(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_merged(self):
+        first = _results([10, 7, 3], [0, 3, 7])
+        second = _results([10, 9, 8], [0, 1, 2])
+        self.save(self.instance, first)
+        self.save(self.instance, second)
+        # Samples of other instances are not merged
+        self.save(InstanceFactory(), _results([0, 0, 0], [10, 10, 10]))
+
+        response = self.client.get(self.url)
+        eq_(response.status_code, status.HTTP_200_OK)
+        eq_(response.data["samples"], 2)
+        eq_(response.data["count"], [2, 2, 2])
+        for state, name in (("susceptible", "uninfected"), ("exposed", "exposed")):
+            values = np.array([first[state], second[state]])
+            expected = {
+                "mean": values.mean(axis=0),
+                "std": values.std(axis=0, ddof=1),
+                "p5": np.quantile(values, 0.05, axis=0),
+                "p50": np.quantile(values, 0.5, axis=0),
+                "p95": np.quantile(values, 0.95, axis=0),
+            }
+            for statistic, cycles in expected.items():
+                eq_(response.data[statistic][name], np.round(cycles, 6).tolist())
+        eq_(response.data["mean"]["dead"], [0, 0, 0])
+
+
+class _DataTestCase(APITestCase):
+    """Two instances of two finished samples, of 3 cycles each."""
+
+    url = "/api/v1/simulations/data/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.populations = ingest.populations()
+        cls.instances = [InstanceFactory(), InstanceFactory()]
+        cls.samples = []
+        for instance in cls.instances:
+            for _ in range(2):
+                sample = SampleFactory(instance=instance)
+                ingest.save_sample(
+                    sample, _results([10, 8, 5], [0, 2, 5]), cls.populations
+                )
+                cls.samples.append(sample)
+
+    def rows(self, **params) -> list:
+        response = self.client.get(self.url, {"page_size": 10000, **params})
+        eq_(response.status_code, status.HTTP_200_OK)
+        return response.data["results"]
+
+
+class TestDataFilter(_DataTestCase):
+    """
+    Tests filtering data rows by each query parameter.
+    """
+
+    def test_unfiltered(self):
+        eq_(len(self.rows()), Data.objects.count())
+        eq_(Data.objects.count(), 4 * 3 * len(ingest.NAMES))
+
+    def test_instance(self):
+        rows = self.rows(instance=self.instances[0].id)
+        eq_(len(rows), 2 * 3 * len(ingest.NAMES))
+        eq_({row["sample"] for row in rows}, {s.id for s in self.samples[:2]})
+
+    def test_sample(self):
+        rows = self.rows(sample=self.samples[1].id)
+        eq_(len(rows), 3 * len(ingest.NAMES))
+        eq_({row["sample"] for row in rows}, {self.samples[1].id})
+
+    def test_population(self):
+        exposed = self.populations["exposed"]
+        rows = self.rows(population=exposed.id)
+        eq_(len(rows), 4 * 3)
+        eq_({row["population"] for row in rows}, {exposed.id})
+        eq_(sorted(row["population_size"] for row in rows), sorted([0, 2, 5] * 4))
+
+    def test_cycle_index_range(self):
+        rows = self.rows(cycle_index_min=1, cycle_index_max=1)
+        eq_({row["cycle_index"] for row in rows}, {1})
+        eq_(len(rows), 4 * len(ingest.NAMES))
+        eq_({row["cycle_index"] for row in self.rows(cycle_index_min=1)}, {1, 2})
+        eq_({row["cycle_index"] for row in self.rows(cycle_index_max=1)}, {0, 1})
+
+    def test_combined(self):
+        rows = self.rows(
+            instance=self.instances[1].id,
+            population=self.populations["uninfected"].id,
+            cycle_index_min=2,
+        )
+        eq_(
+            [(row["sample"], row["population_size"]) for row in rows],
+            [(sample.id, 5) for sample in sorted(self.samples[2:], key=str)],
+        )
+
+    def test_unknown_instance(self):
+        eq_(self.rows(instance=uuid.uuid4()), [])
+
+    def test_invalid(self):
+        for params in (
+            {"instance": "instance"},
+            {"sample": "sample"},
+            {"population": "population"},
+            {"population": uuid.uuid4()},
+            {"cycle_index_min": "first"},
+            {"cycle_index_max": "last"},
+        ):
+            response = self.client.get(self.url, params)
+            eq_(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class TestDataPagination(_DataTestCase):
+    """
+    Tests walking the pages of data rows both ways, across samples and populations.
+    """
+
+    def page(self, url: str, **params) -> dict:
+        response = self.client.get(url, params)
+        eq_(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_walk(self):
+        expected = [
+            str(row_id)
+            for row_id in Data.objects.order_by(
+                "sample_id", "population_id", "cycle_index", "id"
+            ).values_list("id", flat=True)
+        ]
+        # Pages of 5 rows straddle populations (3 cycles) and samples (18 rows)
+        page = self.page(self.url, page_size=5)
+        eq_(page["previous"], None)
+        pages = [page]
+        while page["next"] is not None:
+            page = self.page(page["next"])
+            pages.append(page)
+        eq_(len(pages), -(-len(expected) // 5))
+        forward = [row["id"] for page in pages for row in page["results"]]
+        eq_(forward, expected)
+
+        backward = []
+        while page["previous"] is not None:
+            page = self.page(page["previous"])
+            backward = [row["id"] for row in page["results"]] + backward
+        eq_(len(backward), len(expected) - len(pages[-1]["results"]))
+        eq_(backward + [row["id"] for row in pages[-1]["results"]], expected)
+
+    def test_walk_filtered(self):
+        population = self.populations["exposed"].id
+        ids = []
+        url = self.url
+        params = {"population": population, "page_size": 2}
+        while url is not None:
+            page = self.page(url, **params)
+            ids += [row["id"] for row in page["results"]]
+            url, params = page["next"], {}
+        eq_(len(ids), 4 * 3)
+        eq_(
+            set(ids),
+            {
+                str(row_id)
+                for row_id in Data.objects.filter(population_id=population).values_list(
+                    "id", flat=True
+                )
+            },
+        )
+
+    def test_page_size(self):
+        eq_(len(self.page(self.url, page_size=0)["results"]), 1)
+        eq_(len(self.page(self.url, page_size="all")["results"]), Data.objects.count())
+
+    def test_invalid_cursor(self):
+        for cursor in ("cursor", "eyJwb3NpdGlvbiI6IFtdfQ=="):
+            response = self.client.get(self.url, {"cursor": cursor})
+            eq_(response.status_code, status.HTTP_404_NOT_FOUND)
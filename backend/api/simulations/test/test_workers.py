@@ -0,0 +1,92 @@
+import os
+from unittest import mock
+from concurrent.futures.process import BrokenProcessPool
+
+from django.test import SimpleTestCase
+from nose.tools import assert_raises, eq_, ok_
+
+from .. import workers
+from ..workers import WorkerPool, _slot
+
+
+class TestWorkerChoice(SimpleTestCase):
+    """
+    Tests which worker samples are routed to (worker processes are never started).
+    """
+
+    def setUp(self):
+        self.pool = WorkerPool(3, 0, affinity_backlog=2)
+        self.pool._resident[2].add("graph")
+
+    def test_prefers_worker_holding_graph(self):
+        self.pool._pending = [0, 1, 2]
+        eq_(self.pool._choose("graph"), (2, True))
+        eq_(self.pool._pending, [0, 1, 3])
+
+    def test_least_busy_worker_past_backlog(self):
+        self.pool._pending = [0, 1, 3]
+        eq_(self.pool._choose("graph"), (0, False))
+        eq_(self.pool._pending, [1, 1, 3])
+
+    def test_least_busy_worker_without_graph(self):
+        self.pool._pending = [1, 0, 0]
+        eq_(self.pool._choose("other"), (1, False))
+
+
+class TestWorkerWatch(SimpleTestCase):
+    """
+    Tests which tags workers report the cycles of.
+    """
+
+    def test_watch_counts(self):
+        pool = WorkerPool(1, 0)
+        pool.watch("instance")
+        pool.watch("instance")
+        pool.watch("instance", False)
+        eq_(pool._watchers[_slot("instance")], 1)
+        pool.watch("instance", False)
+        eq_(pool._watchers[_slot("instance")], 0)
+
+
+class TestWorkerRestart(SimpleTestCase):
+    """
+    Tests that workers whose process died are replaced.
+    """
+
+    def setUp(self):
+        self.pool = WorkerPool(1, 0)
+
+    def tearDown(self):
+        for worker in self.pool._workers:
+            worker.shutdown()
+
+    def test_restarts_dead_worker(self):
+        broken = self.pool._workers[0]
+        with assert_raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+
+        with mock.patch.object(workers, "_simulate", _simulated):
+            eq_(self.pool.simulate("graph", lambda: b"data", {}), {"cycle": [0]})
+        ok_(self.pool._workers[0] is not broken)
+        eq_(self.pool._resident, [{"graph"}])
+        eq_(self.pool._pending, [0])
+
+    def test_fails_sample_killing_worker(self):
+        self.pool._resident[0].add("other")
+        with mock.patch.object(workers, "_simulate", _exit):
+            with assert_raises(BrokenProcessPool):
+                self.pool.simulate("graph", lambda: b"data", {})
+        eq_(self.pool._resident, [set()])
+        eq_(self.pool._pending, [0])
+
+        # The next sample gets a new worker
+        with mock.patch.object(workers, "_simulate", _simulated):
+            eq_(self.pool.simulate("graph", lambda: b"data", {}), {"cycle": [0]})
+
+
+def _simulated(key, data, *args):
+    return {"cycle": [0]}, [key]
+
+
+def _exit(key, data, *args):
+    os._exit(1)
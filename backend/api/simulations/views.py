@@ -9,6 +9,8 @@ from django.core.exceptions import (
     ObjectDoesNotExist,
 )
 from django.db import transaction
+from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import (
     exceptions,
     mixins,
@@ -17,9 +19,12 @@ from rest_framework import (
     response,
     status,
 )
+from rest_framework.decorators import action
+from rest_framework.request import Request
 
+from api.graphs import jobs as graph_jobs
 from api.graphs.models import Graph
-from .models import Data, Instance, Parameters, Population, Sample
+from .models import Data, Instance, InstanceAggregate, Parameters, Population, Sample
 from .serializers import (
     DataSerializer,
     InstanceCreateSerializer,
@@ -28,7 +33,16 @@ from .serializers import (
     PopulationSerializer,
     SampleSerializer,
 )
+from . import export, ingest, progress
+from .filters import DataFilter
 from .jobs import InstanceSamples
+from .pagination import DataPagination, KeysetPagination
+
+
+class SampleNotFinished(exceptions.APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Sample has not finished simulating"
+    default_code = "sample_not_finished"
 
 
 class _SimulationViewSet(
@@ -85,6 +99,7 @@ class InstanceViewSet(
 
     queryset = Instance.objects.all()
     serializer_class = InstanceSerializer
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         # Use creation serializer class if this is a POST request (create a new instance)
@@ -92,12 +107,63 @@ class InstanceViewSet(
             return InstanceCreateSerializer
         return super().get_serializer_class()
 
+    @action(detail=True, methods=["get"], url_path="aggregate")
+    def aggregate(self, request: Request, pk=None):
+        """Retrieves the per-cycle `count` of samples, and the `mean`, `std`, `p5`,
+        `p50` and `p95` of every population, over the samples of an instance that
+        finished so far (see `abseir.aggregate`).
+        """
+        aggregate = (
+            InstanceAggregate.objects.filter(instance=self.get_object())
+            .only("samples", "summary")
+            .first()
+        )
+        if aggregate is None:
+            raise exceptions.NotFound("Instance has no aggregate")
+        return response.Response({"samples": aggregate.samples, **aggregate.summary})
+
+    @action(detail=True, methods=["get"], url_path="results")
+    def results(self, request: Request, pk=None):
+        """Streams the results of every finished sample of an instance in a single
+        response, with `?export=` one of `csv` (default), `ndjson` or `arrow` (if
+        `pyarrow` is installed, see `api.simulations.export`).
+        """
+        export_format = request.query_params.get("export", "csv")
+        formats = export.available_formats()
+        if export_format not in formats:
+            raise exceptions.ValidationError(
+                {"export": f"Must be one of {tuple(formats)}"}
+            )
+
+        instance = self.get_object()
+        streamed = StreamingHttpResponse(
+            export.EXPORTERS[export_format](instance, export.header(instance)),
+            content_type=export.FORMATS[export_format],
+        )
+        streamed[
+            "Content-Disposition"
+        ] = f'attachment; filename="instance_{instance.id}.{export_format}"'
+        return streamed
+
+    @action(detail=True, methods=["get"], url_path="progress")
+    def progress(self, request: Request, pk=None):
+        """Streams the live progress of an instance as server-sent events until it
+        completes (see `api.simulations.progress`).
+
+        Under ASGI, this is streamed asynchronously by `api.asgi`.
+        """
+        instance = self.get_object()
+        return progress.ProgressResponse(instance.id)
+
     # https://stackoverflow.com/a/54993327/13789724
     # Custom POST behavior
     def create(self, request, *args, **kwargs):
         """Checks if specified simulation parameters row already
         exists in the database, and creates a new parameters row
         if not.
+
+        Samples start running once the instance's graph has finished generating,
+        and the instance is cancelled if the graph fails to generate.
         """
 
         data = request.data.copy()
@@ -165,6 +231,18 @@ class InstanceViewSet(
                 }
             ) from exc
 
+        if graph.status == Graph.Status.FAILED:
+            raise exceptions.ValidationError(
+                {
+                    "graph.id": [
+                        exceptions.ErrorDetail(
+                            string=f"Graph '{graph_id}' failed to generate",
+                            code="invalid",
+                        )
+                    ]
+                }
+            )
+
         data["graph_id"], data["graph_type"] = graph.id, graph_type_model.id
 
         # Required so that we do not create orphaned `parameters` rows
@@ -184,8 +262,15 @@ class InstanceViewSet(
             instance_serializer.data["parameters"] = parameters
             headers = self.get_success_headers(instance_serializer.data)
 
-            # Create simulation samples
-            InstanceSamples(instance, InstanceSerializer(instance))
+            # Create simulation samples once the graph has been generated
+            # (immediately if it already has)
+            def start_samples(ready: bool):
+                if ready:
+                    InstanceSamples(instance, InstanceSerializer(instance))
+                else:
+                    Instance.objects.filter(id=instance.id).update(cancelled=True)
+
+            transaction.on_commit(lambda: graph_jobs.when_ready(graph, start_samples))
 
         # Success
         return response.Response(
@@ -203,13 +288,42 @@ class SampleViewSet(_SimulationViewSet):
 
     queryset = Sample.objects.all()
     serializer_class = SampleSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        # Series are only loaded (and decoded) if requested (see `series()`)
+        return super().get_queryset().defer("series")
+
+    @action(detail=True, methods=["get"], url_path="series")
+    def series(self, request: Request, pk=None):
+        """Retrieves the count of every population at every cycle of a sample as
+        `{"cycle": [...], population: [...]}` lists.
+        """
+        counts = ingest.counts(self.get_object())
+        if counts is None:
+            raise SampleNotFinished()
+        return response.Response(counts)
+
+    @action(detail=True, methods=["get"], url_path="data")
+    def data(self, request: Request, pk=None):
+        """Lists the data rows of a sample (derived from its series if stored as such,
+        see `api.simulations.ingest`).
+        """
+        sample = self.get_object()
+        if sample.timestamp_end is None:
+            raise SampleNotFinished()
+        return response.Response(list(ingest.data_rows(sample, ingest.populations())))
 
 
 class DataViewSet(_SimulationViewSet):
     """Lists and retrieves simulation instance data.
 
-    Data is automatically generated by simulation instance samples.
+    Data is automatically generated by simulation instance samples. Rows can be
+    filtered by instance, sample, population and cycle range (see `DataFilter`).
     """
 
     queryset = Data.objects.all()
     serializer_class = DataSerializer
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = DataFilter
+    pagination_class = DataPagination
@@ -0,0 +1,227 @@
+"""
+Long-lived simulation worker processes that keep decoded graphs resident.
+
+Each worker keeps the graphs it decoded in a least recently used cache, keyed by graph
+id and `data_hash` (so regenerated graphs are never stale), holding at most
+`SIMULATION_GRAPH_CACHE_BYTES` of graph arrays (see `abseir.csr.CSRGraph.nbytes`).
+
+Samples are routed to the least busy worker holding their graph, unless it has over
+`affinity_backlog` more pending samples than the least busy worker (which then gets
+them): the samples of an instance decode its graph once per worker rather than once
+per sample, and its data is only sent to (and read from the database for) workers that
+lack it.
+
+Workers report the counts of every cycle of the samples they simulate as they go
+through a shared `progress` queue, if given, but only while someone watches them (see
+`WorkerPool.watch`), which workers check in shared memory.
+"""
+
+import multiprocessing
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Hashable, Optional
+
+from abseir import serialization, simulation
+from abseir.csr import CSRGraph
+
+# Resident graphs of this worker process, least recently used first
+_graphs: "OrderedDict[Hashable, CSRGraph]" = OrderedDict()
+_cache_bytes = 0
+_progress: Optional[multiprocessing.Queue] = None
+_watchers: Any = None  # Shared watcher counts of tag names (see `WorkerPool.watch`)
+
+# Slots of the shared watcher counts (tag names sharing a slot are reported as long as
+# either is watched)
+WATCH_SLOTS = 4096
+
+
+class GraphNotLoaded(Exception):
+    """Raised by workers asked to simulate a graph they do not hold (anymore)."""
+
+
+def _initialize(
+    cache_bytes: int, progress: Optional[multiprocessing.Queue], watchers: Any
+):
+    global _cache_bytes, _progress, _watchers  # pylint: disable=global-statement
+    _cache_bytes, _progress, _watchers = cache_bytes, progress, watchers.get_obj()
+
+
+def _slot(name: Hashable) -> int:
+    """Slot of a tag name in the shared watcher counts (the same in every process)."""
+    return zlib.crc32(str(name).encode("utf-8")) % WATCH_SLOTS
+
+
+def _load(key: Hashable, data: Optional[bytes]) -> CSRGraph:
+    """Resident graph `key`, decoded from `data` (evicting the least recently used
+    graphs beyond `_cache_bytes`, but never the graph just loaded) unless held already.
+    """
+    graph = _graphs.get(key)
+    if graph is None:
+        if data is None:
+            raise GraphNotLoaded(key)
+        graph = _graphs[key] = serialization.loads(data)
+        resident = sum(cached.nbytes for cached in _graphs.values())
+        while resident > _cache_bytes and len(_graphs) > 1:
+            _, evicted = _graphs.popitem(last=False)
+            resident -= evicted.nbytes
+    _graphs.move_to_end(key)
+    return graph
+
+
+def _simulate(
+    key: Hashable,
+    data: Optional[bytes],
+    parameters: dict,
+    metrics: Optional[dict],
+    tag: Any = None,
+) -> tuple[dict, list]:
+    """Runs in a worker: simulates a sample on resident graph `key` (see
+    `abseir.simulation.simulate_counts`), and returns its results along with the keys
+    of the graphs the worker now holds.
+
+    Reports the counts of every cycle as `(tag, counts)` to the progress queue while
+    the name of the tag (its first item) is watched.
+    """
+    on_cycle = None
+    if _progress is not None and tag is not None:
+        progress, watchers, slot = _progress, _watchers, _slot(tag[0])
+
+        def on_cycle(counts: dict):
+            if watchers[slot] > 0:
+                progress.put((tag, counts))
+
+    graph = _load(key, data)
+    results = simulation.simulate_counts(graph, parameters, metrics, on_cycle=on_cycle)
+    return results, list(_graphs)
+
+
+def _submit(
+    worker: ProcessPoolExecutor,
+    key: Hashable,
+    load: Callable[[], bytes],
+    resident: bool,
+    *args,
+) -> tuple[dict, list]:
+    """Simulates a sample on graph `key` in `worker` (see `_simulate`), sending it the
+    graph's data unless it is `resident`.
+    """
+    try:
+        data = None if resident else load()
+        return worker.submit(_simulate, key, data, *args).result()
+    except GraphNotLoaded:
+        # Evicted since the worker last reported its graphs
+        return worker.submit(_simulate, key, load(), *args).result()
+
+
+class WorkerPool:
+    """Simulation worker processes with graph affinity.
+
+    Each worker is a single process executor, so samples can be routed to the worker
+    holding their graph. Workers are spawned rather than forked from the (threaded)
+    server process, so `progress` must be a queue of the `spawn` context. A worker
+    whose process dies is replaced by a new one.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        cache_bytes: int,
+        progress: Optional[multiprocessing.Queue] = None,
+        affinity_backlog: int = 0,
+    ):
+        self._affinity_backlog = affinity_backlog
+        self._context = multiprocessing.get_context("spawn")
+        self._watchers = self._context.Array("i", WATCH_SLOTS)
+        self._initargs = (cache_bytes, progress, self._watchers)
+        self._workers = [self._start() for _ in range(workers)]
+        self._resident: list[set] = [set() for _ in range(workers)]
+        self._pending = [0] * workers
+        self._lock = threading.Lock()  # Guards the resident graphs and pending samples
+
+    def _start(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=self._context,
+            initializer=_initialize,
+            initargs=self._initargs,
+        )
+
+    def _restart(self, index: int, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Replaces worker `index` if it still is the `broken` executor (whose process
+        died, e.g. killed for its memory) and returns its replacement.
+        """
+        with self._lock:
+            if self._workers[index] is broken:
+                self._workers[index] = self._start()
+                self._resident[index] = set()
+            worker = self._workers[index]
+        broken.shutdown(wait=False)
+        return worker
+
+    def _choose(self, key: Hashable) -> tuple[int, bool]:
+        """Reserves the worker holding graph `key` with fewest pending samples (unless
+        it has over `affinity_backlog` more than the worker with fewest, which is
+        reserved instead) and returns its index and whether it holds the graph.
+        """
+        with self._lock:
+            workers = range(len(self._workers))
+            index = min(workers, key=lambda i: self._pending[i])
+            holding = [i for i in workers if key in self._resident[i]]
+            if holding:
+                nearest = min(holding, key=lambda i: self._pending[i])
+                if (
+                    self._pending[nearest] - self._pending[index]
+                    <= self._affinity_backlog
+                ):
+                    index = nearest
+            self._pending[index] += 1
+            return index, key in self._resident[index]
+
+    def watch(self, name: Hashable, watched: bool = True):
+        """Starts (or stops, if not `watched`) reporting the cycles of samples tagged
+        `(name, ...)`, including those being simulated. Calls are counted, so `name`
+        is watched until every call watching it is matched by one that stops.
+        """
+        with self._watchers.get_lock():
+            self._watchers[_slot(name)] += 1 if watched else -1
+
+    def simulate(
+        self,
+        key: Hashable,
+        load: Callable[[], bytes],
+        parameters: dict,
+        metrics: Optional[dict] = None,
+        tag: Any = None,
+    ) -> dict:
+        """Simulates a sample on graph `key` (whose encoded data is returned by
+        `load()`, only called if the chosen worker lacks the graph) and returns the
+        count of every state at every cycle (see `abseir.simulation.simulate_counts`).
+        The counts of every cycle are reported to the progress queue with `tag` (a
+        `(name, ...)` tuple) while `name` is watched (see `watch()`).
+
+        Blocks until the sample has been simulated.
+        """
+        index, resident = self._choose(key)
+        worker = self._workers[index]
+        try:
+            try:
+                results, graphs = _submit(
+                    worker, key, load, resident, parameters, metrics, tag
+                )
+            except BrokenProcessPool:
+                # Its process died, failing every sample it was given: retry on a
+                # new one (so a sample killing it fails on its own the second time)
+                worker = self._restart(index, worker)
+                results, graphs = _submit(
+                    worker, key, load, False, parameters, metrics, tag
+                )
+            with self._lock:
+                if self._workers[index] is worker:
+                    self._resident[index] = set(graphs)
+        finally:
+            with self._lock:
+                self._pending[index] -= 1
+        return results
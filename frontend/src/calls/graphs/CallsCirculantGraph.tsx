@@ -2,7 +2,7 @@ import axios, { AxiosRequestConfig } from 'axios';
 
 import { API_URL } from '../..';
 import { Field, formatOptions, PaginatedResponse } from '../common';
-import { GraphOptions, Graph } from './common';
+import { getGraphData, GraphData, GraphOptions, Graph } from './common';
 
 const CIRCULANT_GRAPH_URL = '/graphs/circulant';
 
@@ -31,15 +31,7 @@ export const getCirculantGraphs = (): Promise<CirculantGraphResults> =>
 export const getCirculantGraph = (
     id: string,
     signal?: AxiosRequestConfig['signal']
-): Promise<CirculantGraph & { data: Blob }> =>
-    axios
-        .get(`${API_URL}${CIRCULANT_GRAPH_URL}/${id}`, { signal: signal })
-        .then((response) => {
-            if (response.status !== 200) {
-                throw new Error(response.status + response.statusText);
-            }
-            return response.data;
-        });
+): Promise<GraphData> => getGraphData(CIRCULANT_GRAPH_URL, id, signal);
 
 export const postCirculantGraph = (params: {
     order: number;
@@ -2,7 +2,7 @@ import axios, { AxiosRequestConfig } from 'axios';
 
 import { API_URL } from '../..';
 import { formatOptions, PaginatedResponse } from '../common';
-import { GraphOptions, Graph } from './common';
+import { getGraphData, GraphData, GraphOptions, Graph } from './common';
 
 const COMPLETE_GRAPH_URL = '/graphs/complete';
 
@@ -23,15 +23,7 @@ export const getCompleteGraphs = (): Promise<CompleteGraphResults> =>
 export const getCompleteGraph = (
     id: string,
     signal?: AxiosRequestConfig['signal']
-): Promise<CompleteGraph & { data: Blob }> =>
-    axios
-        .get(`${API_URL}${COMPLETE_GRAPH_URL}/${id}`, { signal: signal })
-        .then((response) => {
-            if (response.status !== 200) {
-                throw new Error(response.status + response.statusText);
-            }
-            return response.data;
-        });
+): Promise<GraphData> => getGraphData(COMPLETE_GRAPH_URL, id, signal);
 
 export const postCompleteGraph = (params: {
     order: number;
@@ -1,8 +1,32 @@
+import axios, { AxiosRequestConfig } from 'axios';
+
+import { API_URL } from '../..';
 import { Field, FieldRequiredProps, Options } from '../common';
 
+// See `abseir.metrics.compute`
+export interface GraphMetrics {
+    order: number;
+    edges: number;
+    mean_degree: number;
+    degree_distribution: Record<string, number>;
+    clustering: number;
+    eccentricity: { radius: number; diameter: number; mean: number } | null;
+    path_lengths: { mean: number; distribution: Record<string, number> };
+    components: number;
+    // Set if clustering and distances were estimated (for large graphs)
+    estimate: {
+        error: number;
+        confidence: number;
+        samples: number;
+        diameter_upper_bound: number | null;
+    } | null;
+}
+
 export interface Graph {
     id: string;
     order: number;
+    status: 'pending' | 'generating' | 'ready' | 'failed';
+    metrics: GraphMetrics | null; // null until generated
 }
 
 export interface GraphOptions extends Options {
@@ -13,3 +37,31 @@ export interface GraphOptions extends Options {
         } & Record<string, Field>;
     } & Options['actions'];
 }
+
+export interface GraphData {
+    id: string;
+    data: string; // cytoscape JSON
+}
+
+// Graphs are browsed through their reduced `view` (at most `budget` edges, with nodes
+// positioned by the graph's precomputed layout), which is the whole graph unless it is
+// too large to draw. Views never change, so they are cacheable (`ETag`/`Cache-Control`).
+export const getGraphData = (
+    url: string,
+    id: string,
+    signal?: AxiosRequestConfig['signal'],
+    method: 'sample' | 'degree' | 'cluster' = 'sample'
+): Promise<GraphData> =>
+    axios
+        .get(`${API_URL}${url}/${id}/view`, {
+            params: { method: method },
+            responseType: 'text',
+            transformResponse: (data) => data,
+            signal: signal,
+        })
+        .then((response) => {
+            if (response.status !== 200) {
+                throw new Error(response.status + response.statusText);
+            }
+            return { id: id, data: response.data };
+        });
@@ -2,6 +2,7 @@
 // https://www.npmjs.com/package/cytoscape-react
 import React, { useState } from 'react';
 import { useQuery, useQueryClient } from 'react-query';
+import cytoscape from 'cytoscape';
 import CytoscapeComponent from 'react-cytoscapejs';
 import Button from '@mui/material/Button';
 import CircularProgress from '@mui/material/CircularProgress';
@@ -15,7 +16,7 @@ import { styled } from '@mui/material/styles';
 import VisibilityOutlinedIcon from '@mui/icons-material/VisibilityOutlined';
 import CloseIcon from '@mui/icons-material/Close';
 
-import { Graph } from '../../calls';
+import { GraphData } from '../../calls';
 import { CytoscapeStyled, ErrorFallback } from '../../util';
 
 const BootstrapDialog = styled(Dialog)(({ theme }) => ({
@@ -57,18 +58,35 @@ const BootstrapDialogTitle = (props: DialogTitleProps) => {
     );
 };
 
+// Precomputed layout coordinates are in `[-1, 1]`
+const LAYOUT_SCALE = 250;
+
 const GraphLayout: React.FC<{
-    data: Blob | undefined;
+    data: string | undefined;
 }> = ({ data }): JSX.Element => {
+    const elements = JSON.parse(String(data)).elements;
+    const nodes: cytoscape.ElementDefinition[] = elements.nodes;
+    if (!nodes.every((node) => node.position !== undefined)) {
+        return (
+            <CytoscapeStyled
+                elements={CytoscapeComponent.normalizeElements(elements)}
+            />
+        );
+    }
+
     return (
         <CytoscapeStyled
-            elements={CytoscapeComponent.normalizeElements(
-                JSON.parse(
-                    // atob(String(data))
-                    // Buffer.from(data, 'base64').toString()
-                    window.atob(String(data))
-                ).elements
-            )}
+            elements={CytoscapeComponent.normalizeElements({
+                ...elements,
+                nodes: nodes.map((node) => ({
+                    ...node,
+                    position: {
+                        x: LAYOUT_SCALE * Number(node.position?.x),
+                        y: LAYOUT_SCALE * Number(node.position?.y),
+                    },
+                })),
+            })}
+            layout={{ name: 'preset', fit: true }}
         />
     );
 };
@@ -77,7 +95,7 @@ const GraphRender: React.FC<{
     id: string;
     queryProps: {
         key: string;
-        func: (id: string) => Promise<Graph & { data: Blob }>;
+        func: (id: string) => Promise<GraphData>;
     };
 }> = ({ id, queryProps }): JSX.Element => {
     const [open, setOpen] = useState(false);
@@ -12,7 +12,7 @@ import TableRow from '@mui/material/TableRow';
 import Typography from '@mui/material/Typography';
 import Paper from '@mui/material/Paper';
 
-import { Graph } from '../../calls';
+import { GraphData } from '../../calls';
 import { PaginatedResponse } from '../../calls/common';
 import GraphRender from './GraphRender';
 
@@ -22,7 +22,7 @@ const GraphList: React.FC<{
     query: UseQueryResult<PaginatedResponse>;
     dataQueryProps: {
         key: string;
-        func: (id: string) => Promise<Graph & { data: Blob }>;
+        func: (id: string) => Promise<GraphData>;
     };
 }> = ({ type, columns, query, dataQueryProps }): JSX.Element => {
     if (query.isLoading) {